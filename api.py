@@ -1,15 +1,23 @@
 import os
 import sqlite3
 from datetime import datetime
-from fastapi import FastAPI, Depends, HTTPException
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import text
+import db
 import db_helpers
+import decision_engine
 import auth
+import jobs
 import models
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+DB_ERRORS = (sqlite3.Error,) + ((db_helpers.psycopg2.Error,) if db_helpers.psycopg2 else ())
+
 app = FastAPI()
 
 # Mount static files
@@ -19,89 +27,119 @@ app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), na
 app.include_router(auth.router)
 
 def get_conn():
-    return sqlite3.connect(os.path.join(BASE_DIR, "webscan.db"))
+    # Async connection from the shared pool: `async with get_conn() as conn:`
+    return db.async_engine.connect()
+
+async def _all(conn, sql, **params):
+    return (await conn.execute(text(sql), params)).fetchall()
+
+async def _one(conn, sql, **params):
+    return (await conn.execute(text(sql), params)).first()
+
+def _sync_call(fn, *args):
+    # The job queue and decision rules are written against sync DB-API
+    # connections (and own their locking); run them off the event loop
+    def call():
+        with db_helpers.connection() as conn:
+            return fn(conn, *args)
+    return run_in_threadpool(call)
+
+@app.on_event("startup")
+async def ensure_tables():
+    # Tables added after init_db first ran on existing deployments
+    await _sync_call(jobs.init_jobs_table)
+    await _sync_call(db_helpers.init_latest_run_table)
+    await _sync_call(db_helpers.init_scan_state_table)
+
+@app.on_event("shutdown")
+async def close_pool():
+    await db.async_engine.dispose()
 
 @app.get("/")
-def root():
+async def root():
     return RedirectResponse(url="/static/dashboard.html")
 
 @app.get("/auth")
-def auth_page():
+async def auth_page():
     return RedirectResponse(url="/static/auth.html")
 
+def _now():
+    # asyncpg wants datetimes for TIMESTAMP columns; SQLite stores ISO text
+    now = datetime.utcnow()
+    return now.isoformat() if db.is_sqlite() else now
+
+async def _user_id(conn, username):
+    row = await _one(conn, "SELECT id FROM users WHERE username=:username", username=username)
+    return row[0] if row else None
+
 @app.get("/user-domains")
-def get_user_domains(username: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM users WHERE username=?", (username,))
-    user_row = cur.fetchone()
-    if not user_row:
-        conn.close()
-        return []
-    user_id = user_row[0]
-    cur.execute("SELECT domain FROM domains WHERE user_id=?", (user_id,))
-    rows = cur.fetchall()
-    conn.close()
+async def get_user_domains(username: str):
+    async with get_conn() as conn:
+        user_id = await _user_id(conn, username)
+        if user_id is None:
+            return []
+        rows = await _all(conn, "SELECT domain FROM domains WHERE user_id=:user_id", user_id=user_id)
     return [row[0] for row in rows]
 
 @app.post("/register-domain")
-def register_domain(domain: str, username: str):
+async def register_domain(domain: str, username: str):
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT id FROM users WHERE username=?", (username,))
-        user_row = cur.fetchone()
-        if not user_row:
-            conn.close()
-            return {"error": "User not found"}
-        user_id = user_row[0]
-
-        cur.execute("SELECT id FROM domains WHERE user_id=? AND domain=?", (user_id, domain))
-        if cur.fetchone():
-            conn.close()
-            return {"message": "Domain already registered"}
-
-        cur.execute("""
-            INSERT INTO domains (user_id, domain, created_at)
-            VALUES (?, ?, ?)
-        """, (user_id, domain, datetime.utcnow().isoformat()))
-        conn.commit()
-        conn.close()
-
-        # Trigger mock scan results
-        db_helpers.save_scan_results(
-            domain,
-            75, "Warning", "medium",
-            findings=[
-                {"parameter":"SSL","risk":"Expiring in 5 days","severity":"medium"},
-                {"parameter":"Headers","risk":"Missing CSP","severity":"high"}
-            ],
-            events=[
-                {"change":"Domain registered","severity":"low","time":datetime.utcnow().isoformat()},
-                {"change":"Initial scan completed","severity":"low","time":datetime.utcnow().isoformat()}
-            ],
-            actions=[
-                {"issue":"Missing CSP Header","risk":"High","action":"Add Content-Security-Policy","status":"Open"},
-                {"issue":"SSL Expiry","risk":"Medium","action":"Renew SSL Certificate","status":"Pending"}
-            ]
-        )
-        return {"message": f"Domain {domain} registered and scan started"}
+        async with get_conn() as conn:
+            user_id = await _user_id(conn, username)
+            if user_id is None:
+                return {"error": "User not found"}
+
+            if await _one(conn, "SELECT id FROM domains WHERE user_id=:user_id AND domain=:domain",
+                          user_id=user_id, domain=domain):
+                return {"message": "Domain already registered"}
+
+            await conn.execute(text("""
+                INSERT INTO domains (user_id, domain, created_at)
+                VALUES (:user_id, :domain, :created_at)
+            """), {"user_id": user_id, "domain": domain, "created_at": _now()})
+            await conn.commit()
+
+        # Queue the initial scan; a worker process picks it up
+        job_id = await _sync_call(jobs.enqueue, domain, domain, user_id)
+        return {"message": f"Domain {domain} registered and scan queued", "job_id": job_id}
     except Exception as e:
         return {"error": str(e)}
 
-@app.get("/overview/{domain}")
-def overview(domain: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
+@app.post("/scans")
+async def enqueue_scan(domain: str, username: str | None = None, profile: str | None = None):
+    # profile: a check profile such as "headers" or "fast" (default: every check)
+    if profile is not None and profile not in jobs.CHECK_PROFILES:
+        raise HTTPException(status_code=400,
+                            detail=f"Unknown check profile; expected one of {', '.join(jobs.CHECK_PROFILES)}")
+    user_id = None
+    if username:
+        async with get_conn() as conn:
+            user_id = await _user_id(conn, username)
+        if user_id is None:
+            raise HTTPException(status_code=404, detail="User not found")
+    job_id = await _sync_call(jobs.enqueue, domain, domain, user_id, profile)
+    return await _sync_call(jobs.get_job, job_id)
+
+@app.get("/scans/{job_id}")
+async def scan_status(job_id: int):
+    job = await _sync_call(jobs.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.delete("/scans/{job_id}")
+async def cancel_scan(job_id: int):
+    job = await _sync_call(jobs.cancel, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+async def _overview(conn, domain):
+    row = await _one(conn, """
         SELECT trust_score, verdict, severity, created_at
-        FROM runs
-        WHERE domain=?
-        ORDER BY created_at DESC
-        LIMIT 1
-    """, (domain,))
-    row = cur.fetchone()
-    conn.close()
+        FROM latest_run
+        WHERE domain=:domain
+    """, domain=domain)
     if not row:
         return {
             "domain": domain,
@@ -118,35 +156,84 @@ def overview(domain: str):
         "last_scan": row[3]
     }
 
-@app.get("/risks/{domain}")
-def risks(domain: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM runs WHERE domain=? ORDER BY created_at DESC LIMIT 1", (domain,))
-    run_row = cur.fetchone()
-    if not run_row:
-        conn.close()
+async def _risks(conn, run_id):
+    if run_id is None:
         return []
-    run_id = run_row[0]
-    cur.execute("SELECT parameter, risk, severity FROM findings WHERE run_id=?", (run_id,))
-    rows = cur.fetchall()
-    conn.close()
+    rows = await _all(conn, "SELECT parameter, risk, severity FROM findings WHERE run_id=:run_id", run_id=run_id)
     return [{"parameter": r[0], "risk": r[1], "severity": r[2]} for r in rows]
 
-@app.get("/actions/{domain}")
-def actions(domain: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT issue, risk, action, status FROM actions WHERE domain=?", (domain,))
-    rows = cur.fetchall()
-    conn.close()
+async def _actions(conn, domain):
+    rows = await _all(conn, "SELECT issue, risk, action, status FROM actions WHERE domain=:domain", domain=domain)
     return [{"issue": r[0], "risk": r[1], "action": r[2], "status": r[3]} for r in rows]
 
-@app.get("/timeline/{domain}")
-def timeline(domain: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT change, severity, created_at FROM events WHERE domain=? ORDER BY created_at DESC", (domain,))
-    rows = cur.fetchall()
-    conn.close()
+async def _timeline(conn, domain):
+    rows = await _all(conn, "SELECT change, severity, created_at FROM events WHERE domain=:domain ORDER BY created_at DESC",
+                      domain=domain)
     return [{"change": r[0], "severity": r[1], "time": r[2]} for r in rows]
+
+async def _latest_run(conn, domain):
+    """(run_id, profile_version) of the domain's latest run, or (None, None)."""
+    row = await _one(conn, "SELECT run_id, profile_version FROM latest_run WHERE domain=:domain", domain=domain)
+    return (row[0], row[1]) if row else (None, None)
+
+async def _latest_run_id(conn, domain):
+    row = await _one(conn, "SELECT run_id FROM latest_run WHERE domain=:domain", domain=domain)
+    return row[0] if row else None
+
+async def _decisions(domain):
+    # The decision rules expect numeric findings.value/risk columns that this
+    # schema doesn't have yet; a failing rule shouldn't take the page down
+    try:
+        return await _sync_call(decision_engine.rules_for_domain, domain)
+    except DB_ERRORS + (TypeError, ValueError):
+        return []
+
+@app.get("/overview/{domain}")
+async def overview(domain: str):
+    async with get_conn() as conn:
+        return await _overview(conn, domain)
+
+@app.get("/risks/{domain}")
+async def risks(domain: str):
+    async with get_conn() as conn:
+        return await _risks(conn, await _latest_run_id(conn, domain))
+
+@app.get("/actions/{domain}")
+async def actions(domain: str):
+    async with get_conn() as conn:
+        return await _actions(conn, domain)
+
+@app.get("/timeline/{domain}")
+async def timeline(domain: str):
+    async with get_conn() as conn:
+        return await _timeline(conn, domain)
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+@app.get("/dashboard/{domain}")
+async def dashboard(domain: str, request: Request):
+    """
+    Overview, risks, actions, timeline and decisions in one response. Everything
+    here changes only when a new run is saved or the latest one is rescored, so
+    the latest run id and its profile version are the ETag and an unchanged
+    dashboard costs one primary-key lookup and a 304.
+    """
+    async with get_conn() as conn:
+        run_id, version = await _latest_run(conn, domain)
+        etag = f'"{domain}:{run_id or 0}:{version or 0}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        payload = {
+            "overview": await _overview(conn, domain),
+            "risks": await _risks(conn, run_id),
+            "actions": await _actions(conn, domain),
+            "timeline": await _timeline(conn, domain),
+            "decisions": await _decisions(domain),
+        }
+    # Postgres returns datetimes where SQLite returns ISO strings
+    return JSONResponse(jsonable_encoder(payload), headers=headers)
@@ -1,7 +1,8 @@
 # auth.py
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from jose import jwt
 
@@ -28,19 +29,23 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+async def _find_user(db_session: AsyncSession, username: str):
+    result = await db_session.execute(select(models.User).where(models.User.username == username))
+    return result.scalars().first()
+
 @router.post("/signup")
-def signup(user: UserCreate, db_session: Session = Depends(db.get_db)):
-    existing = db_session.query(models.User).filter(models.User.username == user.username).first()
+async def signup(user: UserCreate, db_session: AsyncSession = Depends(db.get_async_db)):
+    existing = await _find_user(db_session, user.username)
     if existing:
         raise HTTPException(status_code=400, detail="Username already exists")
     new_user = models.User(username=user.username, email=user.email, password=user.password)
     db_session.add(new_user)
-    db_session.commit()
+    await db_session.commit()
     return {"msg": "User created successfully"}
 
 @router.post("/login")
-def login(user: UserLogin, db_session: Session = Depends(db.get_db)):
-    db_user = db_session.query(models.User).filter(models.User.username == user.username).first()
+async def login(user: UserLogin, db_session: AsyncSession = Depends(db.get_async_db)):
+    db_user = await _find_user(db_session, user.username)
     if not db_user or db_user.password != user.password:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     token = create_access_token({"sub": db_user.username})
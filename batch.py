@@ -0,0 +1,163 @@
+# webscan/batch.py
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Iterable, Optional
+from .check_batch import CheckBatch, require_arrow
+from .domains import extract_domains
+from .utils import normalize_url
+from .scanner import scan_single_async
+from .fetchers.pool import run_sync
+from .politeness import DEFAULT_PER_HOST, DEFAULT_IP_RATE, PoliteScheduler
+
+DEFAULT_CONCURRENCY = 200
+
+def read_urls(source):
+    """Yield URLs from a file path or an iterable, skipping blanks and # comments."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as fh:
+            yield from read_urls(fh)
+        return
+    for line in source:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+def load_checkpoint(path: Optional[str]) -> set:
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as fh:
+        return {line.strip() for line in fh if line.strip()}
+
+async def scan_many_async(urls: Iterable[str], config: dict, stats: Optional[dict] = None):
+    """
+    Scan many URLs through a bounded worker pool and yield (domain, checks, artifacts)
+    as each scan finishes, in completion order.
+
+    config["batch_concurrency"]: max scans in flight overall
+    config["per_host_concurrency"]: max scans in flight per registrable domain
+    config["per_domain_rate"], config["per_ip_rate"], ...: politeness limits per
+        registrable domain and per resolved address (politeness.py). Queued URLs
+        are started out of order, within a look-ahead of config["schedule_window"]
+        (default 4 x batch_concurrency), so a throttled host doesn't stall the rest.
+    config["resume_path"]: checkpoint file; finished URLs are appended to it and
+        skipped on the next run. Failed scans are not checkpointed so they retry.
+    stats: optional dict updated in place with completed/failed/skipped counts and
+        domains_per_second.
+    """
+    concurrency = config.get("batch_concurrency", DEFAULT_CONCURRENCY)
+    window = config.get("schedule_window") or concurrency * 4
+    resume_path = config.get("resume_path")
+    done_urls = load_checkpoint(resume_path)
+    checkpoint = open(resume_path, "a", encoding="utf-8") if resume_path else None
+
+    stats = stats if stats is not None else {}
+    stats.update({"completed": 0, "failed": 0, "skipped": 0, "domains_per_second": 0.0})
+    start = time.monotonic()
+
+    source = iter(read_urls(urls))
+    scheduler = PoliteScheduler(config)
+    in_flight = {}                  # task -> (url, host, groups)
+
+    async def refill():
+        # Top the look-ahead window up in one go so its DNS lookups run together
+        urls = []
+        for raw in source:
+            url = normalize_url(raw)
+            if url in done_urls:
+                stats["skipped"] += 1
+                continue
+            urls.append(url)
+            if len(scheduler) + len(urls) >= window:
+                break
+        await scheduler.add(zip(urls, extract_domains(urls)))
+        return bool(urls)
+
+    try:
+        more = True
+        while True:
+            if more and len(scheduler) <= window // 2:
+                more = await refill()
+            wake = None
+            while len(in_flight) < concurrency:
+                item, wake = scheduler.pop_ready()
+                if item is None:
+                    break
+                in_flight[asyncio.ensure_future(scan_single_async(item[0], config))] = item
+            if not in_flight:
+                if not len(scheduler) and not more:
+                    break
+                # Everything queued is waiting on a rate limit
+                await asyncio.sleep(wake or 0)
+                continue
+
+            finished, _ = await asyncio.wait(in_flight, timeout=wake, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                item = in_flight.pop(task)
+                url, host, _ = item
+                try:
+                    domain, checks, artifacts = task.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    domain, checks, artifacts = host, [], {"url": url, "error": str(e)}
+                    scheduler.finish(item)
+                else:
+                    scheduler.finish(item, artifacts)
+                    stats["completed"] += 1
+                    if checkpoint:
+                        checkpoint.write(url + "\n")
+                        checkpoint.flush()
+                elapsed = time.monotonic() - start
+                stats["domains_per_second"] = (stats["completed"] + stats["failed"]) / elapsed if elapsed else 0.0
+                yield domain, checks, artifacts
+    finally:
+        for task in in_flight:
+            task.cancel()
+        if checkpoint:
+            checkpoint.close()
+
+def scan_many(urls: Iterable[str], config: dict, stats: Optional[dict] = None):
+    """Sync generator over scan_many_async; scans run on the shared fetcher loop."""
+    agen = scan_many_async(urls, config, stats)
+    try:
+        while True:
+            try:
+                yield run_sync(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_sync(agen.aclose())
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk-scan a file of URLs, one per line")
+    ap.add_argument("urls_file")
+    ap.add_argument("--resume", help="checkpoint file for resuming a partial batch")
+    ap.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    ap.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST)
+    ap.add_argument("--per-ip-rate", type=float, default=DEFAULT_IP_RATE,
+                    help="scan starts per second against one resolved address (0: unlimited)")
+    ap.add_argument("--cpu-workers", type=int, default=os.cpu_count() or 1,
+                    help="processes for parsing and content checks (0: in-process)")
+    ap.add_argument("--profile", help="check profile, e.g. headers or fast (default: every check)")
+    ap.add_argument("--parquet", help="also write every check result to this Parquet file (needs pyarrow)")
+    args = ap.parse_args()
+
+    config = {"batch_concurrency": args.concurrency, "per_host_concurrency": args.per_host,
+              "per_ip_rate": args.per_ip_rate, "resume_path": args.resume,
+              "check_profile": args.profile, "cpu_workers": args.cpu_workers}
+    stats = {}
+    if args.parquet:
+        require_arrow()   # fail before scanning, not after
+    results = CheckBatch() if args.parquet else None
+    for domain, checks, artifacts in scan_many(args.urls_file, config, stats):
+        if results is not None:
+            results.add_scan(domain, checks)
+        print(json.dumps({"domain": domain, "checks": len(checks), "error": artifacts.get("error"),
+                          "domains_per_second": round(stats["domains_per_second"], 2)}))
+    if results is not None:
+        results.write_parquet(args.parquet)
+
+if __name__ == "__main__":
+    main()
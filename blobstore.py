@@ -0,0 +1,321 @@
+# webscan/blobstore.py
+import argparse
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content-addressed artifact store. Each blob (page body, WHOIS text, cert,
+# headers, ...) is stored once, compressed, under the SHA-256 of its raw bytes,
+# however many runs and domains reference it. A small SQLite index maps runs to
+# the blobs they reference; gc() expires old runs and deletes blobs no run
+# references any more.
+#
+# Layout: <root>/blobs/<2 hex>/<sha256>.zst (or .zz when zstandard isn't
+# installed and zlib is used instead), <root>/index.db
+
+CHUNK_SIZE = 64 * 1024
+GC_GRACE_SECONDS = 3600   # blobs this new may not be indexed yet; gc leaves them
+
+class _ZlibReader(io.RawIOBase):
+    """Streaming decompression of a zlib file, for codecs without a stream reader."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self._z = zlib.decompressobj()
+        self._buf = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf:
+            chunk = self._fh.read(CHUNK_SIZE)
+            if not chunk:
+                self._buf = self._z.flush()
+                break
+            self._buf = self._z.decompress(chunk)
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+    def close(self):
+        self._fh.close()
+        super().close()
+
+class BlobStore:
+    def __init__(self, root: str, level: int = 3):
+        self.root = root
+        self.level = level
+        self._blob_dir = os.path.join(root, "blobs")
+        self._tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self._blob_dir, exist_ok=True)
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs(
+                run_id TEXT PRIMARY KEY,
+                domain TEXT,
+                created_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS run_blobs(
+                run_id TEXT,
+                name TEXT,
+                sha256 TEXT,
+                size INTEGER,
+                PRIMARY KEY (run_id, name)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_run_blobs_sha ON run_blobs(sha256)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_domain ON runs(domain, created_at)")
+
+    # --- Blobs ---
+
+    def _path(self, sha256: str, ext: str) -> str:
+        return os.path.join(self._blob_dir, sha256[:2], sha256 + ext)
+
+    def _find(self, sha256: str):
+        for ext in (".zst", ".zz"):
+            path = self._path(sha256, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def exists(self, sha256: str) -> bool:
+        return self._find(sha256) is not None
+
+    def put(self, data: bytes):
+        """Store bytes; returns (sha256, size)."""
+        return self.put_stream([data])
+
+    def put_stream(self, chunks):
+        """
+        Store an iterable of byte chunks, compressing as they arrive so the
+        whole blob is never in memory. Returns (sha256, size).
+        """
+        digest, size = hashlib.sha256(), 0
+        fd, tmp = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                if zstandard is not None:
+                    ext = ".zst"
+                    with zstandard.ZstdCompressor(level=self.level).stream_writer(fh, closefd=False) as writer:
+                        for chunk in chunks:
+                            digest.update(chunk)
+                            size += len(chunk)
+                            writer.write(chunk)
+                else:
+                    ext = ".zz"
+                    z = zlib.compressobj(6)
+                    for chunk in chunks:
+                        digest.update(chunk)
+                        size += len(chunk)
+                        fh.write(z.compress(chunk))
+                    fh.write(z.flush())
+            sha256 = digest.hexdigest()
+            existing = self._find(sha256)
+            if existing is not None:
+                # Already stored by an earlier run. Touch it so gc's grace
+                # period covers it until this run's add_run indexes it.
+                try:
+                    os.utime(existing)
+                    os.unlink(tmp)
+                    return sha256, size
+                except FileNotFoundError:
+                    pass   # gc deleted it just now; store this copy instead
+            os.makedirs(os.path.dirname(self._path(sha256, ext)), exist_ok=True)
+            os.replace(tmp, self._path(sha256, ext))
+            return sha256, size
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def open(self, sha256: str):
+        """A binary file-like object streaming the decompressed blob."""
+        path = self._find(sha256)
+        if path is None:
+            raise KeyError(sha256)
+        fh = open(path, "rb")
+        if path.endswith(".zst"):
+            if zstandard is None:
+                fh.close()
+                raise RuntimeError("zstandard is required to read " + path)
+            return zstandard.ZstdDecompressor().stream_reader(fh, closefd=True)
+        return io.BufferedReader(_ZlibReader(fh))
+
+    def iter_chunks(self, sha256: str, chunk_size: int = CHUNK_SIZE):
+        with self.open(sha256) as fh:
+            while True:
+                chunk = fh.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def get(self, sha256: str) -> bytes:
+        # Whole blob in memory; prefer open()/iter_chunks() for large bodies
+        return b"".join(self.iter_chunks(sha256))
+
+    # --- Index ---
+
+    def add_run(self, run_id, domain: str, blobs: dict, created_at: float | None = None):
+        """blobs: {name: (sha256, size)} for blobs already stored with put/put_stream."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO runs(run_id, domain, created_at) VALUES(?,?,?)",
+                                   (str(run_id), domain, created_at or time.time()))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO run_blobs(run_id, name, sha256, size) VALUES(?,?,?,?)",
+                    [(str(run_id), name, sha256, size) for name, (sha256, size) in blobs.items()]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def run_blobs(self, run_id) -> dict:
+        """{name: sha256} for one run."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, sha256 FROM run_blobs WHERE run_id=?", (str(run_id),)).fetchall()
+        return dict(rows)
+
+    def latest_blob(self, domain: str, name: str):
+        """(sha256, size) of the newest run's blob called name for domain, or None."""
+        with self._lock:
+            return self._conn.execute("""
+                SELECT b.sha256, b.size FROM runs r JOIN run_blobs b ON b.run_id = r.run_id
+                WHERE r.domain=? AND b.name=? ORDER BY r.created_at DESC LIMIT 1
+            """, (domain, name)).fetchone()
+
+    def _referenced(self, sha256: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM run_blobs WHERE sha256=? LIMIT 1", (sha256,)).fetchone() is not None
+
+    def gc(self, max_age_seconds: float, keep_latest: bool = True) -> dict:
+        """
+        Forget runs older than max_age_seconds (except each domain's newest run
+        when keep_latest), then delete blobs no remaining run references and
+        temp files left by failed puts. Anything touched within
+        GC_GRACE_SECONDS is kept.
+        """
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = [r[0] for r in self._conn.execute("""
+                    SELECT run_id FROM runs r WHERE created_at < ?
+                """ + ("""AND created_at < (SELECT MAX(created_at) FROM runs WHERE domain = r.domain)"""
+                       if keep_latest else ""), (cutoff,))]
+                self._conn.executemany("DELETE FROM run_blobs WHERE run_id=?", [(r,) for r in expired])
+                self._conn.executemany("DELETE FROM runs WHERE run_id=?", [(r,) for r in expired])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        deleted, freed, grace = 0, 0, time.time() - GC_GRACE_SECONDS
+        # Temp files of puts that died before renaming them into place
+        for filename in os.listdir(self._tmp_dir):
+            path = os.path.join(self._tmp_dir, filename)
+            try:
+                if os.stat(path).st_mtime <= grace:
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+        for shard in os.listdir(self._blob_dir):
+            shard_dir = os.path.join(self._blob_dir, shard)
+            for filename in os.listdir(shard_dir):
+                path = os.path.join(shard_dir, filename)
+                sha256 = filename.split(".", 1)[0]
+                stat = os.stat(path)
+                if stat.st_mtime > grace or self._referenced(sha256):
+                    continue
+                # Move the blob aside first: a put() that finds it from here on
+                # stores its own copy, and one that found it before has touched
+                # it (or gets FileNotFoundError from utime and stores a copy too)
+                tombstone = os.path.join(self._tmp_dir, filename + ".gc")
+                try:
+                    os.rename(path, tombstone)
+                except FileNotFoundError:
+                    continue
+                if self._referenced(sha256) or os.stat(tombstone).st_mtime > grace:
+                    try:
+                        os.link(tombstone, path)
+                    except FileExistsError:
+                        pass   # a put() stored the same bytes again meanwhile
+                    os.unlink(tombstone)
+                    continue
+                os.unlink(tombstone)
+                deleted += 1
+                freed += stat.st_size
+        return {"expired_runs": len(expired), "deleted_blobs": deleted, "freed_bytes": freed}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_blob_store(config: dict):
+    """Shared store at config["artifact_store"] (a directory), or None if unset."""
+    root = config.get("artifact_store")
+    if not root:
+        return None
+    with _stores_lock:
+        if root not in _stores:
+            _stores[root] = BlobStore(root, config.get("artifact_compression_level", 3))
+        return _stores[root]
+
+def json_bytes(obj) -> bytes:
+    # Compact and key-sorted, so equal content hashes (and dedupes) the same
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+
+def store_scan_artifacts(store: BlobStore, domain: str, artifacts: dict) -> dict:
+    """
+    Put a scan's bulky artifacts in the store; returns {name: (sha256, size)}
+    for BlobStore.add_run once the run has an id. An unchanged page (304)
+    has no body, so the run points at the previous run's.
+    """
+    blobs = {}
+    html = artifacts.get("html")
+    if html is not None:
+        blobs["html"] = store.put(html.encode("utf-8"))
+    elif artifacts.get("unchanged"):
+        previous = store.latest_blob(domain, "html")
+        if previous:
+            blobs["html"] = tuple(previous)
+    whois = artifacts.get("whois") or {}
+    if whois.get("raw"):
+        blobs["whois"] = store.put(whois["raw"].encode("utf-8"))
+    if artifacts.get("cert"):
+        blobs["cert"] = store.put(json_bytes(artifacts["cert"]))
+    blobs["report"] = store.put(json_bytes({
+        "status_code": artifacts.get("status_code"), "headers": artifacts.get("headers"),
+        "dns": artifacts.get("dns"), "whois": {k: v for k, v in whois.items() if k != "raw"},
+        "perf": artifacts.get("perf"), "timings": artifacts.get("timings"),
+    }))
+    return blobs
+
+def main():
+    ap = argparse.ArgumentParser(description="Garbage-collect the artifact store")
+    ap.add_argument("root", help="artifact store directory")
+    ap.add_argument("--max-age-days", type=float, default=90, help="forget runs older than this")
+    ap.add_argument("--all", action="store_true", help="also expire each domain's newest run")
+    args = ap.parse_args()
+    print(json.dumps(BlobStore(args.root).gc(args.max_age_days * 86400, keep_latest=not args.all)))
+
+if __name__ == "__main__":
+    main()
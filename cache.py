@@ -0,0 +1,149 @@
+# webscan/cache.py
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dateutil import parser
+
+# TTL cache for slow, rarely-changing lookups (WHOIS, DNS, certificates) shared
+# across scans. Values must be JSON-serialisable so both backends behave alike.
+# DNS entries use the record TTLs reported by fetchers.dns.
+
+MISS = object()
+
+WHOIS_TTL = 2 * 86400        # WHOIS changes rarely and is rate-limited upstream
+CERT_EXPIRY_MARGIN = 86400   # stop serving a cached cert a day before not_after
+CERT_MAX_TTL = 7 * 86400     # and re-check weekly anyway to notice renewals
+
+class _Stats:
+    def __init__(self):
+        self.counts = {}
+
+    def record(self, kind, hit):
+        c = self.counts.setdefault(kind, {"hits": 0, "misses": 0})
+        c["hits" if hit else "misses"] += 1
+
+class MemoryCache:
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = _Stats()
+
+    def get(self, kind: str, key: str):
+        with self._lock:
+            entry = self._data.get((kind, key))
+            if entry is not None and entry[1] > time.time():
+                self._data.move_to_end((kind, key))
+                self._stats.record(kind, True)
+                return entry[0]
+            if entry is not None:
+                del self._data[(kind, key)]
+            self._stats.record(kind, False)
+            return MISS
+
+    def set(self, kind: str, key: str, value, ttl: float):
+        with self._lock:
+            self._data[(kind, key)] = (value, time.time() + ttl)
+            self._data.move_to_end((kind, key))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.counts.items()}
+
+class SQLiteCache:
+    """SQLite-backed cache, shared by every process pointing at the same file."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache(
+                kind TEXT,
+                key TEXT,
+                value TEXT,
+                expires_at REAL,
+                PRIMARY KEY (kind, key)
+            )
+        """)
+        self._lock = threading.Lock()
+        self._stats = _Stats()
+        self._writes = 0
+
+    def get(self, kind: str, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE kind=? AND key=? AND expires_at>?", (kind, key, time.time())
+            ).fetchone()
+            self._stats.record(kind, row is not None)
+        return json.loads(row[0]) if row else MISS
+
+    def set(self, kind: str, key: str, value, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache(kind, key, value, expires_at) VALUES(?,?,?,?)",
+                (kind, key, json.dumps(value, default=str), now + ttl)
+            )
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                self._conn.execute("DELETE FROM cache WHERE expires_at<=?", (now,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.counts.items()}
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_cache(config: dict):
+    """
+    Shared cache selected by config["cache"]: "memory" (default), "sqlite:<path>",
+    or None/"none" to disable caching.
+    """
+    spec = config.get("cache", "memory")
+    if not spec or spec == "none":
+        return None
+    with _caches_lock:
+        if spec not in _caches:
+            if spec == "memory":
+                _caches[spec] = MemoryCache(config.get("cache_max_entries", 100_000))
+            elif spec.startswith("sqlite:"):
+                _caches[spec] = SQLiteCache(spec[len("sqlite:"):])
+            else:
+                raise ValueError(f"Unknown cache backend: {spec}")
+        return _caches[spec]
+
+async def cached(cache, kind: str, key: str, fetch, ttl_for):
+    """
+    Return the cached value for (kind, key) or await fetch() and cache its result
+    for ttl_for(result) seconds. A TTL of None or <= 0 leaves the result uncached.
+    """
+    if cache is None:
+        return await fetch()
+    value = cache.get(kind, key)
+    if value is not MISS:
+        return value
+    value = await fetch()
+    ttl = ttl_for(value)
+    if ttl and ttl > 0:
+        cache.set(kind, key, value, ttl)
+    return value
+
+def whois_ttl(whois_data):
+    # Don't remember failures; they're usually upstream rate limiting
+    return None if not whois_data or whois_data.get("error") else WHOIS_TTL
+
+def cert_ttl(cert_info):
+    if not cert_info:
+        return None
+    try:
+        not_after = parser.isoparse(cert_info["not_after"]).timestamp()
+    except Exception:
+        return None
+    return min(not_after - CERT_EXPIRY_MARGIN - time.time(), CERT_MAX_TTL)
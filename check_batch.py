@@ -0,0 +1,119 @@
+# webscan/check_batch.py
+from array import array
+from typing import Iterable, Optional
+from .models import CheckResult
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Columnar check results for one scan or a whole batch. Each column stores a
+# small integer code per row into a dictionary of distinct strings, so the
+# ~120 results a scan produces (mostly the same categories, names, statuses
+# and stub details every time) cost a few bytes each instead of an object
+# apiece. Scans are contiguous row ranges, like Arrow list offsets.
+
+COLUMNS = ("category", "name", "status", "value", "details")
+# Code arrays start at one byte per row and widen as a dictionary grows
+_WIDER = {"B": ("H", 0xFF), "H": ("I", 0xFFFF), "I": ("Q", 0xFFFFFFFF)}
+
+def require_arrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Arrow/Parquet export")
+
+class _Dictionary:
+    """Distinct values of one column; code 0 is None."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values = [None]
+        self._codes = {None: 0}
+
+    def encode(self, value) -> int:
+        if value is not None and not isinstance(value, str):
+            # Columns hold strings (Arrow string dictionaries); this also keeps
+            # 1, 1.0 and True apart, which are one dict key
+            value = str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+class CheckBatch:
+    def __init__(self):
+        self.domains = []                 # one per scan
+        self.offsets = array("I", [0])    # scan i is rows offsets[i]:offsets[i + 1]
+        self.dictionaries = {c: _Dictionary() for c in COLUMNS}
+        self.codes = {c: array("B") for c in COLUMNS}
+
+    @classmethod
+    def from_checks(cls, checks: Iterable[CheckResult], domain: Optional[str] = None) -> "CheckBatch":
+        batch = cls()
+        batch.add_scan(domain, checks)
+        return batch
+
+    def add_scan(self, domain: Optional[str], checks: Iterable[CheckResult]):
+        for c in checks:
+            for column in COLUMNS:
+                code = self.dictionaries[column].encode(getattr(c, column))
+                codes = self.codes[column]
+                wider, limit = _WIDER[codes.typecode]
+                if code > limit:
+                    codes = self.codes[column] = array(wider, codes)
+                codes.append(code)
+        self.domains.append(domain)
+        self.offsets.append(len(self.codes["name"]))
+
+    def extend(self, other: "CheckBatch"):
+        for i, domain in enumerate(other.domains):
+            self.add_scan(domain, other.scan(i))
+
+    def __len__(self):
+        return len(self.codes["name"])
+
+    def __getitem__(self, row: int) -> CheckResult:
+        return CheckResult(*(self.dictionaries[c].values[self.codes[c][row]] for c in COLUMNS))
+
+    def __iter__(self):
+        values = [self.dictionaries[c].values for c in COLUMNS]
+        for codes in zip(*(self.codes[c] for c in COLUMNS)):
+            yield CheckResult(*(v[code] for v, code in zip(values, codes)))
+
+    def scan(self, i: int) -> list[CheckResult]:
+        return [self[row] for row in range(self.offsets[i], self.offsets[i + 1])]
+
+    def scans(self):
+        """(domain, [CheckResult]) per scan, in insertion order."""
+        for i, domain in enumerate(self.domains):
+            yield domain, self.scan(i)
+
+    def column(self, name: str) -> list:
+        values = self.dictionaries[name].values
+        return [values[code] for code in self.codes[name]]
+
+    def domain_column(self) -> list:
+        return [domain for i, domain in enumerate(self.domains)
+                for _ in range(self.offsets[i + 1] - self.offsets[i])]
+
+    def rows(self):
+        """(domain, category, name, status, value, details) tuples, e.g. for executemany."""
+        return zip(self.domain_column(), *(self.column(c) for c in COLUMNS))
+
+    def to_pydict(self) -> dict:
+        return {"domain": self.domain_column(), **{c: self.column(c) for c in COLUMNS}}
+
+    def to_arrow(self):
+        """A pyarrow Table with dictionary-encoded columns, built from the codes without decoding."""
+        require_arrow()
+        columns = {"domain": pa.array(self.domain_column(), pa.string()).dictionary_encode()}
+        for c in COLUMNS:
+            # Code 0 (None) becomes a null index
+            indices = pa.array(self.codes[c], pa.uint32(), mask=[code == 0 for code in self.codes[c]])
+            columns[c] = pa.DictionaryArray.from_arrays(indices, pa.array(self.dictionaries[c].values, pa.string()))
+        return pa.table(columns)
+
+    def write_parquet(self, path: str):
+        pq.write_table(self.to_arrow(), path)
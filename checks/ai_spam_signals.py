@@ -1,8 +1,9 @@
 from ..models import CheckResult
+from ..fetchers.content import Document
 
-def run(text: str) -> list[CheckResult]:
+def run(parsed: Document) -> list[CheckResult]:
     results = []
-    words = text.split()
+    words = parsed.tokens
     uniq_ratio = (len(set(words)) / max(len(words), 1)) if words else 1.0
 
     # 77 AI-generated content ratio (stub heuristic)
@@ -1,17 +1,17 @@
-from bs4 import BeautifulSoup
 from ..models import CheckResult
+from ..fetchers.content import Document
 
-def run(url: str, html: str | None) -> list[CheckResult]:
+def run(url: str, doc: Document) -> list[CheckResult]:
     results = []
-    soup = BeautifulSoup(html or "", "html.parser")
+    html = doc.lower_html
     # 55 Directory listing enabled (heuristic on title)
-    title = soup.title.string.lower() if soup.title and soup.title.string else ""
+    title = doc.title.lower() if doc.title else ""
     dir_listing = "index of /" in title
     results.append(CheckResult("BASIC SECURITY POSTURE", "Directory listing enabled", "WARN" if dir_listing else "PASS", str(dir_listing), None))
 
     # 56 Admin panel exposed (basic heuristic)
     admin_paths = ["/admin", "/administrator", "/wp-admin", "/login"]
-    exposed = any(p in (html or "").lower() for p in ["wp-admin", "administrator"])
+    exposed = any(p in html for p in ["wp-admin", "administrator"])
     results.append(CheckResult("BASIC SECURITY POSTURE", "Admin panel exposed", "WARN" if exposed else "PASS", str(exposed), "Heuristic"))
 
     # 57 Common backup files exposed (stub)
@@ -33,7 +33,7 @@ def run(url: str, html: str | None) -> list[CheckResult]:
     results.append(CheckResult("BASIC SECURITY POSTURE", "CAPTCHA presence", "INFO", None, "Not implemented"))
 
     # 63 CMS detection (basic heuristic)
-    cms = "wordpress" if "wp-content" in (html or "").lower() else None
+    cms = "wordpress" if "wp-content" in html else None
     results.append(CheckResult("BASIC SECURITY POSTURE", "CMS detection", "INFO", cms, None))
 
     # 64 CMS version exposure (stub)
@@ -1,16 +1,17 @@
 from ..models import CheckResult
+from ..fetchers.content import Document
 
-def run(parsed: dict, text: str) -> list[CheckResult]:
+def run(parsed: Document) -> list[CheckResult]:
     results = []
-    links = parsed.get("links") or []
-    lower_text = text.lower()
+    link_hits = parsed.keywords("legal_links", "links")
+    text_hits = parsed.keywords("legal_text")
 
     # 113 Privacy policy presence
-    has_privacy = any("privacy" in (l or "").lower() for l in links) or ("privacy policy" in lower_text)
+    has_privacy = bool(link_hits.get("privacy") or text_hits.get("privacy policy"))
     results.append(CheckResult("COMPLIANCE & LEGAL", "Privacy policy presence", "PASS" if has_privacy else "WARN", str(has_privacy), None))
 
     # 114 Terms of service presence
-    has_terms = any("terms" in (l or "").lower() for l in links) or ("terms of service" in lower_text)
+    has_terms = bool(link_hits.get("terms") or text_hits.get("terms of service"))
     results.append(CheckResult("COMPLIANCE & LEGAL", "Terms of service presence", "PASS" if has_terms else "WARN", str(has_terms), None))
 
     # 115 Cookie consent banner (stub; needs screenshot/JS eval)
@@ -20,7 +21,7 @@ def run(parsed: dict, text: str) -> list[CheckResult]:
     results.append(CheckResult("COMPLIANCE & LEGAL", "GDPR signals", "INFO", None, "Not implemented"))
 
     # 117 Contact information validity (heuristic)
-    has_contact = any("contact" in (l or "").lower() for l in links) or ("contact us" in lower_text)
+    has_contact = bool(link_hits.get("contact") or text_hits.get("contact us"))
     results.append(CheckResult("COMPLIANCE & LEGAL", "Contact information validity", "INFO", str(has_contact), "Heuristic"))
 
     # 118 Business address consistency (stub)
@@ -19,14 +19,27 @@ def run(domain: str, dns_data: dict) -> list[CheckResult]:
     spf = any("v=spf1" in txt.lower() for txt in dns_data.get("TXT", []))
     results.append(CheckResult("DNS & NETWORK", "SPF record", "INFO", str(spf), None))
 
-    # 20 DKIM record (basic heuristic on common selector, stub)
-    dkim = any("dkim" in txt.lower() for txt in dns_data.get("TXT", []))
-    results.append(CheckResult("DNS & NETWORK", "DKIM record", "INFO", str(dkim), "Selector-based check not implemented"))
+    # 20 DKIM record (common selectors probed by fetchers.dns; others can't be discovered)
+    selectors = dns_data.get("DKIM", [])
+    if selectors:
+        results.append(CheckResult("DNS & NETWORK", "DKIM record", "PASS", "True", f"Selectors: {', '.join(selectors)}"))
+    else:
+        results.append(CheckResult("DNS & NETWORK", "DKIM record", "WARN" if has_mx else "INFO", "False",
+                                   "No key at the common selectors"))
 
-    # 21 DMARC policy
-    dmarc_present = False
-    # In V0, we don't query _dmarc subdomain to avoid complexity; mark stub
-    results.append(CheckResult("DNS & NETWORK", "DMARC policy", "INFO", str(dmarc_present), "Not implemented"))
+    # 21 DMARC policy (_dmarc TXT)
+    dmarc = dns_data.get("DMARC", [])
+    policy = None
+    if dmarc:
+        tags = dict(tag.strip().split("=", 1) for tag in dmarc[0].split(";") if "=" in tag)
+        policy = tags.get("p", "").strip().lower() or None
+    if policy in ("quarantine", "reject"):
+        results.append(CheckResult("DNS & NETWORK", "DMARC policy", "PASS", policy, dmarc[0]))
+    elif policy:
+        results.append(CheckResult("DNS & NETWORK", "DMARC policy", "WARN", policy, "Policy only monitors, nothing is enforced"))
+    else:
+        results.append(CheckResult("DNS & NETWORK", "DMARC policy", "WARN" if has_mx else "INFO", None,
+                                   "No DMARC record" if not dmarc else "DMARC record has no policy"))
 
     # 22 CDN usage (stub)
     results.append(CheckResult("DNS & NETWORK", "CDN usage", "INFO", None, "Not implemented"))
@@ -40,8 +53,15 @@ def run(domain: str, dns_data: dict) -> list[CheckResult]:
     # 25 IP blacklist presence (stub)
     results.append(CheckResult("DNS & NETWORK", "IP blacklist presence", "INFO", None, "Not implemented"))
 
-    # 26 Reverse DNS validity (stub per IP)
-    results.append(CheckResult("DNS & NETWORK", "Reverse DNS validity", "INFO", None, "Not implemented"))
+    # 26 Reverse DNS validity (PTR for the first few addresses)
+    ptr = dns_data.get("PTR", {})
+    if ptr:
+        missing = [ip for ip, names in ptr.items() if not names]
+        results.append(CheckResult("DNS & NETWORK", "Reverse DNS validity", "WARN" if missing else "PASS",
+                                   f"{len(ptr) - len(missing)}/{len(ptr)}",
+                                   f"No PTR for {', '.join(missing)}" if missing else None))
+    else:
+        results.append(CheckResult("DNS & NETWORK", "Reverse DNS validity", "INFO", None, "No addresses"))
 
     # 27 DNS misconfiguration (basic)
     misconfig = (a_count == 0 and len(dns_data.get("AAAA", [])) == 0)
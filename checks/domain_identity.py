@@ -1,8 +1,32 @@
 from datetime import datetime
 from dateutil import parser
+from ..domains import extract, scripts, skeleton, to_ascii, to_unicode
 from ..models import CheckResult
 
-def run(whois_data) -> list[CheckResult]:
+def _idn_homograph(domain):
+    if not domain:
+        return CheckResult("DOMAIN & IDENTITY", "IDN homograph risk", "INFO", None, "No domain")
+    ascii_form = to_ascii(domain)
+    unicode_form = to_unicode(ascii_form)
+    if unicode_form == ascii_form:
+        return CheckResult("DOMAIN & IDENTITY", "IDN homograph risk", "PASS", ascii_form, "Not an IDN")
+    label = extract(unicode_form).domain or unicode_form
+    lookalike = skeleton(label)
+    found = scripts(label)
+    if lookalike != label and lookalike.isascii():
+        # Reads as a plain Latin name. That's the classic spoof unless the TLD
+        # is in the label's own script (москва.рф), where browsers show it too
+        if not found <= scripts(unicode_form.rsplit(".", 1)[-1]):
+            return CheckResult("DOMAIN & IDENTITY", "IDN homograph risk", "FAIL", unicode_form,
+                               f"{ascii_form} looks like {lookalike}")
+        return CheckResult("DOMAIN & IDENTITY", "IDN homograph risk", "WARN", unicode_form,
+                           f"{ascii_form} could be read as {lookalike}")
+    if "LATIN" in found and len(found) > 1:
+        return CheckResult("DOMAIN & IDENTITY", "IDN homograph risk", "WARN", unicode_form,
+                           f"{ascii_form} mixes {', '.join(sorted(found))} scripts")
+    return CheckResult("DOMAIN & IDENTITY", "IDN homograph risk", "INFO", unicode_form, ascii_form)
+
+def run(whois_data, domain=None) -> list[CheckResult]:
     results = []
 
     # 1 Domain age
@@ -45,11 +69,14 @@ def run(whois_data) -> list[CheckResult]:
     privacy = any("privacy" in str(e).lower() or "protect" in str(e).lower() for e in emails)
     results.append(CheckResult("DOMAIN & IDENTITY", "WHOIS privacy enabled", "INFO", str(privacy), None))
 
-    # 7-15 stubs
+    # 7-14 stubs (10 Nameserver change history: see checks/history.py)
     for name in [
         "WHOIS email change", "WHOIS name change", "Nameserver count",
-        "Nameserver change history", "DNSSEC enabled", "DNS TTL values",
-        "Parked domain detection", "Suspicious registrar country", "IDN homograph risk"
+        "DNSSEC enabled", "DNS TTL values",
+        "Parked domain detection", "Suspicious registrar country"
     ]:
         results.append(CheckResult("DOMAIN & IDENTITY", name, "INFO", None, "Not implemented"))
+
+    # 15 IDN homograph risk
+    results.append(_idn_homograph(domain))
     return results
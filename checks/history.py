@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+from ..models import CheckResult
+
+# Checks that compare this scan with the previous one. They read the small
+# per-domain scan state (scan_state.py), not the page, so they still run when
+# an unchanged page skips parsing and the content checks.
+
+SIZE_CHANGE_RATIO = 0.5        # page grew or shrank by more than half
+TITLE_CHANGE_WINDOW_DAYS = 30
+TITLE_CHANGES_WARN = 3         # title changes within the window
+
+def run(state: dict, previous: dict | None) -> list[CheckResult]:
+    results = []
+    if previous is None:
+        for category, name in [
+            ("CONTENT INTEGRITY", "Sudden content size change"),
+            ("SEO & SEARCH TRUST", "Meta title change frequency"),
+            ("DOMAIN & IDENTITY", "Nameserver change history"),
+            ("PERFORMANCE & AVAILABILITY", "HTTP response code history"),
+        ]:
+            results.append(CheckResult(category, name, "INFO", None, "No previous scan"))
+        return results
+
+    # 66 Sudden content size change
+    size, prev_size = state.get("content_length"), previous.get("content_length")
+    if size is not None and prev_size:
+        change = (size - prev_size) / prev_size
+        status = "WARN" if abs(change) > SIZE_CHANGE_RATIO else "PASS"
+        results.append(CheckResult("CONTENT INTEGRITY", "Sudden content size change", status, f"{change:+.0%}",
+                                   f"{prev_size} -> {size} bytes"))
+    else:
+        results.append(CheckResult("CONTENT INTEGRITY", "Sudden content size change", "INFO", None, "No content to compare"))
+
+    # 85 Meta title change frequency
+    cutoff = (datetime.utcnow() - timedelta(days=TITLE_CHANGE_WINDOW_DAYS)).isoformat()
+    recent = [t for t in state.get("title_changes", []) if t >= cutoff]
+    status = "WARN" if len(recent) >= TITLE_CHANGES_WARN else "PASS"
+    results.append(CheckResult("SEO & SEARCH TRUST", "Meta title change frequency", status, str(len(recent)),
+                               f"Changes in the last {TITLE_CHANGE_WINDOW_DAYS} days"))
+
+    # 10 Nameserver change history
+    ns, prev_ns = state.get("nameservers") or [], previous.get("nameservers") or []
+    changed = bool(ns and prev_ns and ns != prev_ns)
+    results.append(CheckResult("DOMAIN & IDENTITY", "Nameserver change history", "WARN" if changed else "PASS", str(changed),
+                               f"{', '.join(prev_ns)} -> {', '.join(ns)}" if changed else state.get("nameservers_changed_at")))
+
+    # 97 HTTP response code history
+    codes = [c for c in state.get("status_codes", []) if c is not None]
+    errors = sum(1 for c in codes if c >= 400)
+    status = "WARN" if codes and errors * 2 > len(codes) else "PASS"
+    results.append(CheckResult("PERFORMANCE & AVAILABILITY", "HTTP response code history", status,
+                               ",".join(map(str, codes[-5:])), f"{errors}/{len(codes)} error responses"))
+    return results
@@ -6,16 +6,19 @@ def run(perf: dict) -> list[CheckResult]:
     code = perf.get("status_code")
     redirects = perf.get("redirects", 0)
 
-    # 97 HTTP response code history (stub)
-    results.append(CheckResult("PERFORMANCE & AVAILABILITY", "HTTP response code history", "INFO", None, "Not implemented"))
+    # 97 HTTP response code history: see checks/history.py
 
     # 98 Redirect loops
     loop = redirects > 5
     results.append(CheckResult("PERFORMANCE & AVAILABILITY", "Redirect loops", "WARN" if loop else "PASS", str(redirects), None))
 
-    # 99 Average response time (single sample)
+    # 99 Average response time (single sample unless latency_samples > 1)
     status = "WARN" if ms and ms > 2000 else "PASS"
-    results.append(CheckResult("PERFORMANCE & AVAILABILITY", "Average response time", status, str(ms), "ms"))
+    phases = [f"{k} {perf[k + '_ms']}ms" for k in ("dns", "connect", "tls", "ttfb") if perf.get(k + "_ms") is not None]
+    details = "ms" + (f" ({', '.join(phases)})" if phases else "")
+    if perf.get("samples"):
+        details += f", {len(perf['samples'])} samples"
+    results.append(CheckResult("PERFORMANCE & AVAILABILITY", "Average response time", status, str(ms), details))
 
     # 100 Sudden latency spike (stub)
     results.append(CheckResult("PERFORMANCE & AVAILABILITY", "Sudden latency spike", "INFO", None, "Not implemented"))
@@ -31,6 +34,13 @@ def run(perf: dict) -> list[CheckResult]:
     is5xx = code and int(code) >= 500
     results.append(CheckResult("PERFORMANCE & AVAILABILITY", "5xx error frequency", "WARN" if is5xx else "PASS", str(code), None))
 
+    # Response body size: downloads stop at max_body_bytes / transfer_deadline_seconds
+    truncated = perf.get("truncated")
+    details = {"size": "Body exceeded the size limit; checks saw the first part only",
+               "deadline": "Body download hit the transfer deadline; checks saw the first part only"}.get(truncated)
+    results.append(CheckResult("PERFORMANCE & AVAILABILITY", "Response body truncated", "WARN" if truncated else "PASS",
+                               str(perf.get("body_bytes")), details))
+
     # 104 Geo-availability consistency (stub)
     results.append(CheckResult("PERFORMANCE & AVAILABILITY", "Geo-availability consistency", "INFO", None, "Not implemented"))
     return results
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+from ..models import CheckResult
+from . import (ai_spam_signals, basic_security, behavior_change, compliance_legal, content_integrity, dns_network,
+               domain_identity, history, performance_availability, security_headers, seo_trust, ssl_tls)
+
+# Every check group, with what it reads, how expensive it is and which report
+# categories it fills. The scanner runs only the enabled groups and fetches
+# only what they need: a headers-only scan makes one HTTP request and skips
+# the body, DNS, certificate and WHOIS lookups.
+#
+# Artifacts a check can need:
+#   whois, dns, cert    the lookups of the same name
+#   headers, perf       the HTTP response (headers only; the body isn't read)
+#   parsed              the parsed page body
+#   state               this scan vs. the previous one (scan_state.py)
+
+CHEAP, CPU = "cheap", "cpu"   # cpu: walks the parsed page
+
+# Fetchers (scanner._run_fetch_stage jobs) each artifact comes from
+ARTIFACT_FETCHERS = {
+    "whois": {"whois"},
+    "dns": {"dns"},
+    "cert": {"cert"},
+    "headers": {"http"},
+    "perf": {"http", "perf"},
+    "parsed": {"http"},
+    "state": {"http", "dns"},
+}
+
+@dataclass(frozen=True)
+class CheckSpec:
+    name: str
+    categories: tuple
+    needs: frozenset
+    cost: str
+    run: Callable[[dict], list[CheckResult]]   # takes the scan context (see scanner)
+
+    @property
+    def content(self) -> bool:
+        # Derived from the page body alone, so reusable while the page is unchanged
+        return self.needs == {"parsed"}
+
+def _spec(name, categories, needs, cost, run):
+    return CheckSpec(name, tuple(categories), frozenset(needs), cost, run)
+
+CHECKS = [
+    _spec("domain_identity", ["DOMAIN & IDENTITY"], {"whois"}, CHEAP, lambda ctx: domain_identity.run(ctx["whois"], ctx["domain"])),
+    _spec("dns_network", ["DNS & NETWORK"], {"dns"}, CHEAP, lambda ctx: dns_network.run(ctx["domain"], ctx["dns"])),
+    _spec("ssl_tls", ["SSL / TLS"], {"cert"}, CHEAP, lambda ctx: ssl_tls.run(ctx["cert"])),
+    _spec("security_headers", ["SECURITY HEADERS"], {"headers"}, CHEAP,
+          lambda ctx: security_headers.run(ctx["security_headers"])),
+    _spec("basic_security", ["BASIC SECURITY POSTURE"], {"parsed"}, CPU,
+          lambda ctx: basic_security.run(ctx["url"], ctx["parsed"])),
+    _spec("content_integrity", ["CONTENT INTEGRITY"], {"parsed"}, CPU, lambda ctx: content_integrity.run(ctx["parsed"])),
+    _spec("ai_spam_signals", ["AI & SPAM SIGNALS"], {"parsed"}, CPU, lambda ctx: ai_spam_signals.run(ctx["parsed"])),
+    _spec("seo_trust", ["SEO & SEARCH TRUST"], {"parsed"}, CPU, lambda ctx: seo_trust.run(ctx["parsed"])),
+    _spec("compliance_legal", ["COMPLIANCE & LEGAL"], {"parsed"}, CPU, lambda ctx: compliance_legal.run(ctx["parsed"])),
+    _spec("performance_availability", ["PERFORMANCE & AVAILABILITY"], {"perf"}, CHEAP,
+          lambda ctx: performance_availability.run(ctx["perf"])),
+    _spec("behavior_change", ["BEHAVIOR & CHANGE INTELLIGENCE"], set(), CHEAP, lambda ctx: behavior_change.run()),
+    _spec("history", ["CONTENT INTEGRITY", "SEO & SEARCH TRUST", "DOMAIN & IDENTITY", "PERFORMANCE & AVAILABILITY"],
+          {"state"}, CHEAP, lambda ctx: history.run(ctx["state"], ctx["previous"])),
+]
+REGISTRY = {spec.name: spec for spec in CHECKS}
+
+PROFILES = {
+    "full": [spec.name for spec in CHECKS],
+    "headers": ["security_headers"],
+    # No page parsing and no WHOIS (the slowest lookup)
+    "fast": [spec.name for spec in CHECKS if spec.cost == CHEAP and "whois" not in spec.needs and "state" not in spec.needs],
+}
+
+def select(profile: Optional[str] = None, names: Optional[Iterable[str]] = None,
+           categories: Optional[Iterable[str]] = None) -> list[CheckSpec]:
+    """
+    Enabled checks, in report order: the named profile (default "full"), or
+    the given check names, narrowed to checks filling any of categories.
+    """
+    if names is None:
+        if (profile or "full") not in PROFILES:
+            raise ValueError(f"Unknown check profile {profile!r}; expected one of {', '.join(PROFILES)}")
+        names = PROFILES[profile or "full"]
+    unknown = set(names) - REGISTRY.keys()
+    if unknown:
+        raise ValueError(f"Unknown checks: {', '.join(sorted(unknown))}")
+    specs = [spec for spec in CHECKS if spec.name in set(names)]
+    if categories is not None:
+        categories = set(categories)
+        specs = [spec for spec in specs if categories & set(spec.categories)]
+    return specs
+
+def from_config(config: dict) -> list[CheckSpec]:
+    """config["checks"] (names), else config["check_profile"]; config["check_categories"] narrows either."""
+    return select(config.get("check_profile"), config.get("checks"), config.get("check_categories"))
+
+def needed_fetchers(specs: Iterable[CheckSpec]) -> set:
+    return {fetcher for spec in specs for need in spec.needs for fetcher in ARTIFACT_FETCHERS[need]}
+
+def is_full(specs: Iterable[CheckSpec]) -> bool:
+    return {spec.name for spec in specs} == REGISTRY.keys()
@@ -1,17 +1,17 @@
 from ..models import CheckResult
+from ..fetchers.content import Document
 
-def run(parsed: dict) -> list[CheckResult]:
+def run(parsed: Document) -> list[CheckResult]:
     results = []
-    title = parsed.get("title")
-    desc = parsed.get("meta_description")
-    canonical = parsed.get("canonical")
-    text = parsed.get("text") or ""
+    title = parsed.title
+    desc = parsed.meta_description
+    canonical = parsed.canonical
+    text = parsed.text
 
-    # 85 Meta title change frequency (stub requires history)
-    results.append(CheckResult("SEO & SEARCH TRUST", "Meta title change frequency", "INFO", None, "Not implemented"))
+    # 85 Meta title change frequency: see checks/history.py
 
     # 86 Meta description spam (heuristic)
-    spammy = desc and any(x in desc.lower() for x in ["free", "win", "cheap"])
+    spammy = desc and any(parsed.keywords("meta_spam", "meta_description").values())
     results.append(CheckResult("SEO & SEARCH TRUST", "Meta description spam", "WARN" if spammy else "PASS", str(bool(spammy)), None))
 
     # 87 Canonical tag misuse (basic)
@@ -19,7 +19,7 @@ def run(parsed: dict) -> list[CheckResult]:
     results.append(CheckResult("SEO & SEARCH TRUST", "Canonical tag misuse", "WARN" if misuse else "PASS", canonical, None))
 
     # 88 Noindex tag presence
-    noindex = "<meta name=\"robots\" content=\"noindex\"" in text.lower()
+    noindex = "noindex" in (parsed.meta.get("robots") or "").lower()
     results.append(CheckResult("SEO & SEARCH TRUST", "Noindex tag presence", "INFO", str(noindex), None))
 
     # 89 Robots.txt disallow change (stub)
@@ -38,8 +38,7 @@ def run(parsed: dict) -> list[CheckResult]:
     results.append(CheckResult("SEO & SEARCH TRUST", "Structured data spam", "INFO", None, "Not implemented"))
 
     # 94 Keyword stuffing (heuristic)
-    kws = ["buy", "cheap", "best", "discount"]
-    count = sum(text.lower().count(k) for k in kws)
+    count = sum(parsed.keywords("seo_stuffing").values())
     status = "WARN" if count > 50 else "PASS"
     results.append(CheckResult("SEO & SEARCH TRUST", "Keyword stuffing", status, str(count), None))
 
@@ -4,17 +4,20 @@ from ..models import CheckResult
 
 def run(cert_info: dict | None) -> list[CheckResult]:
     results = []
-    if not cert_info:
+    if not cert_info or not cert_info.get("not_after"):
+        error = (cert_info or {}).get("handshake_error")
         results.append(CheckResult("SSL / TLS", "HTTPS availability", "FAIL", None, "No certificate"))
-        # Add stubs for remaining
+        results.append(CheckResult("SSL / TLS", "SSL handshake errors", "FAIL" if error else "INFO", str(bool(error)),
+                                   error or "No TLS inspection result"))
+        # Nothing else can be judged without a handshake
         for name in [
             "Certificate issuer","Certificate chain validity","Certificate expiry days",
             "Self-signed cert detection","TLS version support","Weak cipher support",
             "OCSP stapling","Certificate transparency logs","HTTPS redirect enforced",
-            "Mixed content detection","SAN mismatch","SSL handshake errors",
+            "Mixed content detection","SAN mismatch",
             "Expired intermediate cert","Cert pinning presence"
         ]:
-            results.append(CheckResult("SSL / TLS", name, "INFO", None, "Not implemented"))
+            results.append(CheckResult("SSL / TLS", name, "INFO", None, "No handshake"))
         return results
 
     results.append(CheckResult("SSL / TLS", "HTTPS availability", "PASS", "True", None))
@@ -32,11 +35,68 @@ def run(cert_info: dict | None) -> list[CheckResult]:
     san = cert_info.get("san", [])
     results.append(CheckResult("SSL / TLS", "SAN entries count", "INFO", str(len(san)), None))
 
-    # Stubs for the rest
-    for name in [
-        "Certificate chain validity","Self-signed cert detection","TLS version support","Weak cipher support",
-        "OCSP stapling","Certificate transparency logs","HTTPS redirect enforced","Mixed content detection",
-        "SSL handshake errors","Expired intermediate cert","Cert pinning presence"
-    ]:
+    # Everything below comes from fetchers/tls.py (one handshake + shared per-address probes)
+    match = cert_info.get("hostname_match")
+    results.append(CheckResult("SSL / TLS", "SAN mismatch", "INFO" if match is None else ("PASS" if match else "FAIL"),
+                               None if match is None else str(not match), None))
+
+    # 30 chain validity / 32 self-signed
+    errors = cert_info.get("verify_errors")
+    if errors is None:
+        results.append(CheckResult("SSL / TLS", "Certificate chain validity", "INFO", None, "Not inspected"))
+    else:
+        details = "; ".join(f"{e['error']} (depth {e['depth']})" for e in errors) or None
+        results.append(CheckResult("SSL / TLS", "Certificate chain validity", "FAIL" if errors else "PASS",
+                                   str(not errors), details))
+    self_signed = any(e["code"] in (18, 19) for e in errors or []) or (
+        len(cert_info.get("chain", [])) == 1 and cert_info["chain"][0].get("self_signed"))
+    results.append(CheckResult("SSL / TLS", "Self-signed cert detection", "FAIL" if self_signed else "PASS",
+                               str(bool(self_signed)), None))
+
+    # 33 TLS versions: legacy ones accepted are a weakness
+    versions = cert_info.get("versions")
+    if versions:
+        legacy = [v for v in ("TLSv1", "TLSv1.1") if versions.get(v)]
+        supported = ", ".join(v for v, ok in sorted(versions.items()) if ok)
+        results.append(CheckResult("SSL / TLS", "TLS version support", "WARN" if legacy else "PASS", supported,
+                                   f"Negotiated {cert_info.get('protocol')}"
+                                   + (f"; legacy {', '.join(legacy)} accepted" if legacy else "")))
+    else:
+        results.append(CheckResult("SSL / TLS", "TLS version support", "INFO", cert_info.get("protocol"), None))
+
+    # 34 weak ciphers (None: this OpenSSL can't offer them, so not tested)
+    weak = cert_info.get("weak_cipher")
+    if weak is None:
+        results.append(CheckResult("SSL / TLS", "Weak cipher support", "INFO", None,
+                                   f"Negotiated {cert_info.get('cipher')}; weak suites not testable"))
+    else:
+        results.append(CheckResult("SSL / TLS", "Weak cipher support", "FAIL" if weak else "PASS", weak or "False",
+                                   f"Negotiated {cert_info.get('cipher')} ({cert_info.get('cipher_bits')} bits)"))
+
+    # 35 OCSP stapling
+    ocsp = cert_info.get("ocsp")
+    if not ocsp:
+        results.append(CheckResult("SSL / TLS", "OCSP stapling", "INFO", "False", "No stapled response"))
+    else:
+        status = {"good": "PASS", "revoked": "FAIL"}.get(ocsp["status"], "WARN")
+        results.append(CheckResult("SSL / TLS", "OCSP stapling", status, ocsp["status"], ocsp.get("next_update")))
+
+    # 36 CT: embedded SCTs in the leaf
+    sct = cert_info.get("sct")
+    results.append(CheckResult("SSL / TLS", "Certificate transparency logs", "INFO" if sct is None else ("PASS" if sct else "WARN"),
+                               None if sct is None else str(sct), "Embedded SCTs" if sct else None))
+
+    # 40 handshake errors: the inspecting handshake completed
+    results.append(CheckResult("SSL / TLS", "SSL handshake errors", "PASS", "False", None))
+
+    # 41 expired intermediates (chain as sent by the server)
+    now = datetime.utcnow()
+    expired = [c["subject"] for c in cert_info.get("chain", [])[1:]
+               if parser.isoparse(c["not_after"]).replace(tzinfo=None) < now]
+    results.append(CheckResult("SSL / TLS", "Expired intermediate cert", "FAIL" if expired else "PASS", str(bool(expired)),
+                               ", ".join(filter(None, expired)) or None))
+
+    # Not derivable from the handshake
+    for name in ["HTTPS redirect enforced", "Mixed content detection", "Cert pinning presence"]:
         results.append(CheckResult("SSL / TLS", name, "INFO", None, "Not implemented"))
     return results
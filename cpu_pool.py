@@ -0,0 +1,73 @@
+# webscan/cpu_pool.py
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from .checks import registry
+from .fetchers.content import parse_html
+
+# CPU stage of a scan. Parsing the page and running the content checks hold
+# the GIL, so with config["cpu_workers"] > 0 they run on a process pool while
+# the event loop keeps fetching. The raw body goes to the worker through a
+# shared memory block rather than being pickled, and only the check rows and
+# a few extracted fields come back. With no pool, the same work runs on a
+# thread, as before.
+
+_lock = threading.Lock()
+_pools = {}
+
+def cpu_pool(config: dict):
+    """Process pool for config["cpu_workers"], shared by every scan in the process; None when off."""
+    workers = config.get("cpu_workers") or 0
+    if workers <= 0:
+        return None
+    with _lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn: forking a process that runs an event loop and threads isn't safe
+            pool = _pools[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return pool
+
+def analyze_content(body: bytes, encoding, url, parser, term_lists, check_names) -> dict:
+    """Parse the page and run the named content checks; returns plain picklable values."""
+    try:
+        html = body.decode(encoding or "utf-8", "replace")
+    except LookupError:
+        html = body.decode("utf-8", "replace")
+    parsed = parse_html(html, parser, term_lists)
+    ctx = {"url": url, "parsed": parsed}
+    checks = [c for name in check_names for c in registry.REGISTRY[name].run(ctx)]
+    return {
+        "checks": [(c.category, c.name, c.status, c.value, c.details) for c in checks],
+        "title": parsed.title,
+        "content_length": len(html),
+        "content_hash": next((c.value for c in checks if c.name == "Homepage content hash"), None),
+        # Without the page text: the caller already has the body, and it's the bulk of the dict
+        "parsed": {k: v for k, v in parsed.to_dict().items() if k != "text"},
+    }
+
+def _analyze_shared(shm_name: str, size: int, *args) -> dict:
+    # Pool processes share the parent's resource tracker, and the parent unlinks the block
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        body = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+    return analyze_content(body, *args)
+
+async def run_content_stage(config: dict, body: bytes, encoding, url, parser, term_lists, check_names) -> dict:
+    args = (encoding, url, parser, term_lists, list(check_names))
+    pool = cpu_pool(config)
+    if pool is None:
+        return await asyncio.to_thread(analyze_content, body, *args)
+    loop = asyncio.get_running_loop()
+    if not body:
+        return await loop.run_in_executor(pool, analyze_content, body, *args)
+    shm = shared_memory.SharedMemory(create=True, size=len(body))
+    try:
+        shm.buf[:len(body)] = body
+        return await loop.run_in_executor(pool, _analyze_shared, shm.name, len(body), *args)
+    finally:
+        shm.close()
+        shm.unlink()
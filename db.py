@@ -1,17 +1,58 @@
 # db.py
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# SQLite database file
-SQLALCHEMY_DATABASE_URL = "sqlite:///./webscan.db"
+import db_helpers
+
+# Same database as the raw-SQL helpers (WEBSCAN_DATABASE_URL)
+SQLALCHEMY_DATABASE_URL = db_helpers.DATABASE_URL
+
+# Connections kept open per process, and how many more may be opened under burst
+POOL_SIZE = int(os.environ.get("WEBSCAN_DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.environ.get("WEBSCAN_DB_MAX_OVERFLOW", "20"))
+
+def _with_driver(url: str, pg_driver: str, sqlite_driver: str | None = None) -> str:
+    scheme, _, rest = url.partition("://")
+    if scheme in ("postgres", "postgresql"):
+        return f"postgresql+{pg_driver}://" + rest
+    if scheme == "sqlite" and sqlite_driver:
+        return f"sqlite+{sqlite_driver}://" + rest
+    return url
+
+def async_url(url: str) -> str:
+    """The same database addressed through its asyncio driver."""
+    return _with_driver(url, "asyncpg", "aiosqlite")
+
+def is_sqlite(url: str = SQLALCHEMY_DATABASE_URL) -> bool:
+    return url.startswith("sqlite")
 
 # Create engine
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    _with_driver(SQLALCHEMY_DATABASE_URL, "psycopg2"),
+    **({"connect_args": {"check_same_thread": False}} if is_sqlite() else {})
 )
 
+# Non-blocking engine for the API; one pool shared by every request
+async_engine = create_async_engine(
+    async_url(SQLALCHEMY_DATABASE_URL),
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_pre_ping=not is_sqlite(),
+)
+
+if is_sqlite():
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for pragma in db_helpers.PRAGMAS:
+            cur.execute(pragma)
+        cur.close()
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
@@ -22,4 +63,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -1,43 +1,373 @@
 # db_helpers.py
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+import io
+import json
+import queue
 import sqlite3, os
+try:
+    import psycopg2
+    import psycopg2.extensions
+    import psycopg2.extras
+except ImportError:
+    psycopg2 = None
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# The one setting that picks the backend for the whole app (API, auth, workers,
+# init_db): a postgresql:// URL, or a sqlite:/// URL (default: webscan.db here)
+DATABASE_URL = os.environ.get("WEBSCAN_DATABASE_URL") or "sqlite:///" + os.path.join(BASE_DIR, "webscan.db")
+BACKEND = "pg" if DATABASE_URL.startswith(("postgres://", "postgresql://")) else "sqlite"
+DB_PATH = DATABASE_URL[len("sqlite:///"):] if BACKEND == "sqlite" else None
+
+# WAL lets readers (the API) proceed while a worker writes; NORMAL sync is
+# durable across app crashes in WAL mode; busy_timeout waits out a competing
+# writer instead of failing with "database is locked".
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=10000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-32000",
+]
+
+LATEST_RUN_UPSERT = """
+    INSERT INTO latest_run (domain, run_id, trust_score, verdict, severity, created_at, profile_version)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(domain) DO UPDATE SET
+        run_id=excluded.run_id, trust_score=excluded.trust_score, verdict=excluded.verdict,
+        severity=excluded.severity, created_at=excluded.created_at, profile_version=excluded.profile_version
+    WHERE excluded.created_at >= latest_run.created_at
+"""
+
+SCAN_STATE_UPSERT = """
+    INSERT INTO scan_state (domain, state, updated_at) VALUES (?, ?, ?)
+    ON CONFLICT(domain) DO UPDATE SET state=excluded.state, updated_at=excluded.updated_at
+"""
+
+POOL_SIZE = 16
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+_inherited = []
+
+def _reset_pool():
+    # A forked worker must not share the parent's sockets or SQLite handles.
+    # The inherited connections are kept referenced, never closed: closing one
+    # here (or letting it be collected) would end the parent's session too.
+    # (Read the list directly: another thread may have held the queue's lock.)
+    global _pool
+    _inherited.extend(_pool.queue)
+    _pool = queue.LifoQueue(maxsize=POOL_SIZE)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool)
+
+@lru_cache(maxsize=1024)
+def _qmark_to_pyformat(sql: str) -> str:
+    """
+    qmark SQL as psycopg2 SQL: ? placeholders become %s, except inside quoted
+    literals and identifiers, and every literal % is doubled (psycopg2 formats
+    the whole statement whenever parameters are passed).
+    """
+    out, quote = [], None
+    for ch in sql:
+        if ch == "%":
+            out.append("%%")
+        elif quote:
+            out.append(ch)
+            if ch == quote:
+                quote = None   # a doubled quote closes and reopens: same result
+        elif ch in "'\"":
+            out.append(ch)
+            quote = ch
+        else:
+            out.append("%s" if ch == "?" else ch)
+    return "".join(out)
+
+class _PgCursor:
+    """psycopg2 cursor that accepts the qmark (?) SQL used throughout the app."""
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql, params=()):
+        self._cur.execute(_qmark_to_pyformat(sql), params)
+        return self
+
+    def executemany(self, sql, rows):
+        psycopg2.extras.execute_batch(self._cur, _qmark_to_pyformat(sql), rows, page_size=500)
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+class PgConnection:
+    """psycopg2 connection with the parts of the sqlite3 interface the app uses."""
+    backend = "pg"
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self):
+        return _PgCursor(self.raw.cursor())
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    @property
+    def in_transaction(self):
+        return self.raw.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.raw.close()
+
+def connect_pg(url):
+    if psycopg2 is None:
+        raise RuntimeError("psycopg2 is required for postgresql:// database URLs")
+    return PgConnection(psycopg2.connect(url))
+
+def is_pg(conn) -> bool:
+    return getattr(conn, "backend", "sqlite") == "pg"
+
+def configure(conn):
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
 def get_conn():
-    return sqlite3.connect(os.path.join(BASE_DIR, "webscan.db"))
+    """A new tuned connection; the caller closes it."""
+    if BACKEND == "pg":
+        return connect_pg(DATABASE_URL)
+    return configure(sqlite3.connect(DB_PATH, timeout=10, check_same_thread=False))
 
-def save_scan_results(domain, trust_score, verdict, severity, findings, events, actions):
-    conn = get_conn()
+def begin_write(conn):
+    # SQLite: take the write lock now rather than on first write. Postgres
+    # opens a transaction implicitly and locks rows as they are touched.
+    if not is_pg(conn):
+        conn.execute("BEGIN IMMEDIATE")
+
+def insert_id(cur, sql, params):
+    """Run an INSERT into a table with an id column and return the new id."""
+    if isinstance(cur, _PgCursor):
+        cur.execute(sql + " RETURNING id", params)
+        return cur.fetchone()[0]
+    cur.execute(sql, params)
+    return cur.lastrowid
+
+def _copy_value(v):
+    if v is None:
+        return "\\N"
+    return str(v).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def bulk_insert(cur, table, columns, rows):
+    """
+    Insert many rows: COPY FROM STDIN on Postgres (one round trip, no per-row
+    statement overhead), executemany on SQLite.
+    """
+    if not rows:
+        return
+    if isinstance(cur, _PgCursor):
+        buf = io.StringIO("".join("\t".join(map(_copy_value, row)) + "\n" for row in rows))
+        cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+    else:
+        cur.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows)
+
+_partitions = set()
+
+def ensure_partition(conn, table, when: datetime):
+    """
+    Create (and commit) the monthly partition of a time-partitioned Postgres
+    table that covers `when`, if this process hasn't already seen it.
+    """
+    month = (when.year, when.month)
+    if (table, month) in _partitions:
+        return
+    start = datetime(when.year, when.month, 1)
+    end = datetime(when.year + when.month // 12, when.month % 12 + 1, 1)
     cur = conn.cursor()
+    # Serialise creation across workers; IF NOT EXISTS alone can still race
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext(?))", (table,))
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table}_y{start:%Y}m{start:%m} PARTITION OF {table}
+        FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')
+    """)
+    conn.commit()
+    _partitions.add((table, month))
 
-    # Insert run
-    cur.execute("""
-        INSERT INTO runs (domain, trust_score, verdict, severity, created_at)
-        VALUES (?, ?, ?, ?, ?)
-    """, (domain, trust_score, verdict, severity, datetime.utcnow().isoformat()))
-    run_id = cur.lastrowid
+def has_table(conn, name) -> bool:
+    if is_pg(conn):
+        return conn.execute("SELECT to_regclass(?)", (name,)).fetchone()[0] is not None
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
 
-    # Insert findings
-    for f in findings:
-        cur.execute("""
-            INSERT INTO findings (run_id, parameter, risk, severity)
-            VALUES (?, ?, ?, ?)
-        """, (run_id, f["parameter"], f["risk"], f["severity"]))
+# Indexes for the dashboard and decision-engine queries: (table, DDL)
+DASHBOARD_INDEXES = [
+    ("runs", "CREATE INDEX IF NOT EXISTS idx_runs_domain_created ON runs (domain, created_at DESC)"),
+    ("findings", "CREATE INDEX IF NOT EXISTS idx_findings_run ON findings (run_id)"),
+    ("events", "CREATE INDEX IF NOT EXISTS idx_events_domain_created ON events (domain, created_at DESC)"),
+    ("actions", "CREATE INDEX IF NOT EXISTS idx_actions_domain ON actions (domain)"),
+    ("domains", "CREATE INDEX IF NOT EXISTS idx_domains_user_domain ON domains (user_id, domain)"),
+]
 
-    # Insert events
-    for e in events:
+def init_latest_run_table(conn):
+    """
+    Create latest_run and the dashboard indexes, backfilling latest_run from
+    runs when the table is new. Idempotent: the API and workers run it at
+    startup, so databases created before latest_run existed keep working. A
+    database without a runs table yet is left to init_db.
+    """
+    if not has_table(conn, "runs"):
+        return
+    pg = is_pg(conn)
+    new = not has_table(conn, "latest_run")
+    cur = conn.cursor()
+    # Latest run per domain, maintained on every save so dashboard reads are
+    # a primary-key lookup instead of a sort over all runs
+    cur.execute(f"""
+    CREATE TABLE IF NOT EXISTS latest_run (
+        domain TEXT PRIMARY KEY,
+        run_id {"BIGINT" if pg else "INTEGER"} NOT NULL REFERENCES runs (id),
+        trust_score INTEGER,
+        verdict TEXT,
+        severity TEXT,
+        created_at {"TIMESTAMP" if pg else "TEXT"} NOT NULL,
+        profile_version INTEGER
+    )""")
+    # Tables created before rescoring touched latest_run; the dashboard ETag
+    # includes the version so a rescored run isn't served from cache
+    if pg:
+        cur.execute("ALTER TABLE latest_run ADD COLUMN IF NOT EXISTS profile_version INTEGER")
+    elif "profile_version" not in [row[1] for row in cur.execute("PRAGMA table_info(latest_run)")]:
+        cur.execute("ALTER TABLE latest_run ADD COLUMN profile_version INTEGER")
+    for table, ddl in DASHBOARD_INDEXES:
+        if has_table(conn, table):
+            cur.execute(ddl)
+    if new and pg:
         cur.execute("""
-            INSERT INTO events (domain, change, severity, created_at)
-            VALUES (?, ?, ?, ?)
-        """, (domain, e["change"], e["severity"], e["time"]))
-
-    # Insert actions
-    for a in actions:
+        INSERT INTO latest_run (domain, run_id, trust_score, verdict, severity, created_at)
+        SELECT DISTINCT ON (domain) domain, id, trust_score, verdict, severity, created_at
+        FROM runs
+        ORDER BY domain, created_at DESC, id DESC
+        ON CONFLICT (domain) DO NOTHING
+        """)
+    elif new:
         cur.execute("""
-            INSERT INTO actions (domain, issue, risk, action, status)
-            VALUES (?, ?, ?, ?, ?)
-        """, (domain, a["issue"], a["risk"], a["action"], a["status"]))
+        INSERT OR IGNORE INTO latest_run (domain, run_id, trust_score, verdict, severity, created_at)
+        SELECT r.domain, r.id, r.trust_score, r.verdict, r.severity, r.created_at
+        FROM runs r
+        WHERE r.id = (SELECT id FROM runs WHERE domain = r.domain ORDER BY created_at DESC, id DESC LIMIT 1)
+        """)
+    conn.commit()
 
+def init_scan_state_table(conn):
+    """Last scan's state per domain, for incremental re-scans; idempotent, run at API and worker startup."""
+    conn.cursor().execute(f"""
+    CREATE TABLE IF NOT EXISTS scan_state (
+        domain TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        updated_at {"TIMESTAMP" if is_pg(conn) else "TEXT"} NOT NULL
+    )""")
     conn.commit()
-    conn.close()
+
+@contextmanager
+def connection():
+    """
+    Borrow a pooled connection. Commits nothing by itself; a transaction left
+    open when the block exits is rolled back before the connection is reused.
+    """
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = get_conn()
+    try:
+        yield conn
+    finally:
+        # A Postgres connection the server dropped is discarded, not pooled
+        if not (is_pg(conn) and conn.raw.closed):
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                _pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+def save_scan_results(domain, trust_score, verdict, severity, findings, events, actions):
+    return save_many_scan_results([{
+        "domain": domain, "trust_score": trust_score, "verdict": verdict, "severity": severity,
+        "findings": findings, "events": events, "actions": actions
+    }])[0]
+
+def save_many_scan_results(scans):
+    """
+    Persist many scans in a single transaction. Each scan is a dict with domain,
+    trust_score, verdict, severity, findings, events and actions, and optionally
+    parameter_risks ({param: risk}, kept for rescoring), profile_version and
+    state (the scanner's artifacts["state"], read back by load_scan_states).
+    Returns run ids in input order.
+    """
+    run_ids = []
+    finding_rows, risk_rows, event_rows, action_rows = [], [], [], []
+    created = datetime.utcnow()
+    now = created.isoformat()
+    with connection() as conn:
+        pg = is_pg(conn)
+        if pg:
+            # Postgres findings are partitioned by created_at
+            ensure_partition(conn, "findings", created)
+        begin_write(conn)
+        cur = conn.cursor()
+
+        # Insert runs (one at a time for their ids; findings reference them)
+        for s in scans:
+            run_id = insert_id(cur, """
+                INSERT INTO runs (domain, trust_score, verdict, severity, created_at, profile_version)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (s["domain"], s["trust_score"], s["verdict"], s["severity"], now, s.get("profile_version")))
+            run_ids.append(run_id)
+            risk_rows += [(run_id, p, r) for p, r in (s.get("parameter_risks") or {}).items()]
+            finding_rows += [(run_id, f["parameter"], f["risk"], f["severity"]) + ((now,) if pg else ())
+                             for f in s["findings"]]
+            event_rows += [(s["domain"], e["change"], e["severity"], e["time"]) for e in s["events"]]
+            action_rows += [(s["domain"], a["issue"], a["risk"], a["action"], a["status"]) for a in s["actions"]]
+
+        # Point each domain at its newest run
+        cur.executemany(LATEST_RUN_UPSERT, [
+            (s["domain"], run_id, s["trust_score"], s["verdict"], s["severity"], now, s.get("profile_version"))
+            for s, run_id in zip(scans, run_ids)
+        ])
+
+        # Insert findings
+        bulk_insert(cur, "findings", ["run_id", "parameter", "risk", "severity"] + (["created_at"] if pg else []),
+                    finding_rows)
+
+        # Insert the numeric risks the run was scored from
+        bulk_insert(cur, "parameter_risks", ["run_id", "parameter", "risk"], risk_rows)
+
+        # Insert events
+        bulk_insert(cur, "events", ["domain", "change", "severity", "created_at"], event_rows)
+
+        # Insert actions
+        bulk_insert(cur, "actions", ["domain", "issue", "risk", "action", "status"], action_rows)
+
+        # Remember what the next scan of each domain compares against
+        cur.executemany(SCAN_STATE_UPSERT, [
+            (s["domain"], json.dumps(s["state"], default=str), now) for s in scans if s.get("state")
+        ])
+
+        conn.commit()
+    return run_ids
+
+def load_scan_states(domains):
+    """{domain: state} saved by the last scan of each domain, for incremental re-scans."""
+    domains = list(set(domains))
+    if not domains:
+        return {}
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"SELECT domain, state FROM scan_state WHERE domain IN ({', '.join('?' * len(domains))})", domains)
+        return {domain: json.loads(state) for domain, state in cur.fetchall()}
@@ -19,8 +19,8 @@ def rules_for_domain(conn: sqlite3.Connection, domain: str) -> List[Dict[str, An
 
     # Latest run
     cur.execute("""
-        SELECT id, trust_score, verdict, severity, created_at
-        FROM runs WHERE domain=? ORDER BY created_at DESC LIMIT 1
+        SELECT run_id, trust_score, verdict, severity, created_at
+        FROM latest_run WHERE domain=?
     """, (domain,))
     run = cur.fetchone()
     if not run:
@@ -0,0 +1,212 @@
+# webscan/domains.py
+import ipaddress
+import os
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import NamedTuple
+
+# Domain normalization against a bundled Public Suffix List snapshot
+# (data/public_suffix_list.dat, from publicsuffix.org, MPL 2.0; its VERSION
+# and COMMIT header lines say which one, see suffix_list_version()). Nothing is
+# fetched over the network: the list is read into a label trie on first use,
+# and splits are memoized per host. Like tldextract's defaults, only the ICANN
+# section counts unless include_private is set, and a host with no listed
+# suffix (an IP address, localhost, an internal name) is its own domain.
+
+PSL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "public_suffix_list.dat")
+CACHE_SIZE = 65536
+
+ICANN, PRIVATE = 1, 2
+_END = ""   # trie key holding the section of a rule that ends at this node
+# Most rules end in a leaf; they share one node per section (never mutated)
+_LEAVES = {ICANN: {_END: ICANN}, PRIVATE: {_END: PRIVATE}}
+
+# Cyrillic and Greek letters drawn like Latin ones (a subset of Unicode's
+# confusables.txt); enough to spell most brand names in another script
+CONFUSABLES = {
+    "а": "a", "в": "b", "е": "e", "һ": "h", "і": "i", "ј": "j", "к": "k", "ӏ": "l", "м": "m", "н": "h",
+    "о": "o", "р": "p", "ԛ": "q", "ѕ": "s", "т": "t", "с": "c", "у": "y", "х": "x", "ԁ": "d", "ԝ": "w",
+    "α": "a", "β": "b", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p", "τ": "t", "υ": "u",
+    "χ": "x", "ϲ": "c",
+}
+
+_lock = threading.Lock()
+_trie = None
+_version = None
+
+class DomainParts(NamedTuple):
+    subdomain: str
+    domain: str
+    suffix: str
+
+    @property
+    def registered_domain(self) -> str:
+        return f"{self.domain}.{self.suffix}" if self.domain and self.suffix else ""
+
+def _to_ascii(label: str) -> str:
+    if label.isascii():
+        return label
+    try:
+        return label.encode("idna").decode("ascii")
+    except UnicodeError:
+        return label
+
+def load_trie(path: str = PSL_PATH) -> dict:
+    """Reversed-label trie of the rules in a PSL file; IDN rules are stored in punycode."""
+    global _version
+    trie = {}
+    section = ICANN
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line.startswith("// VERSION:") and path == PSL_PATH:
+                _version = line.split(":", 1)[1].strip()
+            if line.startswith("// ===BEGIN PRIVATE"):
+                section = PRIVATE
+            if not line or line.startswith("//"):
+                continue
+            labels = [_to_ascii(label) for label in line.split()[0].lower().split(".")]
+            node = trie
+            for label in reversed(labels[1:]):
+                child = node.get(label)
+                if child is None or any(child is leaf for leaf in _LEAVES.values()):
+                    child = node[label] = dict(child or {})
+                node = child
+            last = labels[0]
+            if last in node:
+                if any(node[last] is leaf for leaf in _LEAVES.values()):
+                    node[last] = dict(node[last])
+                node[last].setdefault(_END, section)
+            else:
+                node[last] = _LEAVES[section]
+    return trie
+
+def _get_trie() -> dict:
+    global _trie
+    if _trie is None:
+        with _lock:
+            if _trie is None:
+                _trie = load_trie()
+    return _trie
+
+def suffix_list_version() -> str:
+    """VERSION line of the bundled list, e.g. "2025-04-07_15-51-09_UTC"."""
+    _get_trie()
+    return _version
+
+def _suffix_length(labels: list, include_private: bool) -> int:
+    """Number of trailing labels forming the public suffix; 0 if no rule matches."""
+    def counts(section):
+        return section == ICANN or (include_private and section == PRIVATE)
+
+    node, length = _get_trie(), 0
+    for i, label in enumerate(reversed(labels)):
+        exception = node.get("!" + label)
+        if exception is not None and counts(exception.get(_END)):
+            return i
+        wildcard = node.get("*")
+        if wildcard is not None and counts(wildcard.get(_END)):
+            length = i + 1
+        child = node.get(label)
+        if child is None:
+            break
+        if counts(child.get(_END)):
+            length = i + 1
+        node = child
+    return length
+
+def netloc_of(url_or_host: str) -> str:
+    """The authority part of a URL ("user@Host:port"), or of a bare "host/path"; string ops only."""
+    value = url_or_host.strip()
+    start = value.find("://")
+    if start >= 0:
+        value = value[start + 3:]
+    elif value.startswith("//"):
+        value = value[2:]
+    for sep in "/?#":
+        end = value.find(sep)
+        if end >= 0:
+            value = value[:end]
+    return value
+
+def _host(netloc: str) -> str:
+    host = netloc.rpartition("@")[2]
+    if host.startswith("["):
+        host = host[1:host.find("]")] if "]" in host else host[1:]
+    else:
+        name, colon, port = host.rpartition(":")
+        if colon and (port.isdigit() or not port):
+            host = name
+    return host.lower().rstrip(".")
+
+def host_of(url_or_host: str) -> str:
+    """Lowercased host of a URL or bare host, without userinfo, port or trailing dot."""
+    return _host(netloc_of(url_or_host))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def split_host(host: str, include_private: bool = False) -> DomainParts:
+    """(subdomain, domain, suffix) of a lowercased host, in the host's own form (unicode or punycode)."""
+    try:
+        ipaddress.ip_address(host)
+        return DomainParts("", host, "")
+    except ValueError:
+        pass
+    labels = host.split(".")
+    n = _suffix_length([_to_ascii(label) for label in labels], include_private)
+    if not n:
+        return DomainParts("", host, "") if len(labels) == 1 else DomainParts(".".join(labels[:-1]), labels[-1], "")
+    if n >= len(labels):
+        return DomainParts("", "", host)
+    return DomainParts(".".join(labels[:-n - 1]), labels[-n - 1], ".".join(labels[-n:]))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _split_netloc(netloc: str, include_private: bool) -> DomainParts:
+    return split_host(_host(netloc), include_private)
+
+def extract(url_or_host: str, include_private: bool = False) -> DomainParts:
+    return _split_netloc(netloc_of(url_or_host), include_private)
+
+def registered_domain(url_or_host: str, include_private: bool = False) -> str:
+    """Registrable domain (example.co.uk) of a URL or host, or the host itself if it has no public suffix."""
+    netloc = netloc_of(url_or_host)
+    return _split_netloc(netloc, include_private).registered_domain or _host(netloc)
+
+def extract_domains(urls, include_private: bool = False) -> list:
+    """registered_domain for each URL; every distinct host is split once."""
+    seen = {}
+    out = []
+    for url in urls:
+        netloc = netloc_of(url)
+        domain = seen.get(netloc)
+        if domain is None:
+            domain = seen[netloc] = _split_netloc(netloc, include_private).registered_domain or _host(netloc)
+        out.append(domain)
+    return out
+
+def to_ascii(host: str) -> str:
+    """Punycode (xn--) form of a host; labels that can't be encoded are kept as they are."""
+    return ".".join(_to_ascii(label) for label in host.split("."))
+
+def to_unicode(host: str) -> str:
+    labels = []
+    for label in host.split("."):
+        if label.startswith("xn--"):
+            try:
+                label = label.encode("ascii").decode("idna")
+            except UnicodeError:
+                pass
+        labels.append(label)
+    return ".".join(labels)
+
+def scripts(text: str) -> set:
+    """Unicode scripts of the letters in text, by the first word of their character names (LATIN, CYRILLIC, ...)."""
+    found = set()
+    for ch in text:
+        if ch.isalpha():
+            found.add(unicodedata.name(ch, "UNKNOWN").split(" ")[0])
+    return found
+
+def skeleton(text: str) -> str:
+    """text with look-alike Cyrillic/Greek letters replaced by the Latin ones they resemble."""
+    return "".join(CONFUSABLES.get(ch, ch) for ch in text)
@@ -1,21 +1,141 @@
+from functools import cached_property
 from bs4 import BeautifulSoup
+from ..keywords import DEFAULT_TERMS, get_matcher
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
 
-def parse_html(html: str):
-    soup = BeautifulSoup(html, "html.parser")
+class Document:
+    """
+    The homepage parsed once per scan and shared by every content check.
+    Base fields are extracted in a single pass; derived views (lowercased text,
+    tokens, ...) are computed on first use and cached.
+    """
+
+    def __init__(self, html: str, parser: str | None = None, term_lists: dict | None = None):
+        self.html = html or ""
+        self.parser = parser or DEFAULT_PARSER
+        self.term_lists = term_lists or DEFAULT_TERMS
+        self._keyword_counts = {}
+        if self.parser == "selectolax" and HTMLParser is not None:
+            fields = _extract_selectolax(self.html)
+        else:
+            if self.parser == "selectolax":
+                self.parser = DEFAULT_PARSER
+            fields = _extract_bs4(self.html, self.parser)
+        self.title = fields["title"]
+        self.meta = fields["meta"]              # name -> content
+        self.meta_properties = fields["props"]  # property -> content (OpenGraph etc.)
+        self.canonical = fields["canonical"]
+        self.scripts = fields["scripts"]
+        self.iframes = fields["iframes"]
+        self.links = fields["links"]
+        self.text = fields["text"]
+
+    @property
+    def meta_description(self):
+        return self.meta.get("description") or self.meta_properties.get("description")
+
+    @cached_property
+    def lower_text(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def lower_html(self) -> str:
+        return self.html.lower()
+
+    @cached_property
+    def tokens(self) -> list[str]:
+        return self.text.split()
+
+    @cached_property
+    def lower_links(self) -> list[str]:
+        return [l.lower() for l in self.links]
+
+    def keywords(self, group: str, field: str = "text") -> dict[str, int]:
+        """
+        {term: count} for one term-list group within field ("text", "links" or
+        "meta_description"). The first call per field counts every group's
+        terms in a single pass over that field.
+        """
+        if field not in self._keyword_counts:
+            if field == "text":
+                source = self.lower_text
+            elif field == "links":
+                source = "\n".join(self.lower_links)
+            else:
+                source = (getattr(self, field) or "").lower()
+            terms = frozenset(t.lower() for group_terms in self.term_lists.values() for t in group_terms)
+            self._keyword_counts[field] = get_matcher(terms).count(source)
+        counts = self._keyword_counts[field]
+        return {t.lower(): counts.get(t.lower(), 0) for t in self.term_lists.get(group, [])}
+
+    def get(self, key, default=None):
+        # Dict-style access for callers written against the old parse_html() dict
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "meta_description": self.meta_description,
+            "canonical": self.canonical,
+            "scripts": self.scripts,
+            "iframes": self.iframes,
+            "links": self.links,
+            "text": self.text
+        }
+
+def parse_html(html: str, parser: str | None = None, term_lists: dict | None = None) -> Document:
+    return Document(html, parser, term_lists)
+
+def _extract_bs4(html, features):
+    soup = BeautifulSoup(html, features)
+    meta, props = {}, {}
+    for tag in soup.find_all("meta"):
+        content = tag.get("content")
+        if tag.get("name"):
+            meta.setdefault(tag["name"].lower(), content.strip() if content else None)
+        if tag.get("property"):
+            props.setdefault(tag["property"].lower(), content.strip() if content else None)
+    canonical = soup.find("link", attrs={"rel": "canonical"})
     return {
         "title": (soup.title.string.strip() if soup.title and soup.title.string else None),
-        "meta_description": _meta(soup, "description"),
-        "canonical": _link_rel(soup, "canonical"),
+        "meta": meta,
+        "props": props,
+        "canonical": canonical.get("href").strip() if canonical and canonical.get("href") else None,
         "scripts": [s.get("src") for s in soup.find_all("script") if s.get("src")],
         "iframes": [i.get("src") for i in soup.find_all("iframe") if i.get("src")],
         "links": [a.get("href") for a in soup.find_all("a") if a.get("href")],
         "text": soup.get_text(" ", strip=True)
     }
 
-def _meta(soup, name):
-    tag = soup.find("meta", attrs={"name": name}) or soup.find("meta", attrs={"property": name})
-    return tag.get("content").strip() if tag and tag.get("content") else None
-
-def _link_rel(soup, rel):
-    tag = soup.find("link", attrs={"rel": rel})
-    return tag.get("href").strip() if tag and tag.get("href") else None
+def _extract_selectolax(html):
+    tree = HTMLParser(html)
+    meta, props = {}, {}
+    for node in tree.css("meta"):
+        attrs = node.attributes
+        content = attrs.get("content")
+        if attrs.get("name"):
+            meta.setdefault(attrs["name"].lower(), content.strip() if content else None)
+        if attrs.get("property"):
+            props.setdefault(attrs["property"].lower(), content.strip() if content else None)
+    title = tree.css_first("title")
+    canonical = next((n.attributes.get("href") for n in tree.css("link[rel]")
+                      if "canonical" in (n.attributes.get("rel") or "").lower().split()), None)
+    return {
+        "title": (title.text(strip=True) or None) if title else None,
+        "meta": meta,
+        "props": props,
+        "canonical": canonical.strip() if canonical else None,
+        "scripts": [n.attributes["src"] for n in tree.css("script[src]") if n.attributes.get("src")],
+        "iframes": [n.attributes["src"] for n in tree.css("iframe[src]") if n.attributes.get("src")],
+        "links": [n.attributes["href"] for n in tree.css("a[href]") if n.attributes.get("href")],
+        "text": tree.root.text(separator=" ", strip=True) if tree.root else ""
+    }
@@ -1,30 +1,101 @@
+import asyncio
 import dns.resolver
-import dns.dnssec
-import dns.name
-import dns.query
-import dns.message
-
-def resolve_records(domain: str):
-    # configure=False prevents trying to open /etc/resolv.conf
-    res = dns.resolver.Resolver(configure=False)
-    res.nameservers = ["8.8.8.8", "1.1.1.1"]  # Google & Cloudflare DNS
-    res.timeout = 5
-    res.lifetime = 10
-
-    data = {}
-    for rtype in ["A", "AAAA", "MX", "TXT", "NS"]:
-        try:
-            answers = res.resolve(domain, rtype)
-            data[rtype] = [a.to_text() for a in answers]
-        except Exception:
-            data[rtype] = []
-    return data
+import dns.rdatatype
+import dns.reversename
+from ..cache import MISS, MemoryCache
+from .pool import dns_resolver, run_sync
+
+RECORD_TYPES = ["A", "AAAA", "MX", "TXT", "NS"]
+
+# Common DKIM selectors (Google Workspace, Microsoft 365, most mail hosts);
+# selectors can't be listed, so these are probed directly
+DKIM_SELECTORS = ["default", "google", "selector1", "selector2", "k1", "k2", "mail", "dkim", "s1", "s2"]
+MAX_PTR_LOOKUPS = 4           # reverse lookups for the first few addresses only
+
+NEGATIVE_TTL = 300            # NXDOMAIN/NoAnswer when the response has no SOA
+MAX_TTL = 86400
+
+# Answers for every (name, type) lookup, kept for their record TTL; empty
+# answers for the SOA minimum (RFC 2308). Shared by all scans in the process,
+# so e.g. a hosting provider's NS or a parent's _dmarc record is looked up once.
+_records = MemoryCache()
 
-def check_reverse_dns(ip: str) -> bool:
+def _negative_ttl(exc) -> int:
     try:
-        res = dns.resolver.Resolver(configure=False)
-        res.nameservers = ["8.8.8.8", "1.1.1.1"]
-        answers = res.resolve_address(ip)
-        return len(answers) > 0
+        if isinstance(exc, dns.resolver.NXDOMAIN):
+            responses = list(exc.responses().values())
+        else:
+            responses = [exc.kwargs["response"]]
+        for response in responses:
+            for rrset in response.authority:
+                if rrset.rdtype == dns.rdatatype.SOA:
+                    return min(rrset.ttl, rrset[0].minimum)
     except Exception:
-        return False
+        pass
+    return NEGATIVE_TTL
+
+async def _query(name: str, rtype: str, nameservers=None):
+    """returns (values, ttl); ttl is None when the failure shouldn't be cached"""
+    try:
+        answers = await dns_resolver(nameservers).resolve(name, rtype)
+        return [a.to_text() for a in answers], answers.rrset.ttl
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as e:
+        return [], _negative_ttl(e)
+    except Exception:
+        return [], None
+
+async def lookup(name: str, rtype: str, nameservers=None):
+    """(values, ttl) for one record set, from the in-process cache when fresh."""
+    key = f"{name.lower()}/{rtype}/{','.join(nameservers or [])}"
+    hit = _records.get("rr", key)
+    if hit is not MISS:
+        return hit
+    values, ttl = await _query(name, rtype, nameservers)
+    if ttl is not None and ttl > 0:
+        _records.set("rr", key, (values, ttl), min(ttl, MAX_TTL))
+    return values, ttl
+
+def _txt(value: str) -> str:
+    # '"v=spf1 " "include:..."' -> 'v=spf1 include:...'
+    return "".join(part.strip('"') for part in value.split('" "'))
+
+async def resolve_records_with_ttl_async(domain: str, config: dict | None = None):
+    """
+    All record types, _dmarc, the DKIM selectors and (after the addresses are
+    known) PTR records, queried concurrently against config["dns_nameservers"].
+    returns (records, ttl) where ttl is the smallest TTL across all lookups,
+    or None if any lookup failed in a way that shouldn't be cached.
+    records: {"A", "AAAA", "MX", "TXT", "NS": [...], "DMARC": [txt],
+              "DKIM": [selectors found], "PTR": {ip: [names]}}
+    """
+    nameservers = (config or {}).get("dns_nameservers")
+    selectors = (config or {}).get("dkim_selectors", DKIM_SELECTORS)
+    queries = [(domain, rtype) for rtype in RECORD_TYPES] + [(f"_dmarc.{domain}", "TXT")]
+    queries += [(f"{s}._domainkey.{domain}", "TXT") for s in selectors]
+    answers = dict(zip(queries, await asyncio.gather(*(lookup(n, t, nameservers) for n, t in queries))))
+
+    data = {rtype: answers[(domain, rtype)][0] for rtype in RECORD_TYPES}
+    data["DMARC"] = [t for t in map(_txt, answers[(f"_dmarc.{domain}", "TXT")][0]) if t.lower().startswith("v=dmarc1")]
+    data["DKIM"] = [s for s in selectors if answers[(f"{s}._domainkey.{domain}", "TXT")][0]]
+
+    ips = (data["A"] + data["AAAA"])[:MAX_PTR_LOOKUPS]
+    ptr_queries = [(dns.reversename.from_address(ip).to_text(), "PTR") for ip in ips]
+    ptr_answers = await asyncio.gather(*(lookup(n, t, nameservers) for n, t in ptr_queries))
+    data["PTR"] = {ip: values for ip, (values, _) in zip(ips, ptr_answers)}
+
+    ttls = [ttl for _, ttl in list(answers.values()) + ptr_answers]
+    return data, (None if None in ttls else min(ttls))
+
+async def resolve_records_async(domain: str, config: dict | None = None):
+    data, _ = await resolve_records_with_ttl_async(domain, config)
+    return data
+
+async def check_reverse_dns_async(ip: str, nameservers=None) -> bool:
+    values, _ = await lookup(dns.reversename.from_address(ip).to_text(), "PTR", nameservers)
+    return len(values) > 0
+
+def resolve_records(domain: str, config: dict | None = None):
+    return run_sync(resolve_records_async(domain, config))
+
+def check_reverse_dns(ip: str, nameservers=None) -> bool:
+    return run_sync(check_reverse_dns_async(ip, nameservers))
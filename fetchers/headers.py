@@ -11,4 +11,6 @@ def extract_security_headers(headers):
         "Cross-Origin-Embedder-Policy",
         "Cross-Origin-Resource-Policy"
     ]
-    return {k: headers.get(k) for k in keys}
+    # Header names are case-insensitive; dict(httpx.Headers) lowercases them
+    lowered = {k.lower(): v for k, v in headers.items()}
+    return {k: lowered.get(k.lower()) for k in keys}
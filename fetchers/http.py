@@ -1,18 +1,178 @@
-import requests
-from requests.exceptions import RequestException
+import asyncio
+import codecs
+import hashlib
+import time
+import httpx
 from typing import Dict, Any
+from urllib.parse import urlparse
+from .pool import http_client, run_sync
 
-def fetch_url(url: str, config: Dict[str, Any]):
+MAX_REDIRECTS = 20
+MAX_BODY_BYTES = 5 * 1024 * 1024      # config["max_body_bytes"]
+TRANSFER_DEADLINE_SECONDS = 25        # config["transfer_deadline_seconds"], for all hops and the body
+
+def _ms(start, end):
+    return round((end - start) * 1000.0, 1) if start is not None and end is not None else None
+
+def _mark(marks, suffix):
+    # httpcore prefixes events with the protocol (http11./http2.)
+    for name, ts in marks.items():
+        if name.endswith(suffix):
+            return ts
+    return None
+
+def error_message(e: BaseException) -> str:
+    """Non-empty description of a fetch error; timeouts start with "timeout" (str() of most is "")."""
+    text = str(e)
+    if isinstance(e, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return text if text.startswith("timeout") else f"timeout: {type(e).__name__}" + (f": {text}" if text else "")
+    return f"{type(e).__name__}: {text}" if text else type(e).__name__
+
+async def _resolve_ms(url: str):
+    parsed = urlparse(url)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    start = time.monotonic()
+    try:
+        await asyncio.get_running_loop().getaddrinfo(parsed.hostname, port)
+    except OSError:
+        pass
+    return _ms(start, time.monotonic())
+
+async def _send_hop(client, request, timeout, hop):
+    """Send one request without following redirects, recording phase timings into hop."""
+    marks = {}
+
+    async def trace(event_name, info):
+        marks[event_name] = time.monotonic()
+
+    request.extensions["trace"] = trace
+    request.extensions["timeout"] = httpx.Timeout(timeout).as_dict()
+    start = time.monotonic()
+    resp = await client.send(request, follow_redirects=False, stream=True)
+    end = time.monotonic()
+    headers_at = _mark(marks, "receive_response_headers.complete")
+    hop.update({
+        "status_code": resp.status_code,
+        # None when a pooled keep-alive connection was reused
+        "connect_ms": _ms(marks.get("connection.connect_tcp.started"), marks.get("connection.connect_tcp.complete")),
+        "tls_ms": _ms(marks.get("connection.start_tls.started"), marks.get("connection.start_tls.complete")),
+        "ttfb_ms": _ms(start, headers_at),
+        "total_ms": _ms(start, end),
+    })
+    return resp, headers_at
+
+async def _read_body(resp, max_bytes, deadline):
+    """
+    Stream the body into a buffer of at most max_bytes, decoding the text as
+    it arrives, until the body ends, the cap is hit or the deadline passes.
+    Sets resp.body, resp.body_text, resp.body_sha256 (of the bytes kept) and
+    resp.truncated (None, "size" or "deadline").
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(resp.charset_encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    body, text, digest, truncated = bytearray(), [], hashlib.sha256(), None
+    chunks = resp.aiter_bytes()   # as received, so a slow drip is kept up to the deadline
+    try:
+        while max_bytes:   # 0: headers only
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                truncated = "deadline"
+                break
+            if len(body) + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - len(body)]
+                truncated = "size"
+            body += chunk
+            digest.update(chunk)
+            text.append(decoder.decode(chunk))
+            if truncated:
+                break
+        text.append(decoder.decode(b"", final=True))
+    finally:
+        await resp.aclose()
+    resp.body = bytes(body)
+    resp.body_text = "".join(text)
+    resp.body_sha256 = digest.hexdigest()
+    resp.truncated = truncated
+
+async def fetch_url_async(url: str, config: Dict[str, Any], validators: Dict[str, Any] | None = None,
+                          read_body: bool = True):
+    """
+    GET url, following redirects hop by hop so each one is timed. The returned
+    response (or exception) carries a .timing dict:
+    {"dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "total_ms", "chain": [per-hop timings]}
+
+    validators ({"etag", "last_modified"} from an earlier response) make the
+    request conditional; an unchanged page then answers 304 with no body.
+
+    The body is streamed and capped (see _read_body): read resp.body_text and
+    resp.body_sha256, not resp.text/resp.content. The whole transfer, redirects
+    included, must finish within config["transfer_deadline_seconds"]; a body
+    cut short by the cap or the deadline is kept and flagged in resp.truncated.
+    With read_body=False the connection is closed after the headers and the
+    body is left empty.
+    """
     headers = {
         "User-Agent": config.get("user_agent", "WebScanBot/1.0")
     }
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    timeout = config.get("timeout_seconds", 20)
+    max_bytes = config.get("max_body_bytes", MAX_BODY_BYTES)
+    client = http_client()
+    chain = []
+    history = []
+    headers_at = None
+    start = time.monotonic()
+    deadline = start + config.get("transfer_deadline_seconds", TRANSFER_DEADLINE_SECONDS)
     try:
-        resp = requests.get(
-            url,
-            headers=headers,
-            timeout=config.get("timeout_seconds", 20),
-            allow_redirects=True
-        )
+        request = client.build_request("GET", url, headers=headers)
+        last_host = None
+        while True:
+            hop = {"url": str(request.url), "dns_ms": None}
+            if request.url.host != last_host:
+                hop["dns_ms"] = await _resolve_ms(str(request.url))
+                last_host = request.url.host
+            chain.append(hop)
+            try:
+                resp, headers_at = await asyncio.wait_for(_send_hop(client, request, timeout, hop),
+                                                          max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                raise httpx.TimeoutException("timeout: transfer deadline exceeded", request=request)
+            if not resp.has_redirect_location or resp.next_request is None:
+                break
+            await resp.aclose()   # redirect bodies are never read
+            if len(history) >= MAX_REDIRECTS:
+                raise httpx.TooManyRedirects("Exceeded maximum allowed redirects.", request=request)
+            history.append(resp)
+            request = resp.next_request
+        resp.history = history
+        await _read_body(resp, max_bytes if read_body else 0, deadline)
+        # TTFB of the final response, measured from the first request
+        resp.timing = _summarize(chain, start, _ms(start, headers_at))
         return resp
-    except RequestException as e:
+    except httpx.HTTPError as e:
+        e.timing = _summarize(chain, start, None)
         return e
+
+def _summarize(chain, start, ttfb_ms):
+    return {
+        "dns_ms": round(sum(h.get("dns_ms") or 0 for h in chain), 1),
+        "connect_ms": round(sum(h.get("connect_ms") or 0 for h in chain), 1),
+        "tls_ms": round(sum(h.get("tls_ms") or 0 for h in chain), 1),
+        "ttfb_ms": ttfb_ms,
+        "total_ms": _ms(start, time.monotonic()),
+        "chain": chain,
+    }
+
+def fetch_url(url: str, config: Dict[str, Any], validators: Dict[str, Any] | None = None, read_body: bool = True):
+    return run_sync(fetch_url_async(url, config, validators, read_body))
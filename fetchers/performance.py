@@ -1,12 +1,53 @@
 import time
-import requests
+from .http import error_message
+from .pool import http_client, run_sync
 
-def measure_response(url: str, headers: dict, timeout: int = 20):
+async def measure_response_async(url: str, headers: dict, timeout: int = 20):
     start = time.time()
     try:
-        resp = requests.get(url, headers=headers, timeout=timeout)
+        resp = await http_client().get(url, headers=headers, timeout=timeout, follow_redirects=True)
         elapsed = (time.time() - start) * 1000.0
         return {"ms": int(elapsed), "status_code": resp.status_code, "redirects": len(resp.history)}
     except Exception as e:
         elapsed = (time.time() - start) * 1000.0
-        return {"ms": int(elapsed), "error": str(e)}
+        return {"ms": int(elapsed), "error": error_message(e)}
+
+def measure_response(url: str, headers: dict, timeout: int = 20):
+    return run_sync(measure_response_async(url, headers, timeout))
+
+async def sample_latency_async(url: str, headers: dict, timeout: int = 20, samples: int = 1):
+    # Sequential on purpose: parallel samples would measure our own contention
+    return [await measure_response_async(url, headers, timeout) for _ in range(samples)]
+
+def perf_from_response(resp, samples=None):
+    """
+    Build the performance artifact from the primary fetch's timing, so the page
+    isn't downloaded a second time. Extra samples (multi-sample latency mode) are
+    folded into "ms" as a mean and kept under "samples".
+    """
+    timing = getattr(resp, "timing", None) or {}
+    total = timing.get("total_ms")
+    perf = {
+        "ms": int(total) if total is not None else None,
+        "dns_ms": timing.get("dns_ms"),
+        "connect_ms": timing.get("connect_ms"),
+        "tls_ms": timing.get("tls_ms"),
+        "ttfb_ms": timing.get("ttfb_ms"),
+        "chain": timing.get("chain", []),
+    }
+    if hasattr(resp, "status_code"):
+        perf["status_code"] = resp.status_code
+        perf["redirects"] = len(resp.history)
+        perf["body_bytes"] = len(getattr(resp, "body", b""))
+        perf["truncated"] = getattr(resp, "truncated", None)
+    else:
+        perf["error"] = error_message(resp)
+
+    if samples:
+        measured = [s["ms"] for s in samples if "error" not in s]
+        if perf["ms"] is not None and "error" not in perf:
+            measured.insert(0, perf["ms"])
+        perf["samples"] = measured
+        if measured:
+            perf["ms"] = int(sum(measured) / len(measured))
+    return perf
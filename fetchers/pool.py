@@ -0,0 +1,96 @@
+import asyncio
+import ssl
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import dns.asyncresolver
+
+# Shared network resources for every fetcher. One pooled HTTP client (per event
+# loop, since httpx clients are loop-bound), one DNS resolver and one TLS
+# context are reused across all scans in the process.
+
+NAMESERVERS = ["8.8.8.8", "1.1.1.1"]  # Google & Cloudflare DNS
+
+HTTP_LIMITS = httpx.Limits(max_connections=500, max_keepalive_connections=100, keepalive_expiry=30)
+
+# Threads for fetchers that only have blocking clients (WHOIS). Sized well above
+# asyncio's default executor so slow lookups don't throttle a large batch.
+BLOCKING_WORKERS = 64
+
+_lock = threading.Lock()
+_clients = weakref.WeakKeyDictionary()
+_resolvers = {}
+_tls_context = None
+_loop = None
+_blocking = None
+
+def tls_context() -> ssl.SSLContext:
+    global _tls_context
+    with _lock:
+        if _tls_context is None:
+            _tls_context = ssl.create_default_context()
+        return _tls_context
+
+def _split_nameserver(entry: str):
+    if entry.startswith("["):                 # [v6]:port
+        host, _, port = entry[1:].partition("]:")
+        return host, int(port) if port else None
+    if entry.count(":") == 1:                 # v4:port (bare IPv6 has several colons)
+        host, port = entry.split(":")
+        return host, int(port)
+    return entry, None
+
+def dns_resolver(nameservers: list[str] | None = None) -> dns.asyncresolver.Resolver:
+    """
+    Shared resolver for nameservers (default NAMESERVERS). Entries are "ip" or
+    "ip:port" ("[v6]:port" for IPv6), so tests can point at a local stub server.
+    """
+    key = tuple(nameservers or NAMESERVERS)
+    with _lock:
+        res = _resolvers.get(key)
+        if res is None:
+            # configure=False prevents trying to open /etc/resolv.conf
+            res = dns.asyncresolver.Resolver(configure=False)
+            res.nameservers, res.nameserver_ports = [], {}
+            for entry in key:
+                host, port = _split_nameserver(entry)
+                res.nameservers.append(host)
+                if port:
+                    res.nameserver_ports[host] = port
+            res.timeout = 5
+            res.lifetime = 10
+            _resolvers[key] = res
+        return res
+
+def http_client() -> httpx.AsyncClient:
+    """Pooled client for the running event loop; created on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(verify=tls_context(), limits=HTTP_LIMITS)
+        _clients[loop] = client
+    return client
+
+def blocking_executor() -> ThreadPoolExecutor:
+    global _blocking
+    with _lock:
+        if _blocking is None:
+            _blocking = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="webscan-blocking")
+        return _blocking
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="webscan-fetchers", daemon=True).start()
+        return _loop
+
+def run_sync(coro, timeout=None):
+    """
+    Run a fetcher coroutine on the shared background loop and block until it
+    finishes. Lets sync callers (and threads) share the async connection pools.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _background_loop())
+    return future.result(timeout)
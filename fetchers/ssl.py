@@ -1,16 +1,25 @@
+import asyncio
 import ssl
-import socket
 from datetime import datetime
+from cryptography import x509
 from OpenSSL import crypto
 from typing import Dict, Any
+from .pool import tls_context, run_sync
+
+async def fetch_certificate_async(hostname: str, port: int = 443):
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(hostname, port, ssl=tls_context(), server_hostname=hostname),
+        timeout=10
+    )
+    try:
+        der = writer.get_extra_info("ssl_object").getpeercert(True)
+        pem = ssl.DER_cert_to_PEM_cert(der)
+        return pem
+    finally:
+        writer.close()
 
 def fetch_certificate(hostname: str, port: int = 443):
-    ctx = ssl.create_default_context()
-    with socket.create_connection((hostname, port), timeout=10) as sock:
-        with ctx.wrap_socket(sock, server_hostname=hostname) as ssock:
-            der = ssock.getpeercert(True)
-            pem = ssl.DER_cert_to_PEM_cert(der)
-            return pem
+    return run_sync(fetch_certificate_async(hostname, port))
 
 def parse_cert_pem(pem: str) -> Dict[str, Any]:
     cert = crypto.load_certificate(crypto.FILETYPE_PEM, pem)
@@ -20,11 +29,10 @@ def parse_cert_pem(pem: str) -> Dict[str, Any]:
     not_after = datetime.strptime(cert.get_notAfter().decode(), "%Y%m%d%H%M%SZ")
     san = []
     try:
-        ext_count = cert.get_extension_count()
-        for i in range(ext_count):
-            ext = cert.get_extension(i)
-            if ext.get_short_name().decode() == "subjectAltName":
-                san = [x.strip() for x in ext.__str__().split(",")]
+        # pyOpenSSL dropped its X509 extension API; read SANs through cryptography
+        names = cert.to_cryptography().extensions.get_extension_for_class(x509.SubjectAlternativeName).value
+        san = [f"DNS:{n}" for n in names.get_values_for_type(x509.DNSName)]
+        san += [f"IP Address:{ip}" for ip in names.get_values_for_type(x509.IPAddress)]
     except Exception:
         pass
     return {
@@ -0,0 +1,224 @@
+import asyncio
+import select
+import socket
+import time
+import certifi
+from cryptography import x509
+from cryptography.x509 import ocsp
+from OpenSSL import SSL, crypto
+from ..cache import MISS, MemoryCache
+from .pool import blocking_executor
+from .ssl import parse_cert_pem
+
+# TLS inspection. One full handshake per host yields the leaf, the chain the
+# server sent, verification errors, the negotiated protocol and cipher and any
+# stapled OCSP response. Protocol and cipher support are server settings, so
+# the few extra probes they need (legacy versions, weak ciphers) run in
+# parallel once per IP:port and are shared by every host on that address.
+
+HANDSHAKE_TIMEOUT = 10
+PROBE_TTL = 6 * 3600          # per IP:port; about the length of a large batch
+
+# Protocols probed separately; TLSv1.2 only when the main handshake got 1.3
+LEGACY_VERSIONS = {"TLSv1": SSL.TLS1_VERSION, "TLSv1.1": SSL.TLS1_1_VERSION}
+WEAK_CIPHERS = b"RC4:3DES:DES:NULL:EXPORT:aNULL:eNULL:@SECLEVEL=0"
+
+# X509_V_ERR_* codes worth naming in check details
+VERIFY_ERRORS = {
+    10: "certificate has expired",
+    18: "self-signed certificate",
+    19: "self-signed certificate in chain",
+    20: "unable to get local issuer certificate",
+    21: "unable to verify the first certificate",
+    9: "certificate is not yet valid",
+}
+
+_probes = MemoryCache()
+_inflight = {}   # (loop, "ip:port") -> task, so concurrent scans of one address share a probe
+
+def _handshake(ip, port, hostname, configure, timeout):
+    """Blocking handshake with a ctx configured by configure(ctx, state); returns (conn, state)."""
+    state = {"verify_errors": [], "ocsp": None}
+    ctx = SSL.Context(SSL.TLS_METHOD)
+    configure(ctx, state)
+    sock = socket.create_connection((ip, port), timeout=timeout)
+    conn = SSL.Connection(ctx, sock)
+    conn.set_tlsext_host_name(hostname.encode("idna"))
+    if state.get("request_ocsp"):
+        conn.request_ocsp()
+    conn.set_connect_state()
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                conn.do_handshake()
+                state["sock"] = sock
+                return conn, state
+            except SSL.WantReadError:
+                wait = ([sock], [])
+            except SSL.WantWriteError:
+                wait = ([], [sock])
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not any(select.select(*wait, [], remaining)):
+                raise socket.timeout("TLS handshake timed out")
+    except BaseException:
+        sock.close()
+        raise
+
+def _close(conn, state):
+    try:
+        conn.shutdown()
+    except SSL.Error:
+        pass
+    state["sock"].close()
+
+def _main_config(ctx, state):
+    ctx.load_verify_locations(certifi.where())
+
+    def verify(conn, cert, errnum, depth, ok):
+        if not ok:
+            state["verify_errors"].append({"depth": depth, "code": errnum,
+                                           "error": VERIFY_ERRORS.get(errnum, f"verify error {errnum}")})
+        return True   # record, don't abort: the rest of the handshake is still worth inspecting
+
+    def ocsp(conn, data, _):
+        state["ocsp"] = data or None
+        return True
+
+    ctx.set_verify(SSL.VERIFY_PEER, verify)
+    ctx.set_ocsp_client_callback(ocsp)
+    state["request_ocsp"] = True
+
+def _ocsp_status(data):
+    if not data:
+        return None
+    try:
+        response = ocsp.load_der_ocsp_response(data)
+        if response.response_status != ocsp.OCSPResponseStatus.SUCCESSFUL:
+            return {"status": response.response_status.name.lower()}
+        return {"status": response.certificate_status.name.lower(),
+                "next_update": response.next_update_utc.isoformat() if response.next_update_utc else None}
+    except Exception as e:
+        return {"status": "unparsable", "error": str(e)}
+
+def _cert_summary(cert):
+    return {
+        "subject": cert.get_subject().CN,
+        "issuer": cert.get_issuer().CN,
+        "not_after": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.strptime(cert.get_notAfter().decode(), "%Y%m%d%H%M%SZ")),
+        "self_signed": cert.get_subject() == cert.get_issuer(),
+    }
+
+def _hostname_matches(hostname, san):
+    hostname = hostname.lower().rstrip(".")
+    for entry in san:
+        if not entry.startswith("DNS:"):
+            continue
+        pattern = entry[4:].lower().rstrip(".")
+        if pattern == hostname:
+            return True
+        if pattern.startswith("*.") and hostname.count(".") >= 2 and hostname.split(".", 1)[1] == pattern[2:]:
+            return True
+    return False
+
+def inspect_handshake(ip, port, hostname, timeout=HANDSHAKE_TIMEOUT) -> dict:
+    """Leaf, chain, verification, protocol, cipher and stapled OCSP from one handshake."""
+    conn, state = _handshake(ip, port, hostname, _main_config, timeout)
+    try:
+        leaf = conn.get_peer_certificate()
+        info = parse_cert_pem(crypto.dump_certificate(crypto.FILETYPE_PEM, leaf).decode())
+        try:
+            leaf.to_cryptography().extensions.get_extension_for_class(x509.PrecertificateSignedCertificateTimestamps)
+            scts = True
+        except x509.ExtensionNotFound:
+            scts = False
+        info.update({
+            "ip": ip,
+            "chain": [_cert_summary(c) for c in conn.get_peer_cert_chain() or []],
+            "verify_errors": state["verify_errors"],
+            "hostname_match": _hostname_matches(hostname, info.get("san", [])),
+            "protocol": conn.get_protocol_version_name(),
+            "cipher": conn.get_cipher_name(),
+            "cipher_bits": conn.get_cipher_bits(),
+            "ocsp": _ocsp_status(state["ocsp"]),
+            "sct": scts,
+        })
+        return info
+    finally:
+        _close(conn, state)
+
+def _accepts(ip, port, hostname, configure, timeout):
+    """Negotiated cipher if the server completes a handshake under configure, False if it refuses, None if unreachable."""
+    try:
+        conn, state = _handshake(ip, port, hostname, configure, timeout)
+    except SSL.Error:
+        return False
+    except OSError:
+        return None
+    try:
+        return conn.get_cipher_name()
+    finally:
+        _close(conn, state)
+
+def _only_version(version):
+    def configure(ctx, state):
+        ctx.set_min_proto_version(version)
+        ctx.set_max_proto_version(version)
+        ctx.set_cipher_list(b"ALL:@SECLEVEL=0")
+    return configure
+
+def _weak_only(ctx, state):
+    ctx.set_max_proto_version(SSL.TLS1_2_VERSION)   # TLS 1.3 suites are all strong
+    ctx.set_cipher_list(WEAK_CIPHERS)
+
+async def _probe_address(ip, port, hostname, negotiated, timeout):
+    """{"versions": {name: bool|None}, "weak_cipher": name|False|None} for one IP:port."""
+    loop = asyncio.get_running_loop()
+    probes = {name: _only_version(v) for name, v in LEGACY_VERSIONS.items()}
+    if negotiated == "TLSv1.3":
+        probes["TLSv1.2"] = _only_version(SSL.TLS1_2_VERSION)
+    try:
+        SSL.Context(SSL.TLS_METHOD).set_cipher_list(WEAK_CIPHERS)
+        probes["weak"] = _weak_only
+    except SSL.Error:
+        pass   # this OpenSSL build has none of them, so they can't be offered
+    results = await asyncio.gather(*(loop.run_in_executor(blocking_executor(), _accepts, ip, port, hostname, c, timeout)
+                                     for c in probes.values()))
+    outcome = dict(zip(probes, results))
+    versions = {name: (None if outcome[name] is None else bool(outcome[name])) for name in probes if name != "weak"}
+    versions[negotiated] = True
+    if negotiated == "TLSv1.2":
+        versions["TLSv1.3"] = False   # offered in the main handshake and not chosen
+    return {"versions": versions, "weak_cipher": outcome.get("weak")}
+
+async def probe_address(ip, port, hostname, negotiated, timeout=HANDSHAKE_TIMEOUT):
+    """Version/cipher support for ip:port, probed once per PROBE_TTL however many hosts share it."""
+    key = f"{ip}:{port}"
+    value = _probes.get("tls", key)
+    if value is not MISS:
+        return value
+    loop = asyncio.get_running_loop()
+    task = _inflight.get((loop, key))
+    if task is None:
+        task = _inflight[(loop, key)] = asyncio.ensure_future(_probe_address(ip, port, hostname, negotiated, timeout))
+        task.add_done_callback(lambda _: _inflight.pop((loop, key), None))
+    value = await asyncio.shield(task)
+    if None not in value["versions"].values():
+        _probes.set("tls", key, value, PROBE_TTL)
+    return value
+
+async def probe_tls_async(hostname: str, port: int = 443, timeout: float = HANDSHAKE_TIMEOUT) -> dict:
+    """
+    Everything ssl_tls checks: the parse_cert_pem fields plus chain,
+    verify_errors, hostname_match, protocol, cipher, ocsp, sct, versions and
+    weak_cipher. On failure, {"handshake_error": ...} only.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(hostname, port, type=socket.SOCK_STREAM)
+        ip = infos[0][4][0]
+        info = await loop.run_in_executor(blocking_executor(), inspect_handshake, ip, port, hostname, timeout)
+    except (OSError, SSL.Error) as e:
+        return {"handshake_error": str(e) or type(e).__name__}
+    info.update(await probe_address(ip, port, hostname, info["protocol"], timeout))
+    return info
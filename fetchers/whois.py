@@ -1,5 +1,7 @@
+import asyncio
 import whois
 from datetime import datetime
+from .pool import blocking_executor
 
 def fetch_whois(domain: str):
     try:
@@ -18,6 +20,10 @@ def fetch_whois(domain: str):
     except Exception as e:
         return {"error": str(e)}
 
+async def fetch_whois_async(domain: str):
+    # python-whois only has a blocking client; keep it off the event loop
+    return await asyncio.get_running_loop().run_in_executor(blocking_executor(), fetch_whois, domain)
+
 def _to_iso(dt):
     if dt is None:
         return None
@@ -1,15 +1,106 @@
-import sqlite3
-import os
+from datetime import datetime
+import db_helpers
+from jobs import init_jobs_table
+from profiles import init_profiles_table
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "webscan.db")
+# Postgres schema: same tables and columns as the SQLite one below, with native
+# timestamps, and findings range-partitioned by month on created_at so old
+# months can be detached or dropped instead of deleted row by row
+PG_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS domains (
+        id BIGSERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        domain TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        id BIGSERIAL PRIMARY KEY,
+        domain TEXT NOT NULL,
+        trust_score INTEGER,
+        verdict TEXT,
+        severity TEXT,
+        created_at TIMESTAMP NOT NULL,
+        profile_version INTEGER
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS parameter_risks (
+        run_id BIGINT NOT NULL REFERENCES runs (id),
+        parameter TEXT NOT NULL,
+        risk DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (run_id, parameter)
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS findings (
+        id BIGSERIAL,
+        run_id BIGINT NOT NULL REFERENCES runs (id),
+        parameter TEXT,
+        risk TEXT,
+        severity TEXT,
+        created_at TIMESTAMP NOT NULL,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)""",
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id BIGSERIAL PRIMARY KEY,
+        domain TEXT NOT NULL,
+        change TEXT,
+        severity TEXT,
+        created_at TIMESTAMP NOT NULL
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS actions (
+        id BIGSERIAL PRIMARY KEY,
+        domain TEXT NOT NULL,
+        issue TEXT,
+        risk TEXT,
+        action TEXT,
+        status TEXT
+    )""",
+]
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
+def init_pg(conn):
     cur = conn.cursor()
-    
+    for ddl in PG_TABLES:
+        cur.execute(ddl)
+    cur.execute("ALTER TABLE runs ADD COLUMN IF NOT EXISTS profile_version INTEGER")
+
+    # This month's and next month's findings partitions; later ones are
+    # created by the first save that needs them
+    now = datetime.utcnow()
+    conn.commit()
+    db_helpers.ensure_partition(conn, "findings", now)
+    db_helpers.ensure_partition(conn, "findings", datetime(now.year + now.month // 12, now.month % 12 + 1, 1))
+
+    conn.commit()
+
+    # latest_run, its backfill and the dashboard indexes
+    db_helpers.init_latest_run_table(conn)
+    db_helpers.init_scan_state_table(conn)
+
+    init_jobs_table(conn)
+    init_profiles_table(conn)
+    conn.commit()
+
+def init_db():
+    conn = db_helpers.get_conn()
     print("Creating tables...")
-    
+    if db_helpers.is_pg(conn):
+        init_pg(conn)
+        conn.close()
+        print("All tables created successfully.")
+        return
+
+    cur = conn.cursor()
+
     # Users table (handled by SQLAlchemy usually, but ensuring here)
     cur.execute("""
     CREATE TABLE IF NOT EXISTS users (
@@ -37,7 +128,21 @@ def init_db():
         trust_score INTEGER,
         verdict TEXT,
         severity TEXT,
-        created_at TEXT NOT NULL
+        created_at TEXT NOT NULL,
+        profile_version INTEGER
+    )""")
+    # Databases created before scoring profiles existed
+    if "profile_version" not in [row[1] for row in cur.execute("PRAGMA table_info(runs)")]:
+        cur.execute("ALTER TABLE runs ADD COLUMN profile_version INTEGER")
+
+    # Per-parameter risks each run was scored from, for rescoring
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS parameter_risks (
+        run_id INTEGER NOT NULL,
+        parameter TEXT NOT NULL,
+        risk REAL NOT NULL,
+        PRIMARY KEY (run_id, parameter),
+        FOREIGN KEY (run_id) REFERENCES runs (id)
     )""")
     
     # Findings table
@@ -72,6 +177,20 @@ def init_db():
         status TEXT
     )""")
     
+    conn.commit()
+
+    # latest_run (backfilled from runs when new) and the dashboard indexes
+    db_helpers.init_latest_run_table(conn)
+
+    # Last scan's state per domain, for incremental re-scans
+    db_helpers.init_scan_state_table(conn)
+
+    # Scan job queue
+    init_jobs_table(conn)
+
+    # Scoring profiles
+    init_profiles_table(conn)
+
     conn.commit()
     conn.close()
     print("All tables created successfully.")
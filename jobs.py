@@ -0,0 +1,177 @@
+# jobs.py
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+# Durable scan-job queue stored in the main database. The API enqueues jobs and
+# returns immediately; worker processes (worker.py) claim and run them.
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+MAX_ATTEMPTS = 3   # claims per job (attempts counts them) before it's marked failed
+# Check profiles a job may name: the keys of checks/registry.py PROFILES (the
+# API can't import the check registry, so enqueue validates against these)
+CHECK_PROFILES = ("full", "headers", "fast")
+
+JOB_COLUMNS = ["id", "url", "domain", "user_id", "status", "attempts", "run_id", "error",
+               "cancel_requested", "worker", "created_at", "started_at", "finished_at", "profile"]
+
+def _is_pg(conn) -> bool:
+    # db_helpers.PgConnection; plain sqlite3 connections have no backend attribute
+    return getattr(conn, "backend", "sqlite") == "pg"
+
+def init_jobs_table(conn: sqlite3.Connection):
+    pg = _is_pg(conn)
+    id_col = "BIGSERIAL PRIMARY KEY" if pg else "INTEGER PRIMARY KEY AUTOINCREMENT"
+    ts = "TIMESTAMP" if pg else "TEXT"
+    cur = conn.cursor()
+    cur.execute(f"""
+    CREATE TABLE IF NOT EXISTS scan_jobs (
+        id {id_col},
+        url TEXT NOT NULL,
+        domain TEXT NOT NULL,
+        user_id INTEGER,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        run_id INTEGER,
+        error TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        worker TEXT,
+        created_at {ts} NOT NULL,
+        started_at {ts},
+        finished_at {ts},
+        profile TEXT
+    )""")
+    # Check profile (checks/registry.py PROFILES) for this job; NULL runs every check
+    if pg:
+        cur.execute("ALTER TABLE scan_jobs ADD COLUMN IF NOT EXISTS profile TEXT")
+    elif "profile" not in [row[1] for row in cur.execute("PRAGMA table_info(scan_jobs)").fetchall()]:
+        cur.execute("ALTER TABLE scan_jobs ADD COLUMN profile TEXT")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs (status, id)")
+    conn.commit()
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+def _row_to_job(row) -> Optional[Dict[str, Any]]:
+    if not row:
+        return None
+    job = dict(zip(JOB_COLUMNS, row))
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+def enqueue(conn: sqlite3.Connection, url: str, domain: str, user_id: Optional[int] = None,
+            profile: Optional[str] = None) -> int:
+    if profile is not None and profile not in CHECK_PROFILES:
+        raise ValueError(f"Unknown check profile {profile!r}; expected one of {', '.join(CHECK_PROFILES)}")
+    cur = conn.cursor()
+    sql = """
+        INSERT INTO scan_jobs (url, domain, user_id, status, created_at, profile)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+    if _is_pg(conn):
+        cur.execute(sql + " RETURNING id", (url, domain, user_id, QUEUED, _now(), profile))
+        job_id = cur.fetchone()[0]
+    else:
+        cur.execute(sql, (url, domain, user_id, QUEUED, _now(), profile))
+        job_id = cur.lastrowid
+    conn.commit()
+    return job_id
+
+def get_job(conn: sqlite3.Connection, job_id: int) -> Optional[Dict[str, Any]]:
+    cur = conn.cursor()
+    cur.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM scan_jobs WHERE id=?", (job_id,))
+    return _row_to_job(cur.fetchone())
+
+def claim_next(conn: sqlite3.Connection, worker: str) -> Optional[Dict[str, Any]]:
+    """
+    Atomically move the oldest queued job to running and return it, or None.
+    On SQLite, BEGIN IMMEDIATE takes the write lock up front so two workers
+    can't claim the same job; on Postgres, SKIP LOCKED lets concurrent workers
+    each take a different row without waiting on one another.
+    """
+    cur = conn.cursor()
+    pg = _is_pg(conn)
+    if not pg:
+        cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM scan_jobs WHERE status=? ORDER BY id LIMIT 1"
+                    + (" FOR UPDATE SKIP LOCKED" if pg else ""), (QUEUED,))
+        job = _row_to_job(cur.fetchone())
+        if job:
+            cur.execute("""
+                UPDATE scan_jobs SET status=?, worker=?, started_at=?, attempts=attempts+1
+                WHERE id=?
+            """, (RUNNING, worker, _now(), job["id"]))
+            job.update(status=RUNNING, worker=worker, attempts=job["attempts"] + 1)
+        conn.commit()
+        return job
+    except Exception:
+        conn.rollback()
+        raise
+
+def finish(conn: sqlite3.Connection, job_id: int, run_id: int):
+    cur = conn.cursor()
+    cur.execute("UPDATE scan_jobs SET status=?, run_id=?, finished_at=? WHERE id=? AND status=?",
+                (DONE, run_id, _now(), job_id, RUNNING))
+    conn.commit()
+
+def finish_many(conn: sqlite3.Connection, completed):
+    """completed: iterable of (job_id, run_id)"""
+    now = _now()
+    cur = conn.cursor()
+    cur.executemany("UPDATE scan_jobs SET status=?, run_id=?, finished_at=? WHERE id=? AND status=?",
+                    [(DONE, run_id, now, job_id, RUNNING) for job_id, run_id in completed])
+    conn.commit()
+
+def fail(conn: sqlite3.Connection, job_id: int, error: str, max_attempts: int = MAX_ATTEMPTS):
+    """Put the job back in the queue, or mark it failed after max_attempts."""
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE scan_jobs
+        SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, error=?, finished_at=?
+        WHERE id=? AND status=?
+    """, (max_attempts, FAILED, QUEUED, error, _now(), job_id, RUNNING))
+    conn.commit()
+
+def cancel(conn: sqlite3.Connection, job_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Queued jobs are cancelled at once. Running jobs are flagged; the worker
+    drops their results when the scan finishes.
+    """
+    cur = conn.cursor()
+    cur.execute("UPDATE scan_jobs SET status=?, finished_at=? WHERE id=? AND status=?",
+                (CANCELLED, _now(), job_id, QUEUED))
+    cur.execute("UPDATE scan_jobs SET cancel_requested=1 WHERE id=? AND status=?", (job_id, RUNNING))
+    conn.commit()
+    return get_job(conn, job_id)
+
+def is_cancel_requested(conn: sqlite3.Connection, job_id: int) -> bool:
+    cur = conn.cursor()
+    cur.execute("SELECT cancel_requested FROM scan_jobs WHERE id=?", (job_id,))
+    row = cur.fetchone()
+    return bool(row and row[0])
+
+def mark_cancelled(conn: sqlite3.Connection, job_id: int):
+    cur = conn.cursor()
+    cur.execute("UPDATE scan_jobs SET status=?, finished_at=? WHERE id=?", (CANCELLED, _now(), job_id))
+    conn.commit()
+
+def requeue_stale(conn: sqlite3.Connection, older_than_seconds: int = 600, max_attempts: int = MAX_ATTEMPTS) -> int:
+    """
+    Return jobs stuck in running (their worker died) to the queue, or mark
+    them failed after max_attempts as fail() does, so a job that keeps
+    crashing its worker isn't retried forever.
+    """
+    cutoff = (datetime.utcnow() - timedelta(seconds=older_than_seconds)).isoformat()
+    cur = conn.cursor()
+    cur.execute("UPDATE scan_jobs SET status=?, finished_at=? WHERE status=? AND started_at<? AND cancel_requested=1",
+                (CANCELLED, _now(), RUNNING, cutoff))
+    cur.execute("""
+        UPDATE scan_jobs
+        SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, worker=NULL,
+            error = CASE WHEN attempts >= ? THEN ? ELSE error END,
+            finished_at = CASE WHEN attempts >= ? THEN ? ELSE finished_at END
+        WHERE status=? AND started_at<?
+    """, (max_attempts, FAILED, QUEUED, max_attempts, "worker stopped responding", max_attempts, _now(), RUNNING, cutoff))
+    conn.commit()
+    return cur.rowcount
@@ -0,0 +1,115 @@
+# webscan/keywords.py
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Term lists used by the content checks. Terms are matched case-insensitively as
+# substrings, the same way the checks' old `text.lower().count(term)` loops did.
+DEFAULT_TERMS = {
+    "spam": ["free", "win", "credit", "loan", "viagra", "casino"],
+    "seo_stuffing": ["buy", "cheap", "best", "discount"],
+    "meta_spam": ["free", "win", "cheap"],
+    "legal_text": ["privacy policy", "terms of service", "contact us"],
+    "legal_links": ["privacy", "terms", "contact"],
+}
+
+# Below this many terms, per-term str.count (a C-speed scan each) beats one
+# pass through the matcher, so small lists skip it. Results are identical.
+SMALL_TERM_LIST = 48
+
+class KeywordMatcher:
+    """
+    Counts every term in one linear pass over the text, regardless of how many
+    terms there are. Counts equal str.count(term) for each term: occurrences of
+    one term never overlap each other, but different terms may overlap.
+
+    Uses pyahocorasick when installed, otherwise a single compiled trie regex.
+    Short lists fall back to str.count, which is faster at that size.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({t.lower() for t in terms if t})
+        # Every term that is a prefix of another: a match of the longer term at
+        # some position is also a match of all its prefixes at that position
+        term_set = set(self.terms)
+        self._prefixes = {t: [t[:i] for i in range(1, len(t) + 1) if t[:i] in term_set] for t in self.terms}
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for t in self.terms:
+                self._automaton.add_word(t, t)
+            if self.terms:
+                self._automaton.make_automaton()
+            self._regex = None
+        else:
+            self._automaton = None
+            self._regex = re.compile("(?=(" + _trie_pattern(self.terms) + "))") if self.terms else None
+
+    def count(self, text: str) -> Dict[str, int]:
+        """text must already be lowercased."""
+        counts = dict.fromkeys(self.terms, 0)
+        last_end = dict.fromkeys(self.terms, 0)
+        if not self.terms or not text:
+            return counts
+        if len(self.terms) < SMALL_TERM_LIST:
+            return {t: text.count(t) for t in self.terms}
+        if self._automaton is not None:
+            for end, term in self._automaton.iter(text):
+                start = end - len(term) + 1
+                if start >= last_end[term]:
+                    counts[term] += 1
+                    last_end[term] = start + len(term)
+        else:
+            for m in self._regex.finditer(text):
+                start = m.start()
+                for term in self._prefixes[m.group(1)]:
+                    if start >= last_end[term]:
+                        counts[term] += 1
+                        last_end[term] = start + len(term)
+        return counts
+
+def _trie_pattern(terms: List[str]) -> str:
+    # Build a regex shaped like a trie so matching cost at each position depends
+    # on term length, not on the number of terms. Greedy optional groups make it
+    # return the longest term starting at a position.
+    trie = {}
+    for t in terms:
+        node = trie
+        for ch in t:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if terminal else body
+
+    return build(trie)
+
+def load_term_lists(config: dict) -> Dict[str, List[str]]:
+    """
+    DEFAULT_TERMS overridden per group by the JSON file at config["keyword_lists_path"]
+    and then by config["keyword_lists"] ({group: [terms]}).
+    """
+    lists = dict(DEFAULT_TERMS)
+    if config.get("keyword_lists_path"):
+        lists.update(_read_term_file(config["keyword_lists_path"]))
+    lists.update(config.get("keyword_lists") or {})
+    return lists
+
+@lru_cache(maxsize=8)
+def _read_term_file(path: str) -> Dict[str, List[str]]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+@lru_cache(maxsize=32)
+def get_matcher(terms: frozenset) -> KeywordMatcher:
+    # Compiling is the expensive part; reuse matchers across scans
+    return KeywordMatcher(terms)
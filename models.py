@@ -1,3 +1,4 @@
+import sys
 from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
@@ -6,7 +7,10 @@ from sqlalchemy import Column, Integer, String
 from db import Base
 
 # --- Existing dataclass for scan results ---
-@dataclass
+# Slotted, with the few distinct category/name/status strings interned, since
+# every scan makes ~120 of these. For many scans' results held at once, see
+# check_batch.CheckBatch.
+@dataclass(slots=True)
 class CheckResult:
     category: str
     name: str
@@ -14,6 +18,11 @@ class CheckResult:
     value: Optional[str]
     details: Optional[str]
 
+    def __post_init__(self):
+        self.category = sys.intern(self.category)
+        self.name = sys.intern(self.name)
+        self.status = sys.intern(self.status)
+
 def now_iso() -> str:
     return datetime.utcnow().isoformat(timespec='seconds') + "Z"
 
@@ -0,0 +1,176 @@
+# webscan/politeness.py
+import asyncio
+import ipaddress
+import math
+import time
+from collections import Counter, deque
+from urllib.parse import urlparse
+from .fetchers.dns import lookup
+
+# Politeness for bulk scans. Customer domains often sit behind the same CDN or
+# shared-hosting address, and the HTTP, TLS and latency probes of several
+# scans at once look like an attack to the WAF in front of it (and then come
+# back as blocks and 429s). Every scan belongs to two groups: its registrable
+# domain and the address its host resolves to. Each group has a token bucket
+# (scan starts per second) and a cap on scans in flight. The scheduler looks
+# ahead over a window of queued URLs and starts the first one whose groups all
+# allow it, so scans of other hosts go ahead while a busy one waits.
+
+DEFAULT_PER_HOST = 2          # scans in flight per registrable domain
+DEFAULT_DOMAIN_RATE = 1.0     # scan starts per second per registrable domain
+DEFAULT_DOMAIN_BURST = 2
+DEFAULT_IP_RATE = 4.0         # per address; a CDN address serves many customers
+DEFAULT_IP_BURST = 8
+DEFAULT_IP_CONCURRENCY = 8
+DEFAULT_BACKOFF = 60          # pause after a 429/503 without a usable Retry-After
+MAX_BACKOFF = 600
+RESOLVE_TIMEOUT = 5
+SWEEP_AT = 10000              # buckets kept before idle, full ones are dropped
+
+class TokenBucket:
+    """rate tokens per second up to burst; a rate of 0 or None means unlimited."""
+    __slots__ = ("rate", "burst", "tokens", "updated", "paused_until")
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate or 0
+        self.burst = max(burst or 1, 1)
+        self.tokens = float(self.burst)
+        self.updated = now
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self, now) -> float:
+        """Seconds until a token is available; 0 if one is now."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        if self.rate:
+            self._refill(now)
+            self.tokens -= 1
+
+    def pause(self, until):
+        self.paused_until = max(self.paused_until, until)
+        self.tokens = 0.0
+        self.updated = self.paused_until   # no refill while paused
+
+def retry_after(headers: dict, default: float = DEFAULT_BACKOFF) -> float:
+    """Seconds from a Retry-After header (delta-seconds form only), capped at MAX_BACKOFF."""
+    try:
+        seconds = float((headers or {}).get("retry-after", default))
+    except ValueError:
+        seconds = default
+    return min(max(seconds, 0.0), MAX_BACKOFF)
+
+class PoliteScheduler:
+    """
+    Queue of (url, domain, groups) items for scan_many_async.
+
+    config["per_domain_rate"], config["per_domain_burst"]: token bucket per registrable domain
+    config["per_host_concurrency"]: max scans in flight per registrable domain
+    config["per_ip_rate"], config["per_ip_burst"], config["per_ip_concurrency"]: the same per address
+    """
+
+    def __init__(self, config: dict):
+        self.limits = {
+            "domain": (config.get("per_domain_rate", DEFAULT_DOMAIN_RATE),
+                       config.get("per_domain_burst", DEFAULT_DOMAIN_BURST),
+                       config.get("per_host_concurrency", DEFAULT_PER_HOST)),
+            "ip": (config.get("per_ip_rate", DEFAULT_IP_RATE),
+                   config.get("per_ip_burst", DEFAULT_IP_BURST),
+                   config.get("per_ip_concurrency", DEFAULT_IP_CONCURRENCY)),
+        }
+        self.nameservers = config.get("dns_nameservers")
+        self.pending = deque()
+        self.buckets = {}
+        self.active = Counter()
+
+    def __len__(self):
+        return len(self.pending)
+
+    async def _address(self, host: str):
+        try:
+            return str(ipaddress.ip_address(host))
+        except ValueError:
+            pass
+        try:
+            values, _ = await asyncio.wait_for(lookup(host, "A", self.nameservers), RESOLVE_TIMEOUT)
+        except Exception:
+            return None
+        # CDNs hand out a rotating set; the lowest address is a stable key for it
+        return min(values) if values else None
+
+    async def add(self, items):
+        """Queue (url, domain) pairs, resolving their hosts concurrently (answers land in the DNS cache)."""
+        items = list(items)
+        hosts = [urlparse(url).hostname or domain for url, domain in items]
+        addresses = await asyncio.gather(*(self._address(h) for h in hosts))
+        for (url, domain), ip in zip(items, addresses):
+            groups = (("domain", domain),) + ((("ip", ip),) if ip else ())
+            self.pending.append((url, domain, groups))
+
+    def _bucket(self, group, now):
+        bucket = self.buckets.get(group)
+        if bucket is None:
+            rate, burst, _ = self.limits[group[0]]
+            bucket = self.buckets[group] = TokenBucket(rate, burst, now)
+        return bucket
+
+    def _sweep(self, now):
+        # An idle group whose bucket has refilled is the same as a new one
+        for group, bucket in list(self.buckets.items()):
+            if not self.active[group] and bucket.wait(now) == 0 and (not bucket.rate or bucket.tokens >= bucket.burst):
+                del self.buckets[group]
+
+    def pop_ready(self):
+        """
+        (item, None) for the first queued item every group of which has a
+        token and a free slot, else (None, wake): wake is the seconds until a
+        token frees up, or None if only a finishing scan can unblock anything.
+        """
+        now = time.monotonic()
+        if len(self.buckets) > SWEEP_AT:
+            self._sweep(now)
+        wake = math.inf
+        blocked = set()   # groups already found full this pass
+        for i, item in enumerate(self.pending):
+            groups = item[2]
+            if blocked.intersection(groups):
+                continue
+            wait = 0.0
+            for group in groups:
+                if self.active[group] >= (self.limits[group[0]][2] or math.inf):
+                    blocked.add(group)
+                    wait = None
+                    break
+                group_wait = self._bucket(group, now).wait(now)
+                if group_wait > 0:
+                    blocked.add(group)
+                    wait = max(wait, group_wait)
+            if wait == 0.0:
+                del self.pending[i]
+                for group in groups:
+                    self._bucket(group, now).take(now)
+                    self.active[group] += 1
+                return item, None
+            if wait is not None:
+                wake = min(wake, wait)
+        return None, (None if wake == math.inf else wake)
+
+    def finish(self, item, artifacts=None):
+        """Release item's slots; a 429 or 503 pauses its groups for Retry-After."""
+        for group in item[2]:
+            self.active[group] -= 1
+            if not self.active[group]:
+                del self.active[group]
+        if artifacts and artifacts.get("status_code") in (429, 503):
+            until = time.monotonic() + retry_after(artifacts.get("headers"))
+            for group in item[2]:
+                self._bucket(group, time.monotonic()).pause(until)
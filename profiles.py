@@ -0,0 +1,75 @@
+# profiles.py
+import json
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Versioned scoring profiles: the weights, category weights and severities
+# used to score a run. Every run records the version that scored it, so
+# changing weights means adding a profile and rescoring (rescore.py) from
+# stored parameter risks instead of re-running scans.
+
+PROFILE_COLUMNS = ["version", "name", "weights", "category_weights", "severities", "created_at"]
+
+def _is_pg(conn) -> bool:
+    return getattr(conn, "backend", "sqlite") == "pg"
+
+def init_profiles_table(conn: sqlite3.Connection):
+    pg = _is_pg(conn)
+    cur = conn.cursor()
+    cur.execute(f"""
+    CREATE TABLE IF NOT EXISTS scoring_profiles (
+        version {"SERIAL PRIMARY KEY" if pg else "INTEGER PRIMARY KEY AUTOINCREMENT"},
+        name TEXT,
+        weights TEXT NOT NULL,
+        category_weights TEXT NOT NULL,
+        severities TEXT NOT NULL,
+        created_at {"TIMESTAMP" if pg else "TEXT"} NOT NULL
+    )""")
+    conn.commit()
+
+def _row_to_profile(row) -> Optional[Dict[str, Any]]:
+    if not row:
+        return None
+    profile = dict(zip(PROFILE_COLUMNS, row))
+    for key in ("weights", "category_weights", "severities"):
+        profile[key] = json.loads(profile[key])
+    return profile
+
+def create_profile(conn: sqlite3.Connection, weights: dict, category_weights: dict, severities: dict,
+                   name: Optional[str] = None) -> int:
+    """Store a new profile; it becomes the active one. Returns its version."""
+    cur = conn.cursor()
+    sql = """
+        INSERT INTO scoring_profiles (name, weights, category_weights, severities, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    params = (name, json.dumps(weights), json.dumps(category_weights), json.dumps(severities),
+              datetime.utcnow().isoformat())
+    if _is_pg(conn):
+        cur.execute(sql + " RETURNING version", params)
+        version = cur.fetchone()[0]
+    else:
+        cur.execute(sql, params)
+        version = cur.lastrowid
+    conn.commit()
+    return version
+
+def get_profile(conn: sqlite3.Connection, version: int) -> Optional[Dict[str, Any]]:
+    cur = conn.cursor()
+    cur.execute(f"SELECT {', '.join(PROFILE_COLUMNS)} FROM scoring_profiles WHERE version=?", (version,))
+    return _row_to_profile(cur.fetchone())
+
+def active_profile(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+    """The newest profile; new scans are scored with it."""
+    cur = conn.cursor()
+    cur.execute(f"SELECT {', '.join(PROFILE_COLUMNS)} FROM scoring_profiles ORDER BY version DESC LIMIT 1")
+    return _row_to_profile(cur.fetchone())
+
+def ensure_profile(conn: sqlite3.Connection, weights: dict, category_weights: dict, severities: dict) -> Dict[str, Any]:
+    """The active profile, creating version 1 from the given (built-in) maps if there is none."""
+    profile = active_profile(conn)
+    if profile is None:
+        create_profile(conn, weights, category_weights, severities, name="default")
+        profile = active_profile(conn)
+    return profile
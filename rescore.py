@@ -0,0 +1,114 @@
+# webscan/rescore.py
+import argparse
+import json
+from . import db_helpers, profiles
+from .scoring import CATEGORY_WEIGHTS, ScoreVectors, compute_scores_batch, risk_matrix
+from .severity_mapping import SEVERITY_MAP
+from .weight_mapping import WEIGHT_MAP
+
+# Rescoring job: recomputes the trust score, verdict and severity of stored
+# runs from their persisted parameter risks under a scoring profile. No
+# scanning or network access; runs are streamed in id order, one transaction
+# per batch, so an interrupted job resumes with --after-id.
+
+DEFAULT_BATCH_SIZE = 5000
+
+def _next_batch(conn, version, after_id, batch_size):
+    """Up to batch_size runs after after_id not yet scored with version: (run_ids, risk dicts)."""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT id FROM runs
+        WHERE id > ? AND (profile_version IS NULL OR profile_version <> ?)
+          AND EXISTS (SELECT 1 FROM parameter_risks WHERE run_id = runs.id)
+        ORDER BY id LIMIT ?
+    """, (after_id, version, batch_size))
+    run_ids = [row[0] for row in cur.fetchall()]
+    if not run_ids:
+        return [], []
+    risks = {run_id: {} for run_id in run_ids}
+    cur.execute("SELECT run_id, parameter, risk FROM parameter_risks WHERE run_id BETWEEN ? AND ?",
+                (run_ids[0], run_ids[-1]))
+    for run_id, param, risk in cur.fetchall():
+        if run_id in risks:
+            risks[run_id][param] = risk
+    return run_ids, [risks[run_id] for run_id in run_ids]
+
+def rescore_batch(conn, run_ids, risk_dicts, profile, vectors_cache=None):
+    matrix, params = risk_matrix(risk_dicts)
+    key = tuple(params)
+    vectors = (vectors_cache or {}).get(key)
+    if vectors is None:
+        vectors = ScoreVectors(params, profile["weights"], profile["category_weights"])
+        if vectors_cache is not None:
+            vectors_cache[key] = vectors
+    scores = compute_scores_batch(matrix, vectors)
+
+    rows = [(int(t), str(v), str(s).lower(), run_id) for t, v, s, run_id
+            in zip(scores["trust_score"], scores["verdict"], scores["severity"], run_ids)]
+    # Findings exist for the parameters that didn't pass (risk > 0)
+    severity_rows = [(profile["severities"][p].lower(), run_id, p)
+                     for run_id, risks in zip(run_ids, risk_dicts)
+                     for p, r in risks.items() if r > 0 and p in profile["severities"]]
+
+    cur = conn.cursor()
+    versioned = [row[:3] + (profile["version"], row[3]) for row in rows]
+    cur.executemany("UPDATE runs SET trust_score=?, verdict=?, severity=?, profile_version=? WHERE id=?", versioned)
+    cur.executemany("UPDATE latest_run SET trust_score=?, verdict=?, severity=?, profile_version=? WHERE run_id=?",
+                    versioned)
+    cur.executemany("UPDATE findings SET severity=? WHERE run_id=? AND parameter=?", severity_rows)
+    conn.commit()
+
+def rescore(version=None, batch_size=DEFAULT_BATCH_SIZE, after_id=0):
+    """
+    Rescore every stored run with profile version (default: the active one).
+    Yields (last_run_id, runs_rescored_so_far) after each batch. Runs saved
+    before parameter risks were stored have nothing to rescore from and are
+    left as they are.
+    """
+    with db_helpers.connection() as conn:
+        profiles.init_profiles_table(conn)
+        if version is None:
+            profile = profiles.ensure_profile(conn, WEIGHT_MAP, CATEGORY_WEIGHTS, SEVERITY_MAP)
+        else:
+            profile = profiles.get_profile(conn, version)
+            if profile is None:
+                raise ValueError(f"No scoring profile version {version}")
+        done, vectors_cache = 0, {}
+        while True:
+            run_ids, risk_dicts = _next_batch(conn, profile["version"], after_id, batch_size)
+            if not run_ids:
+                return
+            rescore_batch(conn, run_ids, risk_dicts, profile, vectors_cache)
+            after_id = run_ids[-1]
+            done += len(run_ids)
+            yield after_id, done
+
+def main():
+    ap = argparse.ArgumentParser(description="Rescore stored runs with a scoring profile")
+    ap.add_argument("--profile", type=int, help="profile version (default: the active profile)")
+    ap.add_argument("--create", metavar="JSON_FILE",
+                    help="first store a new profile from a JSON file with any of weights, category_weights "
+                         "and severities (missing ones are copied from the active profile)")
+    ap.add_argument("--name", help="name for a profile created with --create")
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    ap.add_argument("--after-id", type=int, default=0, help="resume after this run id")
+    args = ap.parse_args()
+
+    version = args.profile
+    if args.create:
+        with open(args.create, encoding="utf-8") as fh:
+            spec = json.load(fh)
+        with db_helpers.connection() as conn:
+            profiles.init_profiles_table(conn)
+            base = profiles.ensure_profile(conn, WEIGHT_MAP, CATEGORY_WEIGHTS, SEVERITY_MAP)
+            version = profiles.create_profile(
+                conn, spec.get("weights", base["weights"]), spec.get("category_weights", base["category_weights"]),
+                spec.get("severities", base["severities"]), name=args.name
+            )
+        print(json.dumps({"created_profile": version}))
+
+    for last_id, done in rescore(version, args.batch_size, args.after_id):
+        print(json.dumps({"profile": version, "last_run_id": last_id, "rescored": done}))
+
+if __name__ == "__main__":
+    main()
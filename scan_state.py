@@ -0,0 +1,68 @@
+# webscan/scan_state.py
+from datetime import datetime
+
+# What a scan remembers about a domain for the next one: HTTP validators, a
+# hash of the raw body, the content checks' results, and short histories for
+# checks/history.py. Stored as JSON per domain (db_helpers.load_scan_states).
+# With it, a re-scan sends a conditional request and, when the page is
+# unchanged (304 or same body hash), reuses the content checks instead of
+# parsing the page again.
+
+HISTORY_LENGTH = 20
+PROBLEM_STATUSES = {"FAIL", "WARN", "ERROR"}
+
+def validators(previous: dict | None) -> dict | None:
+    if not previous:
+        return None
+    return {"etag": previous.get("etag"), "last_modified": previous.get("last_modified")}
+
+def build_state(previous: dict | None, **fields) -> dict:
+    """
+    The new state from this scan's fields (url, status_code, headers, etag,
+    last_modified, body_sha256, content_hash, content_length, title,
+    nameservers, content_checks, check_statuses), carrying histories forward.
+    """
+    now = datetime.utcnow().isoformat()
+    previous = previous or {}
+    state = dict(fields, scanned_at=now)
+
+    title_changes = list(previous.get("title_changes", []))
+    if previous and state.get("title") != previous.get("title"):
+        title_changes.append(now)
+    state["title_changes"] = title_changes[-HISTORY_LENGTH:]
+
+    state["status_codes"] = (previous.get("status_codes", []) + [state.get("status_code")])[-HISTORY_LENGTH:]
+
+    changed = previous and state.get("nameservers") and state["nameservers"] != previous.get("nameservers")
+    state["nameservers_changed_at"] = now if changed else previous.get("nameservers_changed_at")
+    return state
+
+def _severity(status):
+    return {"FAIL": "high", "ERROR": "medium", "WARN": "medium"}.get(status, "low")
+
+def diff_events(previous: dict | None, state: dict) -> list[dict]:
+    """Timeline events for what changed since the previous scan (nothing for an unchanged site)."""
+    now = state["scanned_at"]
+    if not previous:
+        return [{"change": "First scan", "severity": "low", "time": now}]
+    events = []
+
+    def event(change, severity):
+        events.append({"change": change, "severity": severity, "time": now})
+
+    if state.get("status_code") != previous.get("status_code"):
+        event(f"HTTP status changed from {previous.get('status_code')} to {state.get('status_code')}", "medium")
+    if state.get("content_hash") != previous.get("content_hash"):
+        event("Homepage content changed", "low")
+    if state.get("title") != previous.get("title"):
+        event(f"Title changed from {previous.get('title')!r} to {state.get('title')!r}", "low")
+    if state.get("nameservers") and previous.get("nameservers") and state["nameservers"] != previous["nameservers"]:
+        event(f"Nameservers changed to {', '.join(state['nameservers'])}", "high")
+
+    # Check results that started or stopped failing (PASS <-> INFO isn't news)
+    old, new = previous.get("check_statuses", {}), state.get("check_statuses", {})
+    for name in sorted(new.keys() | old.keys()):
+        before, after = old.get(name), new.get(name)
+        if after and before != after and (before in PROBLEM_STATUSES or after in PROBLEM_STATUSES):
+            event(f"{name}: {before or 'new'} -> {after}", _severity(after))
+    return events
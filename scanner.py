@@ -1,75 +1,204 @@
+import asyncio
 import json
+import time
 from urllib.parse import urlparse
 from .utils import normalize_url, extract_domain
-from .fetchers.http import fetch_url
-from .fetchers.dns import resolve_records
-from .fetchers.ssl import fetch_certificate, parse_cert_pem
-from .fetchers.whois import fetch_whois
+from .keywords import load_term_lists
+from .models import CheckResult
+from .scan_state import build_state, diff_events, validators
+from .cache import get_cache, cached, whois_ttl, cert_ttl
+from .fetchers.pool import run_sync
+from .fetchers.http import error_message, fetch_url_async
+from .fetchers.dns import resolve_records_with_ttl_async
+from .fetchers.tls import HANDSHAKE_TIMEOUT, probe_tls_async
+from .fetchers.whois import fetch_whois_async
 from .fetchers.headers import extract_security_headers
-from .fetchers.content import parse_html
-from .fetchers.performance import measure_response
-from .checks.domain_identity import run as domain_identity_run
-from .checks.dns_network import run as dns_network_run
-from .checks.ssl_tls import run as ssl_tls_run
-from .checks.security_headers import run as security_headers_run
-from .checks.basic_security import run as basic_security_run
-from .checks.content_integrity import run as content_integrity_run
-from .checks.ai_spam_signals import run as ai_spam_run
-from .checks.seo_trust import run as seo_trust_run
-from .checks.performance_availability import run as perf_avail_run
-from .checks.behavior_change import run as behavior_change_run
-from .checks.compliance_legal import run as compliance_legal_run
-
-def scan_single(url: str, config: dict):
+from .fetchers.performance import sample_latency_async, perf_from_response
+from .checks import registry
+from .cpu_pool import run_content_stage
+
+async def _fetch_cert(domain: str, config: dict):
+    # One inspecting handshake per host plus shared per-address probes (fetchers/tls.py)
+    return await probe_tls_async(domain, timeout=config.get("tls_timeout_seconds", HANDSHAKE_TIMEOUT))
+
+async def _fetch_dns(domain: str, cache, config: dict):
+    data, _ = await cached(cache, "dns", domain, lambda: resolve_records_with_ttl_async(domain, config), lambda r: r[1])
+    return data
+
+async def _timed(coro):
+    start = time.monotonic()
+    try:
+        return await coro, None, (time.monotonic() - start) * 1000.0
+    except Exception as e:
+        return None, error_message(e), (time.monotonic() - start) * 1000.0
+
+async def _run_fetch_stage(url: str, domain: str, config: dict, previous: dict | None = None,
+                           fetchers: set | None = None, read_body: bool = True):
+    """
+    Start the fetchers named in fetchers (default: all) at once and wait for
+    all of them, up to config["scan_deadline_seconds"]. Fetchers still running
+    at the deadline are cancelled and reported with status "timeout"; their
+    result is missing.
+    returns: ({name: result}, {name: {"ms", "status"[, "error"]}})
+    """
+    timeout = config.get("timeout_seconds", 20)
+    deadline = config.get("scan_deadline_seconds", 30)
+    # DNS, cert and WHOIS answers are reused across scans of the same domain
+    cache = get_cache(config)
+    starters = {
+        "http": lambda: fetch_url_async(url, config, validators(previous), read_body),
+        "dns": lambda: _fetch_dns(domain, cache, config),
+        "cert": lambda: cached(cache, "cert", f"{domain}:443", lambda: _fetch_cert(domain, config), cert_ttl),
+        "whois": lambda: cached(cache, "whois", domain, lambda: fetch_whois_async(domain), whois_ttl),
+    }
+    # Latency comes from the primary fetch's timing; extra requests only in
+    # multi-sample mode (config["latency_samples"] > 1)
+    samples = config.get("latency_samples", 1)
+    if samples > 1:
+        headers = {"User-Agent": config.get("user_agent", "WebScanBot/1.0")}
+        starters["perf"] = lambda: sample_latency_async(url, headers, timeout, samples - 1)
+    jobs = {name: start() for name, start in starters.items() if fetchers is None or name in fetchers}
+
+    start = time.monotonic()
+    tasks = {asyncio.ensure_future(_timed(coro)): name for name, coro in jobs.items()}
+    # (A scan whose checks need no fetched artifacts has nothing to wait for)
+    done, pending = await asyncio.wait(tasks, timeout=deadline) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+
+    results, timings = {}, {}
+    for task in done:
+        name = tasks[task]
+        value, error, ms = task.result()
+        if isinstance(value, Exception):
+            # fetch_url_async returns its error (with the timing) instead of raising
+            error = error_message(value)
+        results[name] = value
+        timings[name] = {"ms": int(ms), "status": "error" if error else "ok"}
+        if error:
+            timings[name]["error"] = error
+    for task in pending:
+        timings[tasks[task]] = {"ms": int((time.monotonic() - start) * 1000.0), "status": "timeout"}
+    timings["total_ms"] = int((time.monotonic() - start) * 1000.0)
+    return results, timings
+
+def scan_single(url: str, config: dict, previous: dict | None = None):
+    return run_sync(scan_single_async(url, config, previous))
+
+def _run_checks(specs, ctx):
+    # Checks on the small fetched artifacts; the page-walking ones run in the CPU stage (cpu_pool.py).
+    # Serial on purpose: none of them does I/O, so threads would only queue on the GIL.
+    return {spec.name: spec.run(ctx) for spec in specs}
+
+async def scan_single_async(url: str, config: dict, previous: dict | None = None):
+    """
+    previous: the state saved by the last scan of this domain
+    (artifacts["state"]). Given one, the page is requested conditionally and,
+    if it is unchanged, parsing and the content checks are skipped. Events in
+    artifacts["events"] describe only what changed since that scan.
+
+    Only the checks enabled by config (checks/registry.py: config["checks"],
+    config["check_profile"], config["check_categories"]) run, and only what
+    they need is fetched. A partial scan ignores previous and returns no state
+    or events, so it never replaces what the last full scan saved.
+    """
     url = normalize_url(url)
     domain = extract_domain(url)
+    specs = registry.from_config(config)
+    full = registry.is_full(specs)
+    if not full:
+        previous = None
+    needs = {need for spec in specs for need in spec.needs}
+    fetchers = registry.needed_fetchers(specs)
+    parse = bool(needs & {"parsed", "state"})
+
+    # Fetch stage: independent network fetchers run concurrently, bounded by
+    # a per-scan deadline. Checks only start once every fetcher has settled.
+    fetched, timings = await _run_fetch_stage(url, domain, config, previous, fetchers, read_body=parse)
 
-    # Fetch HTTP response and HTML
-    resp = fetch_url(url, config)
+    resp = fetched.get("http")
     status_code = None
     headers = {}
     html = None
+    body_sha256 = None
+    unchanged = False
     if hasattr(resp, "status_code"):
         status_code = resp.status_code
-        headers = dict(resp.headers)
-        html = resp.text if config.get("fetch_html", True) else None
+        # Lowercase names throughout, so lookups and the 304 merge agree with saved state
+        headers = {k.lower(): v for k, v in resp.headers.items()}
+        if status_code == 304 and previous:
+            # Not Modified: a 304 needn't repeat every header, so keep the old ones
+            status_code = previous.get("status_code")
+            headers = {**{k.lower(): v for k, v in previous.get("headers", {}).items()}, **headers}
+            unchanged = True
+        else:
+            # Body was streamed under a size cap and deadline (fetchers/http.py)
+            body_sha256 = resp.body_sha256
+            unchanged = bool(previous and previous.get("content_checks") and body_sha256 == previous.get("body_sha256"))
+            html = resp.body_text if config.get("fetch_html", True) and parse else None
 
-    # DNS
-    dns_data = resolve_records(domain)
+    dns_data = fetched.get("dns") or {}
+    cert_info = fetched.get("cert")
+    whois_data = fetched.get("whois") or {"error": "WHOIS lookup did not complete"}
+    if "http" not in fetchers:
+        perf = {}
+    elif resp is None:
+        perf = {"ms": timings["http"]["ms"], "error": "timeout: scan deadline exceeded"}
+    else:
+        perf = perf_from_response(resp, fetched.get("perf"))
 
-    # CERT
-    cert_info = None
-    try:
-        cert_pem = fetch_certificate(domain)
-        cert_info = parse_cert_pem(cert_pem)
-    except Exception:
-        cert_info = None
-
-    # WHOIS
-    whois_data = fetch_whois(domain)
-
-    # Security headers
-    sec_headers = extract_security_headers(headers)
+    ctx = {
+        "url": url, "domain": domain, "whois": whois_data, "dns": dns_data, "cert": cert_info,
+        "security_headers": extract_security_headers(headers), "perf": perf, "previous": previous,
+        "state": None,
+    }
+    content_specs = [spec for spec in specs if spec.content]
 
-    # Parsed HTML
-    parsed = parse_html(html or "")
+    if unchanged:
+        # Same page as last time: reuse its content checks instead of reparsing
+        parsed = None
+        content_checks = [CheckResult(*c) for c in previous["content_checks"]]
+        content = {k: previous.get(k) for k in ("body_sha256", "content_hash", "content_length", "title")}
+    elif not parse:
+        parsed, content_checks, content = None, [], {}
+    else:
+        # CPU stage: parse once and run every content check, on the process pool if configured
+        result = await run_content_stage(
+            config, resp.body if html is not None else b"", getattr(resp, "charset_encoding", None), url,
+            config.get("html_parser"), load_term_lists(config), [spec.name for spec in content_specs]
+        )
+        parsed = result["parsed"]
+        content_checks = [CheckResult(*row) for row in result["checks"]]
+        content = {
+            "body_sha256": body_sha256,
+            "content_hash": result["content_hash"],
+            "content_length": result["content_length"] if html is not None else None,
+            "title": result["title"],
+        }
 
-    # Performance
-    perf = measure_response(url, {"User-Agent": config.get("user_agent", "WebScanBot/1.0")}, timeout=config.get("timeout_seconds", 20))
+    state = None
+    if "state" in needs:
+        state = ctx["state"] = build_state(
+            previous, url=url, status_code=status_code, headers=headers,
+            etag=headers.get("etag"), last_modified=headers.get("last-modified"),
+            nameservers=sorted(ns.lower().rstrip(".") for ns in dns_data.get("NS", [])),
+            content_checks=[[c.category, c.name, c.status, c.value, c.details] for c in content_checks],
+            **content
+        )
 
-    # Aggregate checks
+    # Aggregate checks in report order; content checks are one contiguous group
+    by_check = _run_checks([spec for spec in specs if not spec.content], ctx)
     checks = []
-    checks += domain_identity_run(whois_data)
-    checks += dns_network_run(domain, dns_data)
-    checks += ssl_tls_run(cert_info)
-    checks += security_headers_run(sec_headers)
-    checks += basic_security_run(url, html)
-    checks += content_integrity_run(parsed)
-    checks += ai_spam_run(parsed.get("text") or "")
-    checks += seo_trust_run(parsed)
-    checks += perf_avail_run(perf)
-    checks += behavior_change_run()
-    checks += compliance_legal_run(parsed, parsed.get("text") or "")
+    for spec in specs:
+        if not spec.content:
+            checks += by_check[spec.name]
+        elif spec is content_specs[0]:
+            checks += content_checks
+    if config.get("check_categories"):
+        # A check group can fill several categories (history); keep only the ones asked for
+        checks = [c for c in checks if c.category in set(config["check_categories"])]
+    if state is not None:
+        state["check_statuses"] = {c.name: c.status for c in checks}
 
     artifacts = {
         "status_code": status_code,
@@ -79,6 +208,10 @@ def scan_single(url: str, config: dict):
         "whois": whois_data,
         "html": html,
         "parsed": parsed,
-        "perf": perf
+        "unchanged": unchanged,
+        "perf": perf,
+        "timings": timings,
+        "state": state if full else None,
+        "events": diff_events(previous, state) if full else None
     }
     return domain, checks, artifacts
@@ -1,6 +1,10 @@
 # webscan/scoring.py
 from webscan.severity_mapping import SEVERITY_MAP
 from webscan.weight_mapping import WEIGHT_MAP
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 CATEGORY_WEIGHTS = {
     "Security": 0.30,
@@ -12,13 +16,81 @@ CATEGORY_WEIGHTS = {
 
 CRITICAL_FLAGS = {"ssl_expired","malware_detected","phishing_pattern","blacklist_hit","domain_expired","gdpr_violation","ccpa_violation","hidden_spam_links","deceptive_redirects","site_unreachable","cookie_banner_missing"}
 
+# Risks are rounded to this many decimals before thresholds and the final
+# round(), so a score doesn't depend on the order its terms were summed in
+RISK_DECIMALS = 12
+
+# Check status -> parameter risk in [0,1]
+STATUS_RISK = {"FAIL": 1.0, "ERROR": 0.5, "WARN": 0.5, "PASS": 0.0, "INFO": 0.0}
+
+# Check name -> WEIGHT_MAP parameter. Several checks can feed one parameter
+# (it takes the worst of them). Checks not listed keep a slug of their name
+# and land in NEUTRAL_CATEGORY, which counts towards neither trust nor severity.
+CHECK_PARAMETERS = {
+    "Certificate expiry days": "ssl_expiry_days",
+    "HTTPS availability": "ssl_invalid",
+    "Certificate chain validity": "ssl_invalid",
+    "Self-signed cert detection": "ssl_invalid",
+    "SAN mismatch": "ssl_invalid",
+    "SSL handshake errors": "ssl_invalid",
+    "Expired intermediate cert": "ssl_invalid",
+    "TLS version support": "weak_cipher_suites",
+    "Weak cipher support": "weak_cipher_suites",
+    "Content-Security-Policy": "missing_csp_header",
+    "HSTS enabled": "missing_hsts_header",
+    "HSTS max-age": "minor_header_issue",
+    "CSP unsafe-inline usage": "minor_header_issue",
+    "X-Frame-Options": "minor_header_issue",
+    "X-Content-Type-Options": "minor_header_issue",
+    "Referrer-Policy": "minor_header_issue",
+    "Permissions-Policy": "minor_header_issue",
+    "Expect-CT": "minor_header_issue",
+    "Cross-Origin-Opener-Policy": "minor_header_issue",
+    "Cross-Origin-Embedder-Policy": "minor_header_issue",
+    "Cross-Origin-Resource-Policy": "minor_header_issue",
+    "DKIM record": "dkim_absent",
+    "SPF record": "spf_absent",
+    "robots.txt sensitive paths": "robots_txt_sensitive",
+    "DMARC policy": "dns_misconfig",
+    "DNS misconfiguration": "dns_misconfig",
+    "Reverse DNS validity": "dns_misconfig",
+    "Hidden links detection": "hidden_spam_links",
+    "Keyword stuffing": "weak_keyword_density",
+    "Spam keyword density": "weak_keyword_density",
+    "Average response time": "response_time_high",
+    "Server timeout errors": "response_time_high",
+    "Sudden latency spike": "response_time_medium",
+    "5xx error frequency": "frequent_5xx_errors",
+    "Privacy policy presence": "privacy_policy_missing",
+    "Terms of service presence": "terms_missing",
+    "Contact information validity": "weak_contact_page",
+    "Cookie consent banner": "cookie_banner_missing",
+    "GDPR signals": "gdpr_violation",
+}
+NEUTRAL_CATEGORY = "Unscored"
+
+def parameter_name(check_name):
+    # "Content-Security-Policy" -> "missing_csp_header"; unmapped: "Domain age" -> "domain_age"
+    mapped = CHECK_PARAMETERS.get(check_name)
+    if mapped:
+        return mapped
+    return "_".join("".join(ch if ch.isalnum() else " " for ch in check_name.lower()).split())
+
+def risks_from_checks(checks):
+    # checks: list of CheckResult -> dict[param_name] = risk_value in [0,1]
+    risks = {}
+    for c in checks:
+        param = parameter_name(c.name)
+        risks[param] = max(risks.get(param, 0.0), STATUS_RISK.get(c.status, 0.0))
+    return risks
+
 def normalize_piecewise(value, threshold):
     # risk = min(1, max(0, (threshold - value) / threshold))
     r = (threshold - value) / threshold
     return max(0.0, min(1.0, r))
 
 def category_of(param):
-    if param in {"ssl_expired","missing_csp_header","dkim_absent","spf_absent","open_ports","weak_cipher_suites","robots_txt_sensitive","missing_hsts_header","favicon_hash_missing","minor_header_issue"}:
+    if param in {"ssl_expired","ssl_expiry_days","ssl_invalid","missing_csp_header","dkim_absent","spf_absent","open_ports","weak_cipher_suites","robots_txt_sensitive","missing_hsts_header","favicon_hash_missing","minor_header_issue"}:
         return "Security"
     if param in {"hidden_spam_links","deceptive_redirects","indexed_pages_drop","duplicate_meta_titles","missing_meta_description","poor_mobile_optimization","missing_alt_text","weak_keyword_density"}:
         return "SEO & Content"
@@ -28,11 +100,11 @@ def category_of(param):
         return "Identity & Domain"
     if param in {"cookie_banner_missing","gdpr_violation","ccpa_violation","privacy_policy_missing","terms_missing","cookie_banner_nonfunctional","accessibility_statement_missing","weak_contact_page"}:
         return "Compliance & Trust"
-    return "Security"
+    return NEUTRAL_CATEGORY
 
 def assign_severity(trust_score, category_risks, critical_flags, trend_drop=0):
-    # Handle empty category_risks gracefully
-    max_category_risk = max(category_risks.values()) if category_risks else 0.0
+    # Handle empty category_risks gracefully; unscored checks don't raise severity
+    max_category_risk = max((r for c, r in category_risks.items() if c != NEUTRAL_CATEGORY), default=0.0)
 
     if trust_score < 50 or max_category_risk > 0.7 or trend_drop > 15:
         return "CRITICAL"
@@ -43,20 +115,23 @@ def assign_severity(trust_score, category_risks, critical_flags, trend_drop=0):
     else:
         return "LOW"
 
-def compute_scores(parameter_risks):
+def compute_scores(parameter_risks, profile=None):
     # parameter_risks: dict[param_name] = risk_value in [0,1]
+    # profile: a scoring profile (profiles.py); defaults to WEIGHT_MAP/CATEGORY_WEIGHTS
+    weight_map = profile["weights"] if profile else WEIGHT_MAP
+    category_weights = profile["category_weights"] if profile else CATEGORY_WEIGHTS
     # Build category aggregates
     cat_scores = {}
     cat_weights = {}
     for p, r in parameter_risks.items():
-        w = WEIGHT_MAP.get(p, 0.2)
+        w = weight_map.get(p, 0.2)
         cat = category_of(p)
         cat_scores[cat] = cat_scores.get(cat, 0.0) + r * w
         cat_weights[cat] = cat_weights.get(cat, 0.0) + w
 
-    category_risks = {c: (cat_scores[c] / cat_weights[c]) if cat_weights[c] > 0 else 0.0 for c in cat_scores}
+    category_risks = {c: round(cat_scores[c] / cat_weights[c], RISK_DECIMALS) if cat_weights[c] > 0 else 0.0 for c in cat_scores}
     # Global risk and trust
-    global_risk = sum(category_risks.get(c,0.0) * CATEGORY_WEIGHTS.get(c,0.0) for c in CATEGORY_WEIGHTS)
+    global_risk = round(sum(category_risks.get(c,0.0) * category_weights.get(c,0.0) for c in category_weights), RISK_DECIMALS)
     trust_score = round(100 * (1 - global_risk))
     # Verdict
     verdict = "SAFE"
@@ -79,3 +154,85 @@ def compute_scores(parameter_risks):
         "severity": severity,
         "critical_flags": critical_flags,
     }
+
+# --- Batch scoring ---
+
+class ScoreVectors:
+    """
+    Per-parameter weights, categories and critical flags for a fixed column
+    order of parameters, computed once and reused for every batch.
+    """
+
+    def __init__(self, params, weight_map=None, category_weights=None):
+        if np is None:
+            raise RuntimeError("numpy is required for batch scoring")
+        weight_map = WEIGHT_MAP if weight_map is None else weight_map
+        category_weights = CATEGORY_WEIGHTS if category_weights is None else category_weights
+        self.params = list(params)
+        param_categories = [category_of(p) for p in self.params]
+        # Categories without a weight still count towards severity, as in compute_scores
+        self.categories = list(category_weights) + sorted(set(param_categories) - set(category_weights))
+        self.weights = np.array([weight_map.get(p, 0.2) for p in self.params], dtype=float)
+        # (n_params, n_categories) 0/1 membership
+        self.membership = np.zeros((len(self.params), len(self.categories)))
+        for i, cat in enumerate(param_categories):
+            self.membership[i, self.categories.index(cat)] = 1.0
+        self.category_weights = np.array([category_weights.get(c, 0.0) for c in self.categories], dtype=float)
+        self.critical = np.array([p in CRITICAL_FLAGS for p in self.params], dtype=bool)
+        self.scored = np.array([c != NEUTRAL_CATEGORY for c in self.categories], dtype=bool)
+
+def risk_matrix(parameter_risks_list, params=None):
+    """
+    Stack per-domain {param: risk} dicts into an (n_domains, n_params) matrix.
+    Parameters a domain doesn't report are NaN. Returns (matrix, params).
+    """
+    if params is None:
+        params = sorted({p for risks in parameter_risks_list for p in risks})
+    index = {p: i for i, p in enumerate(params)}
+    matrix = np.full((len(parameter_risks_list), len(params)), np.nan)
+    for row, risks in enumerate(parameter_risks_list):
+        for p, r in risks.items():
+            matrix[row, index[p]] = r
+    return matrix, list(params)
+
+def compute_scores_batch(risks, vectors):
+    """
+    compute_scores for many domains at once. risks is an (n_domains, n_params)
+    matrix in vectors.params column order, NaN where a domain lacks a parameter.
+
+    Returns arrays: trust_score, verdict, severity, critical (any critical flag
+    raised) and category_risks (n_domains, n_categories in vectors.categories
+    order, NaN for categories with no parameters). Trust scores, verdicts and
+    severities match compute_scores row by row; category risks agree to
+    RISK_DECIMALS places.
+    """
+    risks = np.asarray(risks, dtype=float)
+    present = ~np.isnan(risks)
+    values = np.where(present, risks, 0.0)
+
+    weighted = present * vectors.weights
+    cat_weights = weighted @ vectors.membership
+    cat_scores = (values * weighted) @ vectors.membership
+    has_cat = (present @ vectors.membership) > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cat_risks = np.where(cat_weights > 0, np.round(cat_scores / cat_weights, RISK_DECIMALS), 0.0)
+    cat_risks = np.where(has_cat, cat_risks, 0.0)
+
+    global_risk = np.round(cat_risks @ vectors.category_weights, RISK_DECIMALS)
+    trust = np.round(100 * (1 - global_risk)).astype(int)
+    critical = (present & (values > 0.0) & vectors.critical).any(axis=1)
+
+    verdict = np.select([critical | (trust < 50), trust < 70, trust < 85],
+                        ["UNSAFE", "AT_RISK", "SAFE_WITH_CAUTION"], "SAFE")
+    scored = cat_risks[:, vectors.scored]
+    max_cat = scored.max(axis=1) if scored.shape[1] else np.zeros(len(trust))
+    severity = np.select([(trust < 50) | (max_cat > 0.7), (trust < 70) | (max_cat > 0.5), (trust < 85) | (max_cat > 0.3)],
+                         ["CRITICAL", "HIGH", "MEDIUM"], "LOW")
+
+    return {
+        "trust_score": trust,
+        "verdict": verdict,
+        "severity": severity,
+        "critical": critical,
+        "category_risks": np.where(has_cat, cat_risks, np.nan),
+    }
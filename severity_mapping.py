@@ -5,6 +5,7 @@ SEVERITY_MAP = {
     "phishing_pattern": "CRITICAL",
     "blacklist_hit": "CRITICAL",
     "ssl_expiry_days": "HIGH",
+    "ssl_invalid": "HIGH",
     "missing_csp_header": "HIGH",
     "dkim_absent": "HIGH",
     "spf_absent": "HIGH",
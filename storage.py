@@ -1,8 +1,10 @@
 import json
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 from .models import CheckResult
 from .models import now_iso
+from .db_helpers import bulk_insert, configure, connect_pg, ensure_partition, insert_id, is_pg
 # webscan/storage.py
 import os, sqlite3
 try:
@@ -29,25 +31,27 @@ def write_text_artifact(base: str, domain: str, kind: str, filename: str, text:
 def write_json(base: str, domain: str, filename: str, obj: dict) -> Path:
     folder = ensure_url_folder(base, domain)
     path = folder / filename
-    path.write_text(json.dumps(obj, indent=2))
+    path.write_text(json.dumps(obj, separators=(",", ":"), default=str))
     return path
 
 # --- Database functions ---
 
 def connect(db_url):
     if (db_url.startswith("postgres://") or db_url.startswith("postgresql://")) and psycopg2:
-        return psycopg2.connect(db_url), "pg"
+        return connect_pg(db_url), "pg"
     else:
         os.makedirs(os.path.dirname(db_url), exist_ok=True)
-        return sqlite3.connect(db_url), "sqlite"
+        return configure(sqlite3.connect(db_url, timeout=10)), "sqlite"
 
 def init_schema(conn, kind="sqlite"):
     cur = conn.cursor()
+    pg = kind == "pg"
+    id_col = "BIGSERIAL PRIMARY KEY" if pg else "INTEGER PRIMARY KEY AUTOINCREMENT"
 
     # Runs table (overall scan results)
-    cur.execute("""
+    cur.execute(f"""
         CREATE TABLE IF NOT EXISTS runs(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id {id_col},
             domain TEXT,
             trust_score INTEGER,
             verdict TEXT,
@@ -56,21 +60,22 @@ def init_schema(conn, kind="sqlite"):
         )
     """)
 
-    # Findings table (parameter-level risks)
-    cur.execute("""
+    # Findings table (parameter-level risks); monthly partitions on Postgres
+    created_col = ",\n            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP" if pg else ""
+    cur.execute(f"""
         CREATE TABLE IF NOT EXISTS findings(
             run_id INTEGER,
             parameter TEXT,
             risk REAL,
             category TEXT,
-            severity TEXT
-        )
+            severity TEXT{created_col}
+        ){" PARTITION BY RANGE (created_at)" if pg else ""}
     """)
 
     # Events table (timeline of changes between scans)
-    cur.execute("""
+    cur.execute(f"""
         CREATE TABLE IF NOT EXISTS events(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id {id_col},
             run_id INTEGER,
             domain TEXT,
             change TEXT,
@@ -80,9 +85,9 @@ def init_schema(conn, kind="sqlite"):
     """)
 
     # Actions table (recommended fixes for risks)
-    cur.execute("""
+    cur.execute(f"""
         CREATE TABLE IF NOT EXISTS actions(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id {id_col},
             finding_id INTEGER,
             issue TEXT,
             risk TEXT,
@@ -91,28 +96,67 @@ def init_schema(conn, kind="sqlite"):
         )
     """)
 
+    # Latest run per domain (kept current by save_runs)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS latest_run(
+            domain TEXT PRIMARY KEY,
+            run_id INTEGER,
+            trust_score INTEGER,
+            verdict TEXT,
+            severity TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Indexes for per-domain lookups
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_runs_domain_created ON runs(domain, created_at DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_findings_run ON findings(run_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_events_domain_created ON events(domain, created_at DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_actions_finding ON actions(finding_id)")
+
     conn.commit()
+    if pg:
+        ensure_partition(conn, "findings", datetime.utcnow())
 
 
 def save_run(conn, domain, summary, parameters):
+    return save_runs(conn, [(domain, summary, parameters)])[0]
+
+def save_runs(conn, runs):
+    """
+    Persist many (domain, summary, parameters) runs in one transaction.
+    Returns their run ids in order.
+    """
+    pg, now = is_pg(conn), datetime.utcnow()
+    if pg:
+        ensure_partition(conn, "findings", now)
     cur = conn.cursor()
-
-    # Insert into runs table
-    cur.execute("""
-        INSERT INTO runs(domain, trust_score, verdict, severity)
-        VALUES(?,?,?,?)
-    """, (domain, summary.get("trust_score"), summary.get("verdict"), summary.get("severity")))
-    run_id = cur.lastrowid   # 🔹 capture the auto-incremented run ID
-
-    # Insert findings
-    for param, risk in parameters.items():
+    run_ids, finding_rows = [], []
+
+    for domain, summary, parameters in runs:
+        # Insert into runs table
+        run_id = insert_id(cur, """
+            INSERT INTO runs(domain, trust_score, verdict, severity)
+            VALUES(?,?,?,?)
+        """, (domain, summary.get("trust_score"), summary.get("verdict"), summary.get("severity")))   # 🔹 capture the auto-incremented run ID
+        run_ids.append(run_id)
         cur.execute("""
-            INSERT INTO findings(run_id, parameter, risk, category, severity)
-            VALUES(?,?,?,?,?)
-        """, (run_id, param, risk, summary.get("category", "general"), summary.get("severity")))
+            INSERT INTO latest_run(domain, run_id, trust_score, verdict, severity, created_at)
+            VALUES(?,?,?,?,?,CURRENT_TIMESTAMP)
+            ON CONFLICT(domain) DO UPDATE SET
+                run_id=excluded.run_id, trust_score=excluded.trust_score, verdict=excluded.verdict,
+                severity=excluded.severity, created_at=excluded.created_at
+        """, (domain, run_id, summary.get("trust_score"), summary.get("verdict"), summary.get("severity")))
+        category, severity = summary.get("category", "general"), summary.get("severity")
+        finding_rows += [(run_id, param, risk, category, severity) + ((now,) if pg else ())
+                         for param, risk in parameters.items()]
+
+    # Insert findings (COPY on Postgres, with the partition key set explicitly)
+    bulk_insert(cur, "findings", ["run_id", "parameter", "risk", "category", "severity"] + (["created_at"] if pg else []),
+                finding_rows)
 
     conn.commit()
-    return run_id   # 🔹 return run_id for later use
+    return run_ids   # 🔹 return run_ids for later use
 
 def ensure_url_folder(base: str, domain: str) -> Path:
     path = Path(base) / domain
@@ -133,7 +177,7 @@ def write_text_artifact(base: str, domain: str, kind: str, filename: str, text:
 def write_json(base: str, domain: str, filename: str, obj: dict) -> Path:
     folder = ensure_url_folder(base, domain)
     path = folder / filename
-    path.write_text(json.dumps(obj, indent=2))
+    path.write_text(json.dumps(obj, separators=(",", ":"), default=str))
     return path
 
 def detect_changes(conn, domain, parameters):
@@ -0,0 +1,69 @@
+import importlib
+import os
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The repository root is the webscan package itself; register it under that
+# name so tests import it the way the worker and API do.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if "webscan" not in sys.modules:
+    package = types.ModuleType("webscan")
+    package.__path__ = [ROOT]
+    sys.modules["webscan"] = package
+
+# api, db and db_helpers are top-level modules that read WEBSCAN_DATABASE_URL
+# at import; load them fresh against a scratch database and drop them after.
+API_MODULES = ["api", "auth", "db", "db_helpers", "decision_engine", "init_db", "jobs", "models", "profiles"]
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """The top-level db_helpers module, over a scratch SQLite database set up by init_db."""
+    monkeypatch.setenv("WEBSCAN_DATABASE_URL", f"sqlite:///{tmp_path / 'api.db'}")
+    monkeypatch.syspath_prepend(ROOT)
+    for name in API_MODULES:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    importlib.import_module("init_db").init_db()
+    yield importlib.import_module("db_helpers")
+    for name in API_MODULES:
+        sys.modules.pop(name, None)
+
+@pytest.fixture
+def api(database):
+    fastapi_testclient = pytest.importorskip("fastapi.testclient")
+    pytest.importorskip("aiosqlite")
+    module = importlib.import_module("api")
+    with fastapi_testclient.TestClient(module.app) as client:
+        yield module, client
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        route = self.server.routes.get(self.path, (404, {}, b""))
+        status, headers, body = route(self.headers) if callable(route) else route
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def http_server():
+    """
+    Local HTTP server: set .routes[path] = (status, headers, body), or a
+    function of the request headers returning one; .requests lists (path, headers).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.routes, server.requests = {}, []
+    server.url = "http://127.0.0.1:%d" % server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
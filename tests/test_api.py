@@ -0,0 +1,28 @@
+def test_signup_login_and_domains(api):
+    _, client = api
+    user = {"username": "ana", "email": "ana@example.com", "password": "pw"}
+    assert client.post("/signup", json=user).status_code == 200
+    assert client.post("/signup", json=user).status_code == 400
+    assert client.post("/login", json={"username": "ana", "password": "nope"}).status_code == 401
+    assert client.post("/login", json={"username": "ana", "password": "pw"}).json()["token_type"] == "bearer"
+
+    registered = client.post("/register-domain", params={"domain": "example.com", "username": "ana"}).json()
+    assert registered["job_id"]
+    assert client.post("/register-domain", params={"domain": "example.com", "username": "ana"}).json() == \
+        {"message": "Domain already registered"}
+    assert client.get("/user-domains", params={"username": "ana"}).json() == ["example.com"]
+    assert client.get("/user-domains", params={"username": "nobody"}).json() == []
+
+def test_scan_jobs_endpoints(api):
+    _, client = api
+    assert client.post("/scans", params={"domain": "example.com", "username": "nobody"}).status_code == 404
+    job = client.post("/scans", params={"domain": "example.com"}).json()
+    assert job["status"] == "queued"
+    assert client.get(f"/scans/{job['id']}").json()["id"] == job["id"]
+    assert client.delete(f"/scans/{job['id']}").json()["status"] == "cancelled"
+    assert client.get("/scans/999").status_code == 404
+
+def test_overview_without_runs(api):
+    _, client = api
+    assert client.get("/overview/example.com").json()["verdict"] == "No Data"
+    assert client.get("/risks/example.com").json() == []
@@ -0,0 +1,55 @@
+import asyncio
+from collections import Counter
+
+from webscan import batch
+
+URLS = [f"http://10.0.0.{host}/page{i}" for host in range(1, 6) for i in range(4)]
+UNLIMITED = {"per_domain_rate": 0, "per_ip_rate": 0}
+
+def _fake_scan(seen, fail=()):
+    state = {"in_flight": Counter(), "peak": 0, "peak_per_host": 0}
+
+    async def scan(url, config):
+        host = url.split("/")[2]
+        state["in_flight"][host] += 1
+        state["peak"] = max(state["peak"], sum(state["in_flight"].values()))
+        state["peak_per_host"] = max(state["peak_per_host"], state["in_flight"][host])
+        await asyncio.sleep(0.01)
+        state["in_flight"][host] -= 1
+        seen.append(url)
+        if url in fail:
+            raise RuntimeError("boom")
+        return host, [], {"url": url}
+    return scan, state
+
+async def _collect(urls, config, stats=None):
+    return [item async for item in batch.scan_many_async(urls, config, stats)]
+
+def test_concurrency_is_bounded_overall_and_per_host(monkeypatch):
+    seen = []
+    scan, state = _fake_scan(seen)
+    monkeypatch.setattr(batch, "scan_single_async", scan)
+    stats = {}
+    results = asyncio.run(_collect(URLS, {**UNLIMITED, "batch_concurrency": 6, "per_host_concurrency": 2}, stats))
+    assert len(results) == len(URLS)
+    assert sorted(seen) == sorted(URLS)
+    assert state["peak"] <= 6
+    assert state["peak_per_host"] <= 2
+    assert stats["completed"] == len(URLS) and stats["failed"] == 0
+
+def test_resume_skips_finished_urls_and_retries_failures(monkeypatch, tmp_path):
+    checkpoint = tmp_path / "done.txt"
+    config = {**UNLIMITED, "resume_path": str(checkpoint)}
+    first, second = [], []
+    scan, _ = _fake_scan(first, fail={URLS[0]})
+    monkeypatch.setattr(batch, "scan_single_async", scan)
+    stats = {}
+    asyncio.run(_collect(URLS, config, stats))
+    assert stats["failed"] == 1
+
+    scan, _ = _fake_scan(second)
+    monkeypatch.setattr(batch, "scan_single_async", scan)
+    stats = {}
+    asyncio.run(_collect(URLS, config, stats))
+    assert second == [URLS[0]]
+    assert stats["skipped"] == len(URLS) - 1
@@ -0,0 +1,83 @@
+import os
+import time
+
+import pytest
+
+from webscan import blobstore
+from webscan.blobstore import BlobStore
+
+DATA = b"<html>unchanged page</html>" * 100
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path))
+
+def _age(path, seconds=2 * blobstore.GC_GRACE_SECONDS):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+def _stored_unreferenced_blob(store):
+    sha256, _ = store.put(DATA)
+    _age(store._find(sha256))
+    return sha256
+
+def test_gc_deletes_old_unreferenced_blobs(store):
+    sha256 = _stored_unreferenced_blob(store)
+    referenced, size = store.put(b"kept")
+    store.add_run(1, "example.com", {"html": (referenced, size)})
+    _age(store._find(referenced))
+    assert store.gc(3600)["deleted_blobs"] == 1
+    assert not store.exists(sha256)
+    assert store.get(referenced) == b"kept"
+
+def test_put_before_gc_moves_the_blob_keeps_it(store, monkeypatch):
+    sha256 = _stored_unreferenced_blob(store)
+    referenced = store._referenced
+
+    def put_first(sha):
+        # A put() of the same bytes lands between gc's scan and its rename
+        monkeypatch.setattr(store, "_referenced", referenced)
+        store.put(DATA)
+        return referenced(sha)
+
+    monkeypatch.setattr(store, "_referenced", put_first)
+    assert store.gc(3600)["deleted_blobs"] == 0
+    assert store.get(sha256) == DATA
+
+def test_put_after_gc_moves_the_blob_stores_a_copy(store, monkeypatch):
+    sha256 = _stored_unreferenced_blob(store)
+    referenced, calls = store._referenced, []
+
+    def put_after_rename(sha):
+        calls.append(sha)
+        if len(calls) == 2:   # the re-check, with the blob moved aside
+            store.add_run(1, "example.com", {"html": store.put(DATA)})
+        return referenced(sha)
+
+    monkeypatch.setattr(store, "_referenced", put_after_rename)
+    store.gc(3600)
+    assert store.get(sha256) == DATA
+
+def test_gc_between_find_and_touch_stores_a_copy(store, monkeypatch):
+    sha256 = _stored_unreferenced_blob(store)
+    find = store._find
+
+    def find_then_gc(sha):
+        path = find(sha)
+        monkeypatch.setattr(store, "_find", find)
+        assert store.gc(3600)["deleted_blobs"] == 1
+        return path
+
+    monkeypatch.setattr(store, "_find", find_then_gc)
+    assert store.put(DATA)[0] == sha256
+    assert store.get(sha256) == DATA
+
+def test_gc_removes_stale_temp_files(store):
+    stale = os.path.join(store._tmp_dir, "tmpstale")
+    fresh = os.path.join(store._tmp_dir, "tmpfresh")
+    for path in (stale, fresh):
+        with open(path, "wb") as fh:
+            fh.write(b"partial")
+    _age(stale)
+    store.gc(3600)
+    assert os.listdir(store._tmp_dir) == ["tmpfresh"]
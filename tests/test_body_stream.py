@@ -0,0 +1,46 @@
+import asyncio
+import hashlib
+
+from webscan.fetchers.http import fetch_url_async
+
+BODY = ("héllo wörld " * 2000).encode("utf-8")
+
+def _fetch(url, read_body=True, **config):
+    return asyncio.run(fetch_url_async(url, config, read_body=read_body))
+
+def test_whole_body_under_the_cap(http_server):
+    http_server.routes["/"] = (200, {"Content-Type": "text/html; charset=utf-8"}, BODY)
+    resp = _fetch(http_server.url + "/")
+    assert resp.body == BODY and resp.truncated is None
+    assert resp.body_text == BODY.decode("utf-8")
+    assert resp.body_sha256 == hashlib.sha256(BODY).hexdigest()
+
+def test_body_is_cut_at_the_size_cap(http_server):
+    http_server.routes["/"] = (200, {"Content-Type": "text/html; charset=utf-8"}, BODY)
+    resp = _fetch(http_server.url + "/", max_body_bytes=1001)
+    assert resp.body == BODY[:1001] and resp.truncated == "size"
+    # A multi-byte character split at the cap decodes to a replacement, not an error
+    assert resp.body_text.startswith("héllo") and len(resp.body_text) <= 1001
+
+def test_headers_only(http_server):
+    http_server.routes["/"] = (200, {"Content-Type": "text/html"}, BODY)
+    resp = _fetch(http_server.url + "/", read_body=False)
+    assert resp.status_code == 200 and resp.body == b"" and resp.truncated is None
+
+def test_slow_body_is_kept_up_to_the_transfer_deadline():
+    async def fetch():
+        async def drip(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: 100000\r\n\r\nfirst part")
+            await writer.drain()
+            await asyncio.sleep(2)
+            writer.close()
+
+        server = await asyncio.start_server(drip, "127.0.0.1", 0)
+        async with server:
+            url = "http://127.0.0.1:%d/" % server.sockets[0].getsockname()[1]
+            return await fetch_url_async(url, {"transfer_deadline_seconds": 0.5})
+
+    resp = asyncio.run(fetch())
+    assert resp.truncated == "deadline"
+    assert resp.body == b"first part"
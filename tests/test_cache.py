@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from webscan import cache
+from webscan.cache import MISS, MemoryCache, SQLiteCache, cached, cert_ttl, whois_ttl
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return MemoryCache() if request.param == "memory" else SQLiteCache(str(tmp_path / "cache.db"))
+
+def _fetcher(value, calls):
+    async def fetch():
+        calls.append(value)
+        return value
+    return fetch
+
+def test_hits_skip_the_fetch_until_expiry(backend, monkeypatch):
+    calls, now = [], [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    for _ in range(2):
+        assert asyncio.run(cached(backend, "whois", "example.com", _fetcher({"registrar": "X"}, calls),
+                                  lambda v: 60)) == {"registrar": "X"}
+    assert len(calls) == 1
+    now[0] += 61
+    assert backend.get("whois", "example.com") is MISS
+    assert backend.stats()["whois"] == {"hits": 1, "misses": 2}
+
+def test_failures_are_not_cached(backend):
+    calls = []
+    for _ in range(2):
+        asyncio.run(cached(backend, "whois", "example.com", _fetcher({"error": "rate limited"}, calls), whois_ttl))
+    assert len(calls) == 2
+
+def test_memory_cache_evicts_least_recently_used():
+    lru = MemoryCache(max_entries=2)
+    lru.set("dns", "a", 1, 60)
+    lru.set("dns", "b", 2, 60)
+    lru.get("dns", "a")
+    lru.set("dns", "c", 3, 60)
+    assert lru.get("dns", "b") is MISS
+    assert lru.get("dns", "a") == 1 and lru.get("dns", "c") == 3
+
+def test_cert_ttl_stops_before_expiry():
+    soon = datetime.now(timezone.utc) + timedelta(days=3)
+    assert cert_ttl({"not_after": soon.isoformat()}) == pytest.approx(2 * 86400, abs=5)
+    later = datetime.now(timezone.utc) + timedelta(days=300)
+    assert cert_ttl({"not_after": later.isoformat()}) == cache.CERT_MAX_TTL
+    assert cert_ttl({"not_after": "garbage"}) is None and cert_ttl(None) is None
+
+def test_get_cache_is_shared_and_can_be_disabled():
+    assert cache.get_cache({}) is cache.get_cache({"cache": "memory"})
+    assert cache.get_cache({"cache": "none"}) is None
+    with pytest.raises(ValueError):
+        cache.get_cache({"cache": "redis://"})
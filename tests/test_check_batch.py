@@ -0,0 +1,19 @@
+from webscan.check_batch import CheckBatch
+from webscan.models import CheckResult
+
+def _check(value):
+    return CheckResult("TEST", "Check", "PASS", value, None)
+
+def test_values_are_stored_as_strings():
+    values = [1, 1.0, True, None, "1", ["a", "b"]]
+    batch = CheckBatch.from_checks([_check(v) for v in values], "example.com")
+    assert batch.column("value") == ["1", "1.0", "True", None, "1", "['a', 'b']"]
+    assert len(set(batch.codes["value"])) == 5
+
+def test_round_trips_scans_in_order():
+    batch = CheckBatch()
+    batch.add_scan("a.com", [_check("x"), _check(None)])
+    batch.add_scan("b.com", [_check("y")])
+    assert [(domain, [c.value for c in checks]) for domain, checks in batch.scans()] == \
+        [("a.com", ["x", None]), ("b.com", ["y"])]
+    assert list(batch.rows())[2] == ("b.com", "TEST", "Check", "PASS", "y", None)
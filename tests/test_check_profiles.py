@@ -0,0 +1,29 @@
+import sqlite3
+
+import pytest
+
+from webscan import jobs
+from webscan.checks import registry
+
+def test_job_profiles_match_the_registry():
+    assert set(jobs.CHECK_PROFILES) == set(registry.PROFILES)
+
+def test_select_rejects_unknown_profiles():
+    assert [spec.name for spec in registry.select("headers")] == ["security_headers"]
+    with pytest.raises(ValueError):
+        registry.select("everything")
+
+def test_enqueue_rejects_unknown_profiles():
+    conn = sqlite3.connect(":memory:")
+    jobs.init_jobs_table(conn)
+    with pytest.raises(ValueError):
+        jobs.enqueue(conn, "example.com", "example.com", profile="everything")
+    job_id = jobs.enqueue(conn, "example.com", "example.com", profile="fast")
+    assert jobs.get_job(conn, job_id)["profile"] == "fast"
+
+def test_scan_endpoint_rejects_unknown_profiles(api):
+    _, client = api
+    assert client.post("/scans", params={"domain": "example.com", "profile": "everything"}).status_code == 400
+    resp = client.post("/scans", params={"domain": "example.com", "profile": "headers"})
+    assert resp.status_code == 200
+    assert resp.json()["profile"] == "headers"
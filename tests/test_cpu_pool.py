@@ -0,0 +1,38 @@
+import asyncio
+import os
+
+import pytest
+
+from conftest import ROOT
+from webscan import cpu_pool
+from webscan.checks import registry
+from webscan.keywords import DEFAULT_TERMS
+
+PAGE = ("<html><head><title>Casino</title><meta name='description' content='free win'></head>"
+        "<body><a href='/privacy'>Privacy policy</a> Best cheap casino loan offers. " * 50 + "</body></html>").encode()
+CONTENT_CHECKS = [spec.name for spec in registry.CHECKS if spec.content]
+
+def _stage(config, body=PAGE):
+    return asyncio.run(cpu_pool.run_content_stage(config, body, "utf-8", "https://example.com/", None,
+                                                  DEFAULT_TERMS, CONTENT_CHECKS))
+
+@pytest.fixture
+def importable(tmp_path, monkeypatch):
+    # Spawned workers import the package by name, like a deployed install
+    os.symlink(ROOT, tmp_path / "webscan")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(cpu_pool, "_pools", {})
+    yield
+    for pool in cpu_pool._pools.values():
+        pool.shutdown()
+
+def test_pool_results_match_in_process(importable):
+    in_process = _stage({"cpu_workers": 0})
+    pooled = _stage({"cpu_workers": 1})
+    assert pooled == in_process
+    assert in_process["title"] == "Casino" and in_process["content_length"] == len(PAGE)
+    assert _stage({"cpu_workers": 1}, b"")["content_length"] == 0
+
+def test_pool_is_shared_per_worker_count(importable):
+    assert cpu_pool.cpu_pool({"cpu_workers": 0}) is None
+    assert cpu_pool.cpu_pool({"cpu_workers": 2}) is cpu_pool.cpu_pool({"cpu_workers": 2})
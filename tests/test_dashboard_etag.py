@@ -0,0 +1,49 @@
+from webscan import rescore
+
+def _save(db_helpers, domain):
+    return db_helpers.save_scan_results(domain, 90, "SAFE", "low", [], [], [])
+
+def test_dashboard_etag_changes_after_rescore(api):
+    module, client = api
+    run_id = _save(module.db_helpers, "example.com")
+
+    first = client.get("/dashboard/example.com")
+    etag = first.headers["ETag"]
+    assert client.get("/dashboard/example.com", headers={"If-None-Match": etag}).status_code == 304
+
+    profile = {"version": 2, "weights": {"missing_csp_header": 1.0}, "category_weights": {},
+               "severities": {"missing_csp_header": "HIGH"}}
+    with module.db_helpers.connection() as conn:
+        rescore.rescore_batch(conn, [run_id], [{"missing_csp_header": 1.0}], profile)
+
+    second = client.get("/dashboard/example.com", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != etag
+    assert second.json()["overview"] != first.json()["overview"]
+
+def test_dashboard_etag_changes_after_new_run(api):
+    module, client = api
+    _save(module.db_helpers, "example.com")
+    etag = client.get("/dashboard/example.com").headers["ETag"]
+    _save(module.db_helpers, "example.com")
+    assert client.get("/dashboard/example.com", headers={"If-None-Match": etag}).status_code == 200
+
+def test_dashboard_aggregates_the_single_endpoints(api):
+    module, client = api
+    module.db_helpers.save_scan_results(
+        "example.com", 40, "AT_RISK", "high",
+        [{"parameter": "missing_csp_header", "risk": 1.0, "severity": "high"}],
+        [{"change": "CSP removed", "severity": "high", "time": "2024-01-01T00:00:00"}],
+        [{"issue": "missing_csp_header", "risk": 1.0, "action": "Add a CSP", "status": "open"}],
+    )
+    body = client.get("/dashboard/example.com").json()
+    for part in ("overview", "risks", "actions", "timeline"):
+        assert body[part] == client.get(f"/{part}/example.com").json(), part
+    assert body["risks"][0]["parameter"] == "missing_csp_header"
+
+def test_if_none_match_forms(api):
+    _, client = api
+    etag = client.get("/dashboard/unknown.com").headers["ETag"]
+    for header in (etag, "W/" + etag, '"other", ' + etag, "*"):
+        assert client.get("/dashboard/unknown.com", headers={"If-None-Match": header}).status_code == 304, header
+    assert client.get("/dashboard/unknown.com", headers={"If-None-Match": '"other"'}).status_code == 200
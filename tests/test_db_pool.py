@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from webscan import db_helpers
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_helpers, "BACKEND", "sqlite")
+    monkeypatch.setattr(db_helpers, "DB_PATH", str(tmp_path / "pool.db"))
+    monkeypatch.setattr(db_helpers, "_pool", db_helpers.queue.LifoQueue(maxsize=db_helpers.POOL_SIZE))
+
+def test_connections_are_reused_within_a_process(sqlite_db):
+    with db_helpers.connection() as conn:
+        first = id(conn)
+    with db_helpers.connection() as conn:
+        assert id(conn) == first
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_does_not_reuse_the_parents_connection(sqlite_db):
+    with db_helpers.connection() as conn:
+        parent = conn
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            with db_helpers.connection() as conn:
+                ok = conn is not parent and conn.execute("SELECT 1").fetchone() == (1,)
+            os.write(write, b"1" if ok else b"0")
+        finally:
+            os._exit(0)
+    os.close(write)
+    assert os.read(read, 1) == b"1"
+    os.waitpid(pid, 0)
+    with db_helpers.connection() as conn:
+        assert conn is parent
@@ -0,0 +1,78 @@
+import asyncio
+import socket
+import threading
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+import pytest
+
+from webscan.cache import MemoryCache
+from webscan.fetchers import dns as dns_fetcher
+
+ZONE = {
+    ("example.test.", "A"): (300, ["192.0.2.1"]),
+    ("example.test.", "MX"): (3600, ["10 mail.example.test."]),
+    ("example.test.", "TXT"): (600, ['"v=spf1 " "-all"']),
+    ("example.test.", "NS"): (86400, ["ns1.example.test."]),
+    ("_dmarc.example.test.", "TXT"): (600, ['"v=DMARC1; p=reject"']),
+    ("google._domainkey.example.test.", "TXT"): (600, ['"v=DKIM1; k=rsa"']),
+    ("1.2.0.192.in-addr.arpa.", "PTR"): (600, ["host.example.test."]),
+}
+SOA = "ns1.example.test. admin.example.test. 1 3600 600 86400 120"
+
+@pytest.fixture
+def nameserver():
+    """Stub authoritative server for ZONE on a local UDP port; .queries counts the questions it answered."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    server = {"queries": [], "address": "127.0.0.1:%d" % sock.getsockname()[1]}
+
+    def serve():
+        while True:
+            try:
+                wire, peer = sock.recvfrom(4096)
+            except OSError:
+                return
+            query = dns.message.from_wire(wire)
+            question = query.question[0]
+            name, rtype = question.name.to_text(), dns.rdatatype.to_text(question.rdtype)
+            server["queries"].append((name, rtype))
+            response = dns.message.make_response(query)
+            if (name, rtype) in ZONE:
+                ttl, values = ZONE[(name, rtype)]
+                response.answer.append(dns.rrset.from_text_list(name, ttl, "IN", rtype, values))
+            else:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+                response.authority.append(dns.rrset.from_text_list("example.test.", 3600, "IN", "SOA", [SOA]))
+            sock.sendto(response.to_wire(), peer)
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield server
+    sock.close()
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(dns_fetcher, "_records", MemoryCache())
+
+def _resolve(nameserver):
+    return asyncio.run(dns_fetcher.resolve_records_with_ttl_async(
+        "example.test", {"dns_nameservers": [nameserver["address"]], "dkim_selectors": ["google", "selector1"]}))
+
+def test_records_dmarc_dkim_and_ptr(nameserver):
+    data, ttl = _resolve(nameserver)
+    assert data["A"] == ["192.0.2.1"] and data["MX"] == ["10 mail.example.test."]
+    assert data["DMARC"] == ["v=DMARC1; p=reject"]
+    assert data["DKIM"] == ["google"]
+    assert data["PTR"] == {"192.0.2.1": ["host.example.test."]}
+    # Smallest TTL across the lookups: the SOA minimum of the negative answers
+    assert ttl == 120
+
+def test_answers_are_cached_per_record_set(nameserver):
+    first, _ = _resolve(nameserver)
+    asked = len(nameserver["queries"])
+    assert asked == len(set(nameserver["queries"]))
+    second, _ = _resolve(nameserver)
+    assert second == first
+    assert len(nameserver["queries"]) == asked
@@ -0,0 +1,50 @@
+import pytest
+
+from webscan import cpu_pool
+from webscan.checks import registry
+from webscan.fetchers import content
+from webscan.fetchers.content import parse_html
+
+PAGE = """<html><head><title> Shop </title>
+<meta name="Description" content=" Cheap deals ">
+<meta property="og:title" content="Shop">
+<link rel="canonical" href="https://example.com/">
+<script src="/app.js"></script></head>
+<body><a href="/casino">Casino bonus</a> Free casino spins, act now!
+<iframe src="https://ads.example.net/"></iframe></body></html>"""
+
+def test_fields_are_extracted_in_one_pass():
+    doc = parse_html(PAGE)
+    assert doc.title == "Shop"
+    assert doc.meta_description == "Cheap deals"
+    assert doc.meta_properties["og:title"] == "Shop"
+    assert doc.canonical == "https://example.com/"
+    assert doc.scripts == ["/app.js"] and doc.iframes == ["https://ads.example.net/"]
+    assert doc.links == ["/casino"]
+    assert "Free casino spins" in doc.text
+    assert doc.get("title") == "Shop" and doc.get("missing", "x") == "x"
+
+def test_keyword_counts_per_field():
+    doc = parse_html(PAGE, term_lists={"gambling": ["casino", "Bonus"], "urgency": ["act now"]})
+    assert doc.keywords("gambling") == {"casino": 2, "bonus": 1}
+    assert doc.keywords("urgency") == {"act now": 1}
+    assert doc.keywords("gambling", "links") == {"casino": 1, "bonus": 0}
+
+def test_content_checks_share_one_parse(monkeypatch):
+    calls = []
+    extract = content._extract_bs4
+
+    def counting(html, features):
+        calls.append(features)
+        return extract(html, features)
+
+    monkeypatch.setattr(content, "_extract_bs4", counting)
+    names = [spec.name for spec in registry.CHECKS if spec.content]
+    result = cpu_pool.analyze_content(PAGE.encode(), "utf-8", "https://example.com/", None, None, names)
+    assert len(calls) == 1
+    assert {row[0] for row in result["checks"]} >= {"CONTENT INTEGRITY", "SEO & SEARCH TRUST"}
+    assert result["title"] == "Shop"
+
+def test_selectolax_matches_beautifulsoup():
+    pytest.importorskip("selectolax")
+    assert parse_html(PAGE, "selectolax").to_dict() == parse_html(PAGE, "html.parser").to_dict()
@@ -0,0 +1,58 @@
+import pytest
+
+from webscan import domains
+from webscan.checks.domain_identity import _idn_homograph
+from webscan.domains import extract, extract_domains, host_of, registered_domain, split_host
+
+@pytest.mark.parametrize("url, parts", [
+    ("https://www.example.co.uk/path", ("www", "example", "co.uk")),
+    ("http://user:pw@Shop.Example.COM:8080/?q=1", ("shop", "example", "com")),
+    ("example.com.", ("", "example", "com")),
+    ("a.b.c.kawasaki.jp", ("a", "b", "c.kawasaki.jp")),     # *.kawasaki.jp
+    ("www.city.kawasaki.jp", ("www", "city", "kawasaki.jp")),  # !city.kawasaki.jp
+    ("foo.github.io", ("foo", "github", "io")),
+    ("http://192.0.2.1:8080/", ("", "192.0.2.1", "")),
+    ("http://[2001:db8::1]/", ("", "2001:db8::1", "")),
+    ("intranet", ("", "intranet", "")),
+    ("co.uk", ("", "", "co.uk")),
+])
+def test_splits(url, parts):
+    assert tuple(extract(url)) == parts
+
+def test_private_suffixes_are_opt_in():
+    assert registered_domain("foo.github.io") == "github.io"
+    assert registered_domain("foo.github.io", include_private=True) == "foo.github.io"
+
+def test_idn_hosts_keep_their_form():
+    assert tuple(split_host("www.пример.рф")) == ("www", "пример", "рф")
+    assert tuple(split_host("xn--e1afmkfd.xn--p1ai")) == ("", "xn--e1afmkfd", "xn--p1ai")
+
+def test_hosts_without_a_suffix_are_their_own_domain():
+    assert registered_domain("http://localhost:8000/") == "localhost"
+    assert registered_domain("http://10.1.2.3/") == "10.1.2.3"
+    assert host_of("HTTPS://User@WWW.Example.com.:443/x") == "www.example.com"
+
+def test_extract_domains_matches_registered_domain():
+    urls = ["https://a.example.co.uk/", "a.example.co.uk/x", "http://localhost", "https://www.city.kawasaki.jp/"]
+    assert extract_domains(urls) == [registered_domain(u) for u in urls]
+
+def test_bundled_list_version():
+    assert domains.suffix_list_version()
+
+def test_matches_tldextract_snapshot():
+    tldextract = pytest.importorskip("tldextract")
+    extractor = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+    hosts = ["www.example.co.uk", "a.b.c.kawasaki.jp", "www.city.kawasaki.jp", "foo.bar.ck", "www.ck",
+             "x.s3.amazonaws.com", "example.com.au", "localhost", "sub.domain.xn--p1ai"]
+    for host in hosts:
+        theirs = extractor(host)
+        assert tuple(split_host(host)) == (theirs.subdomain, theirs.domain, theirs.suffix), host
+
+@pytest.mark.parametrize("domain, status", [
+    ("example.com", "PASS"),
+    ("аpple.com", "FAIL"),       # Cyrillic а in a .com name
+    ("москва.рф", "WARN"),       # Cyrillic name under a Cyrillic TLD
+    ("bücher.de", "INFO"),
+])
+def test_homograph_risk(domain, status):
+    assert _idn_homograph(domain).status == status
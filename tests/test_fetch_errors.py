@@ -0,0 +1,47 @@
+import asyncio
+
+import httpx
+
+from webscan.checks import performance_availability
+from webscan.fetchers.http import error_message, fetch_url_async
+from webscan.fetchers.performance import perf_from_response
+from webscan.scanner import _run_fetch_stage
+
+def _status(results, name):
+    return next(r.status for r in results if r.name == name)
+
+def test_error_messages_are_never_empty():
+    assert str(httpx.ReadTimeout("")) == ""
+    assert error_message(httpx.ReadTimeout("")).startswith("timeout")
+    assert error_message(asyncio.TimeoutError()).startswith("timeout")
+    assert error_message(httpx.ConnectError("")) == "ConnectError"
+    assert error_message(httpx.ConnectError("refused")) == "ConnectError: refused"
+
+def test_timeout_without_message_warns():
+    perf = perf_from_response(httpx.ReadTimeout(""))
+    assert perf["error"]
+    assert _status(performance_availability.run(perf), "Server timeout errors") == "WARN"
+
+async def _hanging_server():
+    # Accepts connections and never answers
+    async def handle(reader, writer):
+        await reader.read()
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+def test_hung_server_is_a_timeout_error():
+    async def scan():
+        server = await _hanging_server()
+        url = "http://127.0.0.1:%d/" % server.sockets[0].getsockname()[1]
+        config = {"timeout_seconds": 0.2, "transfer_deadline_seconds": 5, "scan_deadline_seconds": 5}
+        async with server:
+            resp = await fetch_url_async(url, config)
+            results, timings = await _run_fetch_stage(url, "127.0.0.1", config, fetchers={"http"})
+        return resp, results, timings
+
+    resp, results, timings = asyncio.run(scan())
+    assert isinstance(resp, httpx.TimeoutException)
+    assert isinstance(results["http"], httpx.TimeoutException)
+    assert timings["http"]["status"] == "error"
+    assert timings["http"]["error"].startswith("timeout")
+    perf = perf_from_response(results["http"])
+    assert _status(performance_availability.run(perf), "Server timeout errors") == "WARN"
@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from webscan.scanner import _run_fetch_stage
+
+async def _hanging_server():
+    # Accepts connections and never answers
+    async def handle(reader, writer):
+        await reader.read()
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+def test_fetchers_past_the_scan_deadline_are_cancelled():
+    async def stage():
+        server = await _hanging_server()
+        url = "http://127.0.0.1:%d/" % server.sockets[0].getsockname()[1]
+        config = {"timeout_seconds": 30, "transfer_deadline_seconds": 30, "scan_deadline_seconds": 0.3}
+        async with server:
+            start = time.monotonic()
+            results, timings = await _run_fetch_stage(url, "127.0.0.1", config, fetchers={"http"})
+            return results, timings, time.monotonic() - start
+
+    results, timings, elapsed = asyncio.run(stage())
+    assert elapsed < 5
+    assert "http" not in results
+    assert timings["http"]["status"] == "timeout"
+    assert set(timings) == {"http", "total_ms"}
+
+def test_only_requested_fetchers_run():
+    results, timings = asyncio.run(_run_fetch_stage("http://127.0.0.1:9/", "127.0.0.1", {}, fetchers=set()))
+    assert results == {}
+    assert set(timings) == {"total_ms"}
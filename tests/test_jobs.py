@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+from webscan import jobs
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "jobs.db"), isolation_level=None)
+    jobs.init_jobs_table(conn)
+    return conn
+
+def test_jobs_are_claimed_oldest_first_once(conn):
+    first = jobs.enqueue(conn, "a.com", "a.com")
+    second = jobs.enqueue(conn, "b.com", "b.com")
+    claimed = jobs.claim_next(conn, "w1")
+    assert claimed["id"] == first and claimed["status"] == jobs.RUNNING and claimed["attempts"] == 1
+    assert jobs.claim_next(conn, "w2")["id"] == second
+    assert jobs.claim_next(conn, "w3") is None
+    jobs.finish(conn, first, 42)
+    assert jobs.get_job(conn, first)["status"] == jobs.DONE and jobs.get_job(conn, first)["run_id"] == 42
+
+def test_failed_jobs_retry_until_max_attempts(conn):
+    job_id = jobs.enqueue(conn, "a.com", "a.com")
+    for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+        assert jobs.claim_next(conn, "w")["attempts"] == attempt
+        jobs.fail(conn, job_id, "boom")
+    job = jobs.get_job(conn, job_id)
+    assert job["status"] == jobs.FAILED and job["error"] == "boom"
+    assert jobs.claim_next(conn, "w") is None
+
+def test_stale_jobs_are_requeued_then_failed(conn):
+    job_id = jobs.enqueue(conn, "a.com", "a.com")
+    for _ in range(jobs.MAX_ATTEMPTS - 1):
+        jobs.claim_next(conn, "w")
+        assert jobs.requeue_stale(conn, older_than_seconds=-1) == 1
+        assert jobs.get_job(conn, job_id)["status"] == jobs.QUEUED
+    jobs.claim_next(conn, "w")
+    jobs.requeue_stale(conn, older_than_seconds=-1)
+    job = jobs.get_job(conn, job_id)
+    assert job["status"] == jobs.FAILED and job["error"] == "worker stopped responding"
+
+def test_cancel(conn):
+    queued = jobs.enqueue(conn, "a.com", "a.com")
+    running = jobs.enqueue(conn, "b.com", "b.com")
+    assert jobs.cancel(conn, queued)["status"] == jobs.CANCELLED
+    jobs.claim_next(conn, "w")
+    assert jobs.cancel(conn, running)["status"] == jobs.RUNNING
+    assert jobs.is_cancel_requested(conn, running)
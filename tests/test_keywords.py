@@ -0,0 +1,40 @@
+import json
+import random
+
+import pytest
+
+from webscan import keywords
+from webscan.keywords import SMALL_TERM_LIST, KeywordMatcher, load_term_lists
+
+def _terms_and_text():
+    rng = random.Random(7)
+    words = ["a", "aa", "ab", "aba", "free", "freebie", "win", "winner", "casino", "privacy policy", "privacy"]
+    words += ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(2 * SMALL_TERM_LIST)]
+    text = "".join(rng.choice(["a", "b", "c", " ", "free", "winner ", "privacy policy", "aaa"]) for _ in range(5000))
+    return words, text
+
+@pytest.mark.parametrize("engine", ["regex", "ahocorasick"])
+def test_counts_equal_str_count(engine, monkeypatch):
+    if engine == "regex":
+        monkeypatch.setattr(keywords, "ahocorasick", None)
+    elif keywords.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    terms, text = _terms_and_text()
+    matcher = KeywordMatcher(terms)
+    assert len(matcher.terms) >= SMALL_TERM_LIST
+    assert matcher.count(text) == {t: text.count(t) for t in matcher.terms}
+
+def test_short_lists_and_empty_input():
+    matcher = KeywordMatcher(["Free", "win", ""])
+    assert matcher.terms == ["free", "win"]
+    assert matcher.count("free wins, freewin") == {"free": 2, "win": 2}
+    assert matcher.count("") == {"free": 0, "win": 0}
+    assert KeywordMatcher([]).count("anything") == {}
+
+def test_term_lists_are_overridden_per_group(tmp_path):
+    path = tmp_path / "terms.json"
+    path.write_text(json.dumps({"spam": ["lottery"]}))
+    lists = load_term_lists({"keyword_lists_path": str(path), "keyword_lists": {"legal_links": ["imprint"]}})
+    assert lists["spam"] == ["lottery"]
+    assert lists["legal_links"] == ["imprint"]
+    assert lists["seo_stuffing"] == keywords.DEFAULT_TERMS["seo_stuffing"]
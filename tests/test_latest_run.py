@@ -0,0 +1,35 @@
+import sqlite3
+
+from webscan import db_helpers
+
+def _scan(domain, score):
+    return {"domain": domain, "trust_score": score, "verdict": "SAFE", "severity": "low",
+            "findings": [], "events": [], "actions": []}
+
+def test_latest_run_follows_each_save(database):
+    first, other = database.save_many_scan_results([_scan("a.com", 50), _scan("b.com", 70)])
+    second = database.save_scan_results("a.com", 90, "SAFE", "low", [], [], [])
+    with database.connection() as conn:
+        rows = dict((r[0], r[1:]) for r in conn.execute("SELECT domain, run_id, trust_score FROM latest_run"))
+    assert rows == {"a.com": (second, 90), "b.com": (other, 70)}
+    assert first < second
+
+def test_legacy_database_is_backfilled_and_indexed():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""CREATE TABLE runs (id INTEGER PRIMARY KEY, domain TEXT, trust_score INTEGER, verdict TEXT,
+                    severity TEXT, created_at TEXT)""")
+    conn.executemany("INSERT INTO runs (domain, trust_score, verdict, severity, created_at) VALUES (?,?,?,?,?)", [
+        ("a.com", 10, "UNSAFE", "critical", "2024-01-01T00:00:00"),
+        ("a.com", 80, "SAFE", "low", "2024-02-01T00:00:00"),
+        ("b.com", 60, "CAUTION", "medium", "2024-01-15T00:00:00"),
+    ])
+    db_helpers.init_latest_run_table(conn)
+    db_helpers.init_latest_run_table(conn)   # idempotent
+    assert sorted(conn.execute("SELECT domain, run_id, trust_score FROM latest_run")) == [("a.com", 2, 80), ("b.com", 3, 60)]
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert "idx_runs_domain_created" in indexes
+
+def test_nothing_to_do_before_init_db():
+    conn = sqlite3.connect(":memory:")
+    db_helpers.init_latest_run_table(conn)
+    assert not db_helpers.has_table(conn, "latest_run")
@@ -0,0 +1,26 @@
+import asyncio
+
+from webscan.scanner import scan_single_async
+
+PAGE = b"<html><head><title>Home</title></head><body>hello</body></html>"
+
+def _scan(url, **config):
+    return asyncio.run(scan_single_async(url, {"checks": ["performance_availability"], **config}))
+
+def test_latency_comes_from_the_primary_fetch(http_server):
+    http_server.routes["/"] = (301, {"Location": "/home"}, b"")
+    http_server.routes["/home"] = (200, {"Content-Type": "text/html"}, PAGE)
+    _, checks, artifacts = _scan(http_server.url + "/")
+    # One request per hop; nothing downloaded a second time for latency
+    assert [path for path, _ in http_server.requests] == ["/", "/home"]
+    perf = artifacts["perf"]
+    assert perf["status_code"] == 200 and perf["redirects"] == 1
+    assert perf["ms"] is not None and perf["ttfb_ms"] is not None
+    assert [hop["url"] for hop in perf["chain"]] == [http_server.url + "/", http_server.url + "/home"]
+    assert {c.name: c.status for c in checks}["Average response time"] == "PASS"
+
+def test_extra_latency_samples_are_opt_in(http_server):
+    http_server.routes["/"] = (200, {"Content-Type": "text/html"}, PAGE)
+    _, _, artifacts = _scan(http_server.url + "/", latency_samples=3)
+    assert len(http_server.requests) == 3
+    assert len(artifacts["perf"]["samples"]) == 3
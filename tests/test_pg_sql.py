@@ -0,0 +1,20 @@
+from webscan.db_helpers import _PgCursor, _qmark_to_pyformat
+
+def test_placeholders_are_rewritten_outside_literals():
+    assert _qmark_to_pyformat("SELECT * FROM runs WHERE domain=? AND id>?") == \
+        "SELECT * FROM runs WHERE domain=%s AND id>%s"
+    assert _qmark_to_pyformat("SELECT '?', \"a?\" FROM t WHERE x=?") == "SELECT '?', \"a?\" FROM t WHERE x=%s"
+    assert _qmark_to_pyformat("SELECT 'it''s ?' WHERE y=?") == "SELECT 'it''s ?' WHERE y=%s"
+
+def test_literal_percent_signs_are_escaped():
+    assert _qmark_to_pyformat("SELECT 1 WHERE d LIKE '%a?' AND x=? AND n % 2 = 0") == \
+        "SELECT 1 WHERE d LIKE '%%a?' AND x=%s AND n %% 2 = 0"
+
+def test_cursor_passes_rewritten_sql():
+    class Raw:
+        def execute(self, sql, params):
+            self.sent = (sql, params)
+
+    raw = Raw()
+    _PgCursor(raw).execute("UPDATE t SET v='?%' WHERE id=?", (1,))
+    assert raw.sent == ("UPDATE t SET v='?%%' WHERE id=%s", (1,))
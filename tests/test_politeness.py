@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from webscan import politeness
+from webscan.politeness import PoliteScheduler, TokenBucket, retry_after
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(politeness.time, "monotonic", lambda: now[0])
+    return now
+
+def _scheduler(items, **config):
+    scheduler = PoliteScheduler(config)
+    asyncio.run(scheduler.add(items))
+    return scheduler
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=2, burst=2, now=0)
+    bucket.take(0)
+    bucket.take(0)
+    assert bucket.wait(0) == pytest.approx(0.5)
+    assert bucket.wait(0.5) == 0
+    assert TokenBucket(rate=0, burst=1, now=0).wait(0) == 0
+
+def test_retry_after():
+    assert retry_after({"retry-after": "30"}) == 30
+    assert retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == politeness.DEFAULT_BACKOFF
+    assert retry_after({"retry-after": "99999"}) == politeness.MAX_BACKOFF
+    assert retry_after(None) == politeness.DEFAULT_BACKOFF
+
+def test_busy_host_does_not_block_others(clock):
+    items = [("http://10.0.0.1/a", "a.com"), ("http://10.0.0.1/b", "a.com"), ("http://10.0.0.2/", "b.com")]
+    scheduler = _scheduler(items, per_host_concurrency=1, per_domain_rate=0, per_ip_rate=0)
+    first, _ = scheduler.pop_ready()
+    second, _ = scheduler.pop_ready()
+    assert (first[0], second[0]) == ("http://10.0.0.1/a", "http://10.0.0.2/")
+    # a.com is at its in-flight cap; only a finishing scan frees it
+    assert scheduler.pop_ready() == (None, None)
+    scheduler.finish(first)
+    assert scheduler.pop_ready()[0][0] == "http://10.0.0.1/b"
+
+def test_rate_limit_reports_when_to_wake(clock):
+    items = [(f"http://10.0.0.{i}/", "a.com") for i in range(1, 4)]
+    scheduler = _scheduler(items, per_domain_rate=1, per_domain_burst=2, per_host_concurrency=0, per_ip_rate=0)
+    assert scheduler.pop_ready()[0] and scheduler.pop_ready()[0]
+    item, wake = scheduler.pop_ready()
+    assert item is None and wake == pytest.approx(1.0)
+    clock[0] += 1.0
+    assert scheduler.pop_ready()[0][0] == "http://10.0.0.3/"
+
+def test_429_pauses_the_domain_and_address(clock):
+    items = [("http://10.0.0.1/a", "a.com"), ("http://10.0.0.1/b", "a.com")]
+    scheduler = _scheduler(items, per_domain_rate=0, per_ip_rate=0)
+    first, _ = scheduler.pop_ready()
+    scheduler.finish(first, {"status_code": 429, "headers": {"retry-after": "20"}})
+    item, wake = scheduler.pop_ready()
+    assert item is None and wake == pytest.approx(20)
+    clock[0] += 20
+    assert scheduler.pop_ready()[0][0] == "http://10.0.0.1/b"
@@ -0,0 +1,55 @@
+import asyncio
+
+from webscan import scanner
+from webscan.scan_state import build_state, diff_events
+
+PAGE = b"<html><head><title>Home</title></head><body>Welcome</body></html>"
+# No resolver to ask: DNS runs into the scan deadline, everything else is local
+OFFLINE = {"dns_nameservers": ["127.0.0.1:9"], "scan_deadline_seconds": 1, "cache": "none"}
+
+def _scan(url, previous=None):
+    return asyncio.run(scanner.scan_single_async(url, OFFLINE, previous))[2]
+
+def _no_parse(monkeypatch):
+    async def fail(*args):
+        raise AssertionError("unchanged page was parsed again")
+    monkeypatch.setattr(scanner, "run_content_stage", fail)
+
+def test_unchanged_body_reuses_content_checks(http_server, monkeypatch):
+    http_server.routes["/"] = (200, {"Content-Type": "text/html", "ETag": '"v1"'}, PAGE)
+    first = _scan(http_server.url + "/")
+    assert not first["unchanged"] and first["events"][0]["change"] == "First scan"
+
+    _no_parse(monkeypatch)
+    second = _scan(http_server.url + "/", first["state"])
+    assert http_server.requests[-1][1].get("If-None-Match") == '"v1"'
+    assert second["unchanged"]
+    assert second["events"] == []
+    assert second["state"]["content_checks"] == first["state"]["content_checks"]
+
+def test_not_modified_keeps_the_previous_headers(http_server, monkeypatch):
+    def page(headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"'}, b""
+        return 200, {"Content-Type": "text/html", "ETag": '"v1"', "X-Frame-Options": "DENY"}, PAGE
+    http_server.routes["/"] = page
+    first = _scan(http_server.url + "/")
+    _no_parse(monkeypatch)
+    second = _scan(http_server.url + "/", first["state"])
+    assert second["unchanged"] and second["status_code"] == 200
+    assert second["headers"]["x-frame-options"] == "DENY"
+
+def test_diff_events_report_only_changes():
+    previous = build_state(None, status_code=200, title="Home", content_hash="a", nameservers=["ns1.example.net"],
+                           check_statuses={"HSTS": "PASS", "CSP": "FAIL", "Age": "INFO"})
+    same = build_state(previous, status_code=200, title="Home", content_hash="a", nameservers=["ns1.example.net"],
+                       check_statuses={"HSTS": "PASS", "CSP": "FAIL", "Age": "PASS"})
+    assert diff_events(previous, same) == []
+    changed = build_state(previous, status_code=503, title="Sale", content_hash="b", nameservers=["ns.evil.test"],
+                          check_statuses={"HSTS": "FAIL", "CSP": "PASS", "Age": "INFO"})
+    changes = [e["change"] for e in diff_events(previous, changed)]
+    assert changes == ["HTTP status changed from 200 to 503", "Homepage content changed",
+                       "Title changed from 'Home' to 'Sale'", "Nameservers changed to ns.evil.test",
+                       "CSP: FAIL -> PASS", "HSTS: PASS -> FAIL"]
+    assert changed["title_changes"] and changed["nameservers_changed_at"]
+    assert changed["status_codes"] == [200, 503]
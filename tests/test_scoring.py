@@ -0,0 +1,61 @@
+import random
+
+from webscan.models import CheckResult
+from webscan.scoring import (CATEGORY_WEIGHTS, CHECK_PARAMETERS, NEUTRAL_CATEGORY, ScoreVectors, category_of,
+                             compute_scores, compute_scores_batch, risk_matrix, risks_from_checks)
+from webscan.weight_mapping import WEIGHT_MAP
+
+UNMAPPED = ["Domain age", "CMS detection", "Noindex tag presence"]
+
+def _checks(status, names):
+    return [CheckResult("TEST", name, status, None, None) for name in names]
+
+def test_mapped_parameters_are_weighted_and_categorized():
+    for param in set(CHECK_PARAMETERS.values()):
+        assert category_of(param) != NEUTRAL_CATEGORY, param
+    assert risks_from_checks(_checks("FAIL", ["Content-Security-Policy"])) == {"missing_csp_header": 1.0}
+    assert "missing_csp_header" in WEIGHT_MAP
+
+def test_fully_failing_scan_scores_below_caution():
+    summary = compute_scores(risks_from_checks(_checks("FAIL", list(CHECK_PARAMETERS) + UNMAPPED)))
+    assert summary["trust_score"] < 70
+    assert summary["verdict"] in ("AT_RISK", "UNSAFE")
+    assert summary["severity"] == "CRITICAL"
+
+def test_passing_scan_is_safe():
+    summary = compute_scores(risks_from_checks(_checks("PASS", list(CHECK_PARAMETERS) + UNMAPPED)))
+    assert summary["trust_score"] == 100
+    assert summary["verdict"] == "SAFE"
+
+def test_unmapped_checks_are_neutral():
+    summary = compute_scores(risks_from_checks(_checks("FAIL", UNMAPPED)))
+    assert summary["trust_score"] == 100
+    assert summary["severity"] == "LOW"
+    assert set(summary["category_risks"]) == {NEUTRAL_CATEGORY}
+
+def test_batch_matches_scalar():
+    risk_dicts = [risks_from_checks(_checks(status, list(CHECK_PARAMETERS) + UNMAPPED)) for status in ("FAIL", "WARN", "PASS")]
+    risk_dicts.append(risks_from_checks(_checks("FAIL", UNMAPPED)))
+    matrix, params = risk_matrix(risk_dicts)
+    batch = compute_scores_batch(matrix, ScoreVectors(params))
+    for i, risks in enumerate(risk_dicts):
+        summary = compute_scores(risks)
+        assert batch["trust_score"][i] == summary["trust_score"]
+        assert batch["verdict"][i] == summary["verdict"]
+        assert batch["severity"][i] == summary["severity"]
+
+def test_batch_matches_scalar_on_random_sparse_rows():
+    rng = random.Random(3)
+    params = sorted(WEIGHT_MAP) + ["unweighted_parameter"]
+    risk_dicts = [{p: rng.choice([0.0, 0.25, 0.5, 1.0]) for p in rng.sample(params, rng.randint(0, len(params)))}
+                  for _ in range(200)]
+    profile = {"weights": {p: rng.uniform(0.1, 1.0) for p in WEIGHT_MAP}, "category_weights": CATEGORY_WEIGHTS}
+    matrix, columns = risk_matrix(risk_dicts)
+    for weights in (None, profile):
+        vectors = ScoreVectors(columns, *((weights["weights"], weights["category_weights"]) if weights else ()))
+        batch = compute_scores_batch(matrix, vectors)
+        for i, risks in enumerate(risk_dicts):
+            summary = compute_scores(risks, weights)
+            assert (batch["trust_score"][i], batch["verdict"][i], batch["severity"][i]) == \
+                (summary["trust_score"], summary["verdict"], summary["severity"]), risks
+            assert batch["critical"][i] == bool(summary["critical_flags"])
@@ -0,0 +1,90 @@
+import asyncio
+import datetime
+import socket
+import ssl
+import threading
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from webscan.cache import MemoryCache
+from webscan.checks import ssl_tls
+from webscan.fetchers import tls
+
+@pytest.fixture
+def tls_server(tmp_path):
+    """TLS 1.2+ server on localhost with a self-signed certificate; .handshakes counts connections."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1)).not_valid_after(now + datetime.timedelta(days=90))
+            .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+            .sign(key, hashes.SHA256()))
+    (tmp_path / "cert.pem").write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    (tmp_path / "key.pem").write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                                         serialization.NoEncryption()))
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_2
+    ctx.load_cert_chain(tmp_path / "cert.pem", tmp_path / "key.pem")
+
+    host = socket.getaddrinfo("localhost", 0, type=socket.SOCK_STREAM)[0][4][0]
+    listener = socket.create_server((host, 0), family=socket.AF_INET6 if ":" in host else socket.AF_INET)
+    server = {"port": listener.getsockname()[1], "handshakes": 0}
+
+    def serve():
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                return
+            server["handshakes"] += 1
+            try:
+                with ctx.wrap_socket(sock, server_side=True) as conn:
+                    conn.recv(1)
+            except (ssl.SSLError, OSError):
+                pass
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield server
+    listener.close()
+
+@pytest.fixture(autouse=True)
+def empty_probe_cache(monkeypatch):
+    monkeypatch.setattr(tls, "_probes", MemoryCache())
+
+def _statuses(info):
+    return {c.name: c.status for c in ssl_tls.run(info)}
+
+def test_one_handshake_inspects_cert_protocol_and_cipher(tls_server):
+    info = asyncio.run(tls.probe_tls_async("localhost", tls_server["port"], timeout=5))
+    assert "handshake_error" not in info
+    assert info["hostname_match"] is True
+    assert info["protocol"] in ("TLSv1.2", "TLSv1.3") and info["cipher"]
+    assert info["chain"][0]["self_signed"] is True
+    assert info["verify_errors"]
+    assert info["versions"]["TLSv1"] is False and info["versions"]["TLSv1.1"] is False
+    assert not info["weak_cipher"]
+    statuses = _statuses(info)
+    assert statuses["Self-signed cert detection"] == "FAIL"
+    assert statuses["SAN mismatch"] == "PASS"
+    assert statuses["TLS version support"] == "PASS"
+
+def test_version_probes_are_shared_per_address(tls_server):
+    asyncio.run(tls.probe_tls_async("localhost", tls_server["port"], timeout=5))
+    first = tls_server["handshakes"]
+    assert first > 1
+    asyncio.run(tls.probe_tls_async("localhost", tls_server["port"], timeout=5))
+    assert tls_server["handshakes"] == first + 1
+
+def test_unreachable_host_reports_a_handshake_error():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    info = asyncio.run(tls.probe_tls_async("127.0.0.1", port, timeout=2))
+    assert set(info) == {"handshake_error"} and info["handshake_error"]
+    assert _statuses(info)["HTTPS availability"] == "FAIL"
@@ -1,6 +1,5 @@
 import re
-import tldextract
-from urllib.parse import urlparse
+from .domains import registered_domain
 
 def normalize_url(url: str) -> str:
     url = url.strip()
@@ -9,7 +8,5 @@ def normalize_url(url: str) -> str:
     return url
 
 def extract_domain(url: str) -> str:
-    parsed = urlparse(url)
-    host = parsed.netloc or parsed.path
-    ext = tldextract.extract(host)
-    return ".".join(filter(None, [ext.domain, ext.suffix])) if ext.suffix else host
+    # Bundled public suffix list (domains.py); the same key batch.py gets from extract_domains
+    return registered_domain(url)
@@ -5,6 +5,7 @@ WEIGHT_MAP = {
     "phishing_pattern": 1.0,
     "blacklist_hit": 1.0,
     "ssl_expiry_days": 0.8,
+    "ssl_invalid": 0.8,
     "missing_csp_header": 0.7,
     "dkim_absent": 0.7,
     "spf_absent": 0.7,
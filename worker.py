@@ -0,0 +1,173 @@
+# webscan/worker.py
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import time
+from datetime import datetime
+from . import db_helpers, jobs, profiles
+from .blobstore import get_blob_store, store_scan_artifacts
+from .check_batch import CheckBatch
+from .scanner import scan_single_async
+from .scoring import CATEGORY_WEIGHTS, compute_scores, risks_from_checks, parameter_name
+from .severity_mapping import SEVERITY_MAP
+from .utils import extract_domain, normalize_url
+from .weight_mapping import WEIGHT_MAP
+
+# Scan worker: pulls jobs from the scan_jobs queue, runs them and persists the
+# scored results. Throughput scales by adding processes (--processes) and scans
+# in flight per process (--concurrency), independently of the API server.
+
+def results_from_checks(checks, severities=None):
+    """Map check results to the findings/actions rows the dashboard reads."""
+    severities = SEVERITY_MAP if severities is None else severities
+    findings, actions = [], []
+    for c in checks:
+        if c.status not in ("FAIL", "WARN", "ERROR"):
+            continue
+        param = parameter_name(c.name)
+        severity = severities.get(param, "HIGH" if c.status == "FAIL" else "MEDIUM").lower()
+        findings.append({"parameter": param, "risk": c.details or c.value or c.status, "severity": severity})
+        actions.append({"issue": c.name, "risk": severity.title(), "action": f"Review {c.name}", "status": "Open"})
+    return findings, actions
+
+def scan_record(domain, checks, profile=None, artifacts=None):
+    risks = risks_from_checks(checks)
+    summary = compute_scores(risks, profile)
+    findings, actions = results_from_checks(checks, profile["severities"] if profile else None)
+    # Only what changed since the previous scan goes on the timeline
+    events = (artifacts or {}).get("events")
+    if events is None:
+        events = [{"change": "Scan completed", "severity": "low", "time": datetime.utcnow().isoformat()}]
+    return {
+        "domain": domain, "trust_score": summary["trust_score"], "verdict": summary["verdict"],
+        "severity": summary["severity"].lower(), "findings": findings, "events": events, "actions": actions,
+        "parameter_risks": risks, "profile_version": profile["version"] if profile else None,
+        "state": (artifacts or {}).get("state")
+    }
+
+def active_profile():
+    return _db(profiles.ensure_profile, WEIGHT_MAP, CATEGORY_WEIGHTS, SEVERITY_MAP)
+
+def persist_scan(domain, checks, artifacts=None):
+    return db_helpers.save_many_scan_results([scan_record(domain, checks, active_profile(), artifacts)])[0]
+
+def _persist_batch(batch, store=None):
+    # One transaction for all runs in the batch, one for their job rows.
+    # Scored with the profile active at write time, so a new profile applies
+    # from the next batch on.
+    profile = active_profile()
+    run_ids = db_helpers.save_many_scan_results([
+        scan_record(domain, checks, profile, artifacts) for _, domain, checks, artifacts in batch
+    ])
+    if store is not None:
+        for (_, domain, _, artifacts), run_id in zip(batch, run_ids):
+            store.add_run(run_id, domain, artifacts.get("blobs", {}))
+    _db(jobs.finish_many, [(job["id"], run_id) for (job, _, _, _), run_id in zip(batch, run_ids)])
+
+async def _run_job(job, config, results):
+    if job.get("profile"):
+        config = {**config, "check_profile": job["profile"]}
+    try:
+        previous = None
+        if config.get("incremental", True) and config.get("check_profile") in (None, "full"):
+            # Compare against the last scan: conditional fetch, unchanged pages skip the content checks
+            key = extract_domain(normalize_url(job["url"]))
+            previous = (await asyncio.to_thread(db_helpers.load_scan_states, [key])).get(key)
+        domain, checks, artifacts = await scan_single_async(job["url"], config, previous)
+        store = get_blob_store(config)
+        if store is not None:
+            # Bodies go to the artifact store now, so queued results only carry hashes
+            artifacts["blobs"] = await asyncio.to_thread(store_scan_artifacts, store, domain, artifacts)
+            artifacts["html"] = None
+        # Queued results wait for the writer; keep them columnar while they do
+        batch = CheckBatch.from_checks(checks, domain)
+    except Exception as e:
+        await asyncio.to_thread(_db, jobs.fail, job["id"], str(e))
+        return
+    if await asyncio.to_thread(_db, jobs.is_cancel_requested, job["id"]):
+        await asyncio.to_thread(_db, jobs.mark_cancelled, job["id"])
+        return
+    await results.put((job, domain, batch, artifacts))
+
+def _db(fn, *args):
+    with db_helpers.connection() as conn:
+        return fn(conn, *args)
+
+async def _worker_slot(name, config, poll_interval, results):
+    while True:
+        job = await asyncio.to_thread(_db, jobs.claim_next, name)
+        if job is None:
+            await asyncio.sleep(poll_interval)
+            continue
+        await _run_job(job, config, results)
+
+async def _writer(results, batch_size, flush_interval, store=None):
+    """Collect finished scans and write them in batches, one transaction each."""
+    while True:
+        batch = [await results.get()]
+        while len(batch) < batch_size:
+            try:
+                batch.append(await asyncio.wait_for(results.get(), timeout=flush_interval))
+            except asyncio.TimeoutError:
+                break
+        try:
+            await asyncio.to_thread(_persist_batch, batch, store)
+        except Exception as e:
+            for job, _, _, _ in batch:
+                await asyncio.to_thread(_db, jobs.fail, job["id"], f"persist failed: {e}")
+
+async def run_worker(config: dict, concurrency: int = 20, poll_interval: float = 1.0,
+                     batch_size: int = 50, flush_interval: float = 0.5):
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    _db(jobs.init_jobs_table)
+    _db(profiles.init_profiles_table)
+    _db(db_helpers.init_latest_run_table)
+    _db(db_helpers.init_scan_state_table)
+    results = asyncio.Queue(maxsize=batch_size * 4)
+    await asyncio.gather(
+        _writer(results, batch_size, flush_interval, get_blob_store(config)),
+        *(_worker_slot(f"{name}/{i}", config, poll_interval, results) for i in range(concurrency))
+    )
+
+def _process_main(config, concurrency, poll_interval):
+    asyncio.run(run_worker(config, concurrency, poll_interval))
+
+def main():
+    ap = argparse.ArgumentParser(description="Run scan workers against the scan_jobs queue")
+    ap.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--concurrency", type=int, default=20, help="scans in flight per process")
+    ap.add_argument("--poll-interval", type=float, default=1.0)
+    ap.add_argument("--stale-after", type=int, default=600, help="requeue jobs running longer than this (s)")
+    ap.add_argument("--cpu-workers", type=int, default=0,
+                    help="parse/check processes per worker process (0: in-process; --processes already scales across cores)")
+    ap.add_argument("--artifact-store", help="directory for page bodies, WHOIS text and certs (off by default)")
+    args = ap.parse_args()
+    config = {"cpu_workers": args.cpu_workers}
+    if args.artifact_store:
+        config["artifact_store"] = args.artifact_store
+
+    # Unpooled, and closed before forking: the workers open their own
+    conn = db_helpers.get_conn()
+    try:
+        jobs.init_jobs_table(conn)
+        jobs.requeue_stale(conn, args.stale_after)
+    finally:
+        conn.close()
+    procs = [multiprocessing.Process(target=_process_main, args=(config, args.concurrency, args.poll_interval), daemon=True)
+             for _ in range(args.processes)]
+    for p in procs:
+        p.start()
+    try:
+        while True:
+            time.sleep(args.stale_after)
+            _db(jobs.requeue_stale, args.stale_after)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            p.terminate()
+
+if __name__ == "__main__":
+    main()